@@ -0,0 +1,124 @@
+import functools
+import os
+from datetime import date
+
+import holidays
+import numpy as np
+
+# --- Calendário de dias úteis ---
+# Por padrão, apenas os feriados nacionais. Camadas regionais opcionais:
+#   BUSINESS_CALENDAR_SUBDIV: estado (UF) cujos feriados também são excluídos (ex.: SP)
+#   BUSINESS_CALENDAR_EXTRA_HOLIDAYS: feriados municipais ou datas extras,
+#       separados por vírgula (AAAA-MM-DD para uma data, MM-DD para todo ano)
+BUSINESS_CALENDAR_COUNTRY = os.getenv("BUSINESS_CALENDAR_COUNTRY", "BR")
+BUSINESS_CALENDAR_SUBDIV = os.getenv("BUSINESS_CALENDAR_SUBDIV") or None
+BUSINESS_CALENDAR_EXTRA_HOLIDAYS = tuple(
+    value.strip() for value in os.getenv("BUSINESS_CALENDAR_EXTRA_HOLIDAYS", "").split(",") if value.strip()
+)
+
+
+def _extra_holidays(start_year, end_year, extra):
+    """Expande as datas extras ('AAAA-MM-DD' ou 'MM-DD' anual) para os anos pedidos."""
+    days = {}
+    for value in extra:
+        if len(value) == 5:
+            for year in range(start_year, end_year + 1):
+                days[date.fromisoformat(f"{year}-{value}")] = "Feriado local"
+        else:
+            day = date.fromisoformat(value)
+            if start_year <= day.year <= end_year:
+                days[day] = "Feriado local"
+    return days
+
+
+@functools.lru_cache(maxsize=32)
+def get_holidays(start_year, end_year, country=None, subdiv=None, extra=None):
+    """
+    Feriados entre os anos informados (inclusive), em cache por intervalo.
+
+    Returns:
+        dict: {date: nome do feriado}, com as camadas nacional, estadual e local
+    """
+    country = country or BUSINESS_CALENDAR_COUNTRY
+    subdiv = subdiv if subdiv is not None else BUSINESS_CALENDAR_SUBDIV
+    extra = extra if extra is not None else BUSINESS_CALENDAR_EXTRA_HOLIDAYS
+
+    days = dict(holidays.country_holidays(country, subdiv=subdiv, years=range(start_year, end_year + 1)))
+    days.update(_extra_holidays(start_year, end_year, extra))
+    return days
+
+
+@functools.lru_cache(maxsize=32)
+def get_busdaycalendar(start_year, end_year):
+    """np.busdaycalendar (segunda a sexta, sem feriados) válido para os anos informados."""
+    holiday_dates = np.array(sorted(get_holidays(start_year, end_year)), dtype='datetime64[D]')
+    return np.busdaycalendar(weekmask='1111100', holidays=holiday_dates)
+
+
+def _to_days(values):
+    return np.asarray(values, dtype='datetime64[D]')
+
+
+def _calendar_for(*arrays):
+    """Calendário que cobre todos os anos presentes nos arrays de datas."""
+    valid = [array[~np.isnat(array)] for array in arrays]
+    valid = [array for array in valid if array.size]
+    if not valid:
+        year = date.today().year
+        return get_busdaycalendar(year, year)
+    first_year = min(array.min() for array in valid).astype(object).year
+    last_year = max(array.max() for array in valid).astype(object).year
+    return get_busdaycalendar(first_year, last_year)
+
+
+def holiday_name(day):
+    """Nome do feriado em 'day', ou None se não for feriado."""
+    return get_holidays(day.year, day.year).get(day)
+
+
+def is_working_day(days):
+    """
+    Indica se cada data é dia útil.
+
+    Aceita uma data (retorna bool) ou um array/Series de datas (retorna array de bool).
+    """
+    values = _to_days(days)
+    result = np.is_busday(values, busdaycal=_calendar_for(values.reshape(-1)))
+    return bool(result) if result.ndim == 0 else result
+
+
+def working_days_in_range(start_date, end_date):
+    """Dias úteis entre as datas (inclusive), como array datetime64[D]."""
+    start = np.datetime64(start_date, 'D')
+    end = np.datetime64(end_date, 'D')
+    if end < start:
+        return np.array([], dtype='datetime64[D]')
+    days = np.arange(start, end + 1)
+    return days[np.is_busday(days, busdaycal=_calendar_for(days))]
+
+
+def count_working_days(start_dates, end_dates):
+    """
+    Dias úteis entre cada par de datas, incluindo as duas pontas.
+
+    Aceita datas ou arrays de datas (mesmo formato de np.busday_count); pares
+    com fim antes do início contam zero.
+    """
+    start = _to_days(start_dates)
+    end = _to_days(end_dates)
+    counts = np.busday_count(start, end + 1, busdaycal=_calendar_for(start.reshape(-1), end.reshape(-1)))
+    counts = np.maximum(counts, 0)
+    return int(counts) if np.ndim(counts) == 0 else counts
+
+
+def offset_working_days(dates, offsets):
+    """
+    Data do n-ésimo dia útil a partir de cada data (0 = a própria data, ou o
+    próximo dia útil se ela não for um).
+    """
+    values = _to_days(dates)
+    offsets = np.asarray(offsets)
+    # Margem para o deslocamento atravessar o fim do último ano das datas
+    margin = np.timedelta64(int(offsets.max(initial=0)) * 2 + 14, 'D')
+    calendar = _calendar_for(values.reshape(-1), values.reshape(-1) + margin)
+    return np.busday_offset(values, offsets, roll='forward', busdaycal=calendar)
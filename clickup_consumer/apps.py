@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ClickupConsumerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'clickup_consumer'
+
+    def ready(self):
+        # Registra a invalidação do cache de tokens (CachedTokenAuthentication)
+        from . import signals  # noqa: F401
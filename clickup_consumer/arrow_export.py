@@ -0,0 +1,203 @@
+# clickup_consumer/arrow_export.py
+
+import io
+import os
+import tempfile
+
+from django.db import models
+
+from .models import ClickUpTask
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow é opcional (pip install clickup-data[arrow])
+    pa = None
+    pq = None
+
+
+ARROW_STREAM_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+PARQUET_MEDIA_TYPE = 'application/vnd.apache.parquet'
+
+
+def arrow_available():
+    """Indica se o pyarrow está instalado."""
+    return pa is not None
+
+
+def _arrow_type(field):
+    """Mapeia um campo do modelo para o tipo Arrow correspondente."""
+    if isinstance(field, (models.AutoField, models.BigAutoField, models.IntegerField)):
+        return pa.int64()
+    if isinstance(field, models.FloatField):
+        return pa.float64()
+    if isinstance(field, models.BooleanField):
+        return pa.bool_()
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp('us', tz='UTC')
+    if isinstance(field, models.DateField):
+        return pa.date32()
+    return pa.string()
+
+
+def task_arrow_schema(fields):
+    """Monta o schema Arrow tipado para as colunas pedidas de ClickUpTask."""
+    model_fields = {field.attname: field for field in ClickUpTask._meta.concrete_fields}
+    return pa.schema([
+        pa.field(name, _arrow_type(model_fields[name]), nullable=name != 'id')
+        for name in fields
+    ])
+
+
+def iter_record_batches(queryset, fields, chunk_size=2000):
+    """
+    Converte o queryset em RecordBatches Arrow, direto do cursor do banco.
+
+    Cada bloco de 'chunk_size' linhas vira um RecordBatch colunar já tipado
+    (datas como date32, números como float64), sem passar por dicionários.
+
+    Args:
+        queryset (QuerySet): Queryset de ClickUpTask já filtrado e ordenado
+        fields (list): Colunas a exportar, na ordem desejada
+        chunk_size (int): Linhas por RecordBatch
+
+    Yields:
+        pa.RecordBatch: Lotes consecutivos de tarefas
+    """
+    schema = task_arrow_schema(fields)
+    rows = []
+    for row in queryset.values_list(*fields).iterator(chunk_size=chunk_size):
+        rows.append(row)
+        if len(rows) >= chunk_size:
+            yield _rows_to_batch(rows, schema)
+            rows = []
+    if rows:
+        yield _rows_to_batch(rows, schema)
+
+
+async def aiter_record_batches(queryset, fields, chunk_size=2000):
+    """Versão assíncrona de iter_record_batches, lendo o cursor com .aiterator()."""
+    schema = task_arrow_schema(fields)
+    rows = []
+    # .values(): o .aiterator() de .values_list() executa a consulta ainda no
+    # event loop (SynchronousOnlyOperation); o de .values() a leva para a thread
+    async for row in queryset.values(*fields).aiterator(chunk_size=chunk_size):
+        rows.append(tuple(row[field] for field in fields))
+        if len(rows) >= chunk_size:
+            yield _rows_to_batch(rows, schema)
+            rows = []
+    if rows:
+        yield _rows_to_batch(rows, schema)
+
+
+def _rows_to_batch(rows, schema):
+    columns = zip(*rows)
+    arrays = [pa.array(column, type=field.type) for column, field in zip(columns, schema)]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _ChunkSink:
+    """Destino de escrita que acumula bytes até serem drenados pelo gerador."""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_arrow_ipc(queryset, fields, chunk_size=2000):
+    """
+    Gera um stream Arrow IPC (schema + lotes) em pedaços de bytes.
+
+    Cada RecordBatch é enviado assim que fica pronto, então a memória do
+    servidor fica limitada a um lote independentemente do tamanho da tabela.
+    """
+    schema = task_arrow_schema(fields)
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        yield sink.drain()
+        for batch in iter_record_batches(queryset, fields, chunk_size):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+async def astream_arrow_ipc(queryset, fields, chunk_size=2000):
+    """Versão assíncrona de stream_arrow_ipc, para servidores ASGI."""
+    schema = task_arrow_schema(fields)
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        yield sink.drain()
+        async for batch in aiter_record_batches(queryset, fields, chunk_size):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def build_parquet(queryset, fields, chunk_size=2000):
+    """
+    Gera um arquivo Parquet com um row group por lote.
+
+    O Parquet grava seus metadados no final do arquivo, por isso o conteúdo
+    é montado em memória (já comprimido) antes de ser enviado.
+    """
+    schema = task_arrow_schema(fields)
+    buffer = io.BytesIO()
+    with pq.ParquetWriter(buffer, schema) as writer:
+        for batch in iter_record_batches(queryset, fields, chunk_size):
+            writer.write_batch(batch)
+    return buffer.getvalue()
+
+
+def write_arrow_snapshot(path, version, fields, chunk_size=2000):
+    """
+    Publica o conjunto completo em um arquivo Arrow IPC (formato de arquivo,
+    sem compressão), para ser aberto pelos dashboards via memory-map.
+
+    A versão do conjunto vai nos metadados do schema ('dataset_version'). As
+    tarefas principais (sem parent_id) vêm primeiro e a quantidade delas fica
+    em 'main_rows', para que os dashboards peguem só as principais com um
+    recorte sem cópia do arquivo mapeado. O arquivo é escrito em um
+    temporário e movido com os.replace: quem já tem o arquivo anterior
+    mapeado continua lendo-o até reabrir.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    main_tasks = ClickUpTask.objects.filter(parent_id__isnull=True).order_by('id')
+    subtasks = ClickUpTask.objects.filter(parent_id__isnull=False).order_by('id')
+    schema = task_arrow_schema(fields).with_metadata({
+        'dataset_version': str(version.id if version else 0),
+        'main_rows': str(main_tasks.count()),
+    })
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    try:
+        with pa.OSFile(temp_path, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+            for queryset in (main_tasks, subtasks):
+                for batch in iter_record_batches(queryset, fields, chunk_size):
+                    writer.write_batch(batch)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
@@ -0,0 +1,89 @@
+# clickup_consumer/authentication.py
+
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from knox.auth import TokenAuthentication
+from knox.crypto import hash_token
+
+
+class _TokenCache:
+    """
+    Cache em memória do processo: digest do token -> (user, auth_token, validade).
+
+    Cada processo tem o seu; as remoções de token feitas em outro processo
+    só são vistas aqui depois do TTL, por isso ele deve ser curto.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, digest):
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        user, auth_token, expires_at = entry
+        if expires_at < time.monotonic():
+            self.discard(digest)
+            return None
+        return user, auth_token
+
+    def set(self, digest, user, auth_token, ttl, max_entries):
+        with self._lock:
+            if len(self._entries) >= max_entries:
+                # Descarta a entrada mais antiga (dicts mantêm a ordem de inserção)
+                self._entries.pop(next(iter(self._entries)), None)
+            self._entries[digest] = (user, auth_token, time.monotonic() + ttl)
+
+    def discard(self, digest):
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def discard_user(self, user_id):
+        with self._lock:
+            for digest in [digest for digest, entry in self._entries.items() if entry[0].pk == user_id]:
+                del self._entries[digest]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = _TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication do Knox com cache dos tokens já validados.
+
+    A primeira requisição de um token segue o caminho normal do Knox (busca
+    em knox_authtoken e comparação do digest); as seguintes, dentro de
+    CLICKUP_AUTH_CACHE_TTL segundos, são resolvidas em memória, sem consulta
+    ao banco. Logout, revogação ou alteração do usuário removem a entrada
+    (ver os sinais em clickup_consumer.signals).
+    """
+
+    def authenticate_credentials(self, token):
+        ttl = getattr(settings, 'CLICKUP_AUTH_CACHE_TTL', 60)
+        if ttl <= 0:
+            return super().authenticate_credentials(token)
+
+        try:
+            digest = hash_token(token.decode('utf-8') if isinstance(token, bytes) else token)
+        except (TypeError, ValueError):
+            return super().authenticate_credentials(token)
+
+        cached = token_cache.get(digest)
+        if cached is not None:
+            user, auth_token = cached
+            if auth_token.expiry is None or auth_token.expiry > timezone.now():
+                return user, auth_token
+            token_cache.discard(digest)
+
+        user, auth_token = super().authenticate_credentials(token)
+        max_entries = getattr(settings, 'CLICKUP_AUTH_CACHE_MAX_ENTRIES', 1000)
+        token_cache.set(digest, user, auth_token, ttl, max_entries)
+        return user, auth_token
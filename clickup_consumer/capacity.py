@@ -0,0 +1,153 @@
+# clickup_consumer/capacity.py
+
+import numpy as np
+
+from clickup_common.business_calendar import count_working_days, working_days_in_range
+
+from .kpis import HOURS_PER_DAY, filter_active_between
+from .models import ClickUpTask
+
+# Agrupamentos aceitos por /api/capacity/ e a coluna do modelo de cada um
+GROUP_BY_FIELDS = {
+    'responsavel': 'responsavel',
+    'lista': 'lista_origem',
+    'day': None,
+}
+
+
+def get_working_days(start, end):
+    """Dias úteis (segunda a sexta, sem feriados) entre as datas, inclusive."""
+    return working_days_in_range(start, end)
+
+
+def build_capacity_grid(queryset, start, end, group_by, today):
+    """
+    Monta a grade de horas planejadas por dia útil do período.
+
+    Reproduz o log diário dos dashboards (create_daily_log): o 'tempo_estimado'
+    de cada tarefa principal é dividido igualmente pelos dias úteis entre a
+    data de início e a de fechamento (ou hoje); sem nenhum dia útil, vai
+    inteiro para o dia de início, que entra na grade apenas para essas
+    tarefas. Só as tarefas ativas no período saem do banco, e cada uma vira
+    uma taxa constante somada no seu primeiro dia útil e subtraída após o
+    último em um array de diferenças (dias x grupos).
+
+    Args:
+        queryset (QuerySet): Tarefas principais já filtradas
+        start (date): Primeiro dia do período
+        end (date): Último dia do período
+        group_by (str): 'responsavel', 'lista' ou 'day'
+        today (date): Fim do período das tarefas em aberto
+
+    Returns:
+        dict: Dias úteis, grade de horas e capacidade da empresa no período
+    """
+    working_days = get_working_days(start, end)
+    group_field = GROUP_BY_FIELDS[group_by]
+
+    columns = ['tempo_estimado', 'data_inicio', 'data_fim_log']
+    if group_field:
+        columns.append(group_field)
+    rows = list(filter_active_between(queryset, start, end, today).values_list(*columns))
+
+    days, hours, active, groups = _distribute_rows(rows, working_days, start, end, group_field is not None)
+    day_totals = hours.sum(axis=1)
+
+    grid = []
+    grid_members = set()
+    if group_field:
+        # Sem a última coluna (grupo nulo), em ordem de grupo e depois de dia
+        group_positions, day_positions = np.nonzero(active[:, :-1].T)
+        for group_position, day_position in zip(group_positions, day_positions):
+            grid.append({
+                'data': days[day_position].astype(object),
+                group_by: str(groups[group_position]),
+                'horas_planejadas': round(float(hours[day_position, group_position]), 3),
+            })
+        if group_by == 'responsavel':
+            grid_members = set(groups[active[:, :-1].any(axis=0)])
+    else:
+        # Todos os dias úteis, mais os dias de início das tarefas sem dias úteis
+        shown = np.isin(days, working_days) | active.any(axis=1)
+        grid = [
+            {'data': day.astype(object), 'horas_planejadas': round(float(value), 3)}
+            for day, value in zip(days[shown], day_totals[shown])
+        ]
+
+    # Responsáveis de todas as tarefas (inclusive subtarefas), sem filtros
+    company_members = ClickUpTask.objects.exclude(responsavel__isnull=True).values('responsavel').distinct().count()
+    total_days_in_range = len(working_days)
+    return {
+        'start': start,
+        'end': end,
+        'group_by': group_by,
+        'working_days': [day.astype(object) for day in working_days],
+        'grid': grid,
+        'total_planned_hours': round(float(day_totals.sum()), 3),
+        'company': {
+            'responsaveis': company_members,
+            'capacity_per_day': company_members * HOURS_PER_DAY,
+            'capacity_total': company_members * HOURS_PER_DAY * total_days_in_range,
+        },
+        'grid_responsaveis': len(grid_members) if group_by == 'responsavel' else None,
+    }
+
+
+def _distribute_rows(rows, working_days, start, end, grouped):
+    """
+    Distribui as horas das tarefas pelos dias do período, por grupo.
+
+    Returns:
+        tuple: (dias, horas e ativo por (dia, grupo), grupos ordenados). Os
+               dias são os úteis mais os de início das tarefas sem dias úteis;
+               o grupo nulo ocupa a última coluna.
+    """
+    if grouped:
+        values = np.array([row[3] for row in rows], dtype=object)
+        has_group = np.array([value is not None for value in values], dtype=bool)
+        groups, codes = np.unique(values[has_group].astype(str), return_inverse=True)
+        group_codes = np.full(len(rows), len(groups))
+        group_codes[has_group] = codes
+    else:
+        groups = np.array([], dtype=str)
+        group_codes = np.zeros(len(rows), dtype='int64')
+    shape = len(groups) + 1
+
+    if not rows:
+        return working_days, np.zeros((len(working_days), shape)), np.zeros((len(working_days), shape), dtype=bool), groups
+
+    hours = np.array([row[0] or 0 for row in rows], dtype='float64')
+    task_start = np.array([row[1] for row in rows], dtype='datetime64[D]')
+    task_end = np.maximum(np.array([row[2] for row in rows], dtype='datetime64[D]'), task_start)
+    total_days = count_working_days(task_start, task_end)
+    spans = total_days > 0
+
+    # Tarefas com dias úteis: taxa constante nas posições [first, last) de working_days
+    first = np.searchsorted(working_days, task_start[spans])
+    last = np.searchsorted(working_days, task_end[spans], side='right')
+    rate = hours[spans] / total_days[spans]
+    span_groups = group_codes[spans]
+
+    diff_hours = np.zeros((len(working_days) + 1, shape))
+    diff_active = np.zeros((len(working_days) + 1, shape), dtype='int64')
+    np.add.at(diff_hours, (first, span_groups), rate)
+    np.add.at(diff_hours, (last, span_groups), -rate)
+    np.add.at(diff_active, (first, span_groups), 1)
+    np.add.at(diff_active, (last, span_groups), -1)
+    working_active = np.cumsum(diff_active, axis=0)[:-1] > 0
+    # Zera os resíduos de ponto flutuante onde não há tarefas ativas
+    working_hours = np.where(working_active, np.cumsum(diff_hours, axis=0)[:-1], 0.0)
+
+    # Tarefas sem dias úteis: todas as horas no dia de início, se ele estiver no período
+    extra = ~spans & (task_start >= np.datetime64(start, 'D')) & (task_start <= np.datetime64(end, 'D'))
+    days = np.union1d(working_days, task_start[extra])
+    day_hours = np.zeros((len(days), shape))
+    day_active = np.zeros((len(days), shape), dtype=bool)
+    positions = np.searchsorted(days, working_days)
+    day_hours[positions] = working_hours
+    day_active[positions] = working_active
+
+    extra_cells = (np.searchsorted(days, task_start[extra]), group_codes[extra])
+    np.add.at(day_hours, extra_cells, hours[extra])
+    day_active[extra_cells] = True
+    return days, day_hours, day_active, groups
@@ -0,0 +1,63 @@
+# clickup_consumer/changes.py
+
+import hashlib
+import json
+
+from django.conf import settings
+
+from .filters import filter_tasks
+from .models import ClickUpTask, DeletedClickUpTask
+
+
+def task_content_hash(task_data):
+    """
+    Hash estável do conteúdo de uma tarefa (dict de campos do modelo).
+
+    O loader compara este hash com o salvo no banco para decidir se a linha
+    precisa ser regravada e ter sua versão atualizada.
+    """
+    payload = json.dumps(task_data, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def changes_available_since(since, current_version_id):
+    """
+    Indica se as remoções desde 'since' ainda estão registradas.
+
+    O loader descarta os registros de remoção mais antigos que
+    CLICKUP_CHANGES_RETENTION_VERSIONS; abaixo disso o cliente precisa
+    baixar o conjunto completo novamente.
+    """
+    retention = getattr(settings, 'CLICKUP_CHANGES_RETENTION_VERSIONS', 50)
+    return since >= current_version_id - retention
+
+
+def get_changes_since(since, query_params, fields):
+    """
+    Retorna as tarefas alteradas e os IDs removidos depois da versão 'since'.
+
+    Os filtros da consulta são respeitados: uma tarefa alterada que deixou de
+    atender aos filtros (ex.: mudou de lista) entra nos removidos, para que o
+    cliente a descarte da sua cópia filtrada.
+
+    Args:
+        since (int): Última versão que o cliente possui
+        query_params (QueryDict): Filtros de clickup_consumer.filters
+        fields (list): Colunas das tarefas retornadas (deve incluir 'clickup_id')
+
+    Returns:
+        tuple: (lista de dicts das tarefas alteradas, lista de clickup_ids removidos)
+    """
+    changed = ClickUpTask.objects.filter(versao__gt=since)
+    matching = filter_tasks(changed, query_params)
+
+    upserted = list(matching.values(*fields).order_by('id'))
+    left_filter = changed.exclude(pk__in=matching.values('pk')).values_list('clickup_id', flat=True)
+
+    # Uma tarefa removida e recriada depois aparece só entre as alteradas
+    current_ids = {task['clickup_id'] for task in upserted}
+    deleted = set(
+        DeletedClickUpTask.objects.filter(versao__gt=since).values_list('clickup_id', flat=True)
+    )
+    deleted.update(left_filter)
+    return upserted, sorted(deleted - current_ids)
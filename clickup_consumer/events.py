@@ -0,0 +1,94 @@
+# clickup_consumer/events.py
+
+import asyncio
+import json
+import time
+
+from django.conf import settings
+
+from .versioning import aget_current_version, get_current_version
+
+
+def format_version_event(version):
+    """Mensagem SSE 'version' com o número e a data da versão publicada."""
+    payload = {
+        'version': version.id if version else 0,
+        'criado_em': version.criado_em.isoformat() if version else None,
+        'total_tarefas': version.total_tarefas if version else 0,
+    }
+    return f"id: {payload['version']}\nevent: version\ndata: {json.dumps(payload)}\n\n"
+
+
+def _event_settings():
+    return (
+        getattr(settings, 'CLICKUP_EVENTS_POLL_INTERVAL', 2),
+        getattr(settings, 'CLICKUP_EVENTS_HEARTBEAT', 15),
+        getattr(settings, 'CLICKUP_EVENTS_MAX_DURATION', 3600),
+    )
+
+
+def _version_id(version):
+    return version.id if version else 0
+
+
+async def astream_version_events(last_event_id=None):
+    """
+    Gera o stream SSE de novas versões do conjunto (servidores ASGI).
+
+    Consulta a última DatasetVersion a cada CLICKUP_EVENTS_POLL_INTERVAL
+    segundos (uma leitura pela chave primária) e envia um evento quando ela
+    muda. Ao conectar, envia a versão atual se ela for diferente de
+    'last_event_id' (cabeçalho Last-Event-ID de uma reconexão). Comentários de
+    keep-alive mantêm proxies e o cliente cientes de que a conexão está viva.
+    A conexão é encerrada após CLICKUP_EVENTS_MAX_DURATION segundos; o cliente
+    reconecta informando o último id recebido.
+    """
+    poll_interval, heartbeat, max_duration = _event_settings()
+    started = last_beat = time.monotonic()
+
+    yield f"retry: {int(poll_interval * 1000)}\n\n"
+    version = await aget_current_version()
+    current_id = _version_id(version)
+    if str(current_id) != str(last_event_id):
+        yield format_version_event(version)
+
+    while time.monotonic() - started < max_duration:
+        await asyncio.sleep(poll_interval)
+        version = await aget_current_version()
+        if _version_id(version) != current_id:
+            current_id = _version_id(version)
+            last_beat = time.monotonic()
+            yield format_version_event(version)
+        elif time.monotonic() - last_beat >= heartbeat:
+            last_beat = time.monotonic()
+            yield ": keep-alive\n\n"
+
+
+def stream_version_events(last_event_id=None):
+    """
+    Versão síncrona de astream_version_events, para o deploy WSGI.
+
+    Cada cliente conectado ocupa uma thread do worker enquanto durar a
+    conexão (até CLICKUP_EVENTS_MAX_DURATION segundos); por isso o listener
+    dos dashboards (API_EVENTS_URL) é opcional e deve ficar desativado sob
+    WSGI. Em produção prefira o deploy ASGI.
+    """
+    poll_interval, heartbeat, max_duration = _event_settings()
+    started = last_beat = time.monotonic()
+
+    yield f"retry: {int(poll_interval * 1000)}\n\n"
+    version = get_current_version()
+    current_id = _version_id(version)
+    if str(current_id) != str(last_event_id):
+        yield format_version_event(version)
+
+    while time.monotonic() - started < max_duration:
+        time.sleep(poll_interval)
+        version = get_current_version()
+        if _version_id(version) != current_id:
+            current_id = _version_id(version)
+            last_beat = time.monotonic()
+            yield format_version_event(version)
+        elif time.monotonic() - last_beat >= heartbeat:
+            last_beat = time.monotonic()
+            yield ": keep-alive\n\n"
@@ -0,0 +1,120 @@
+# clickup_consumer/filters.py
+
+import datetime
+
+from rest_framework.exceptions import ValidationError
+
+from .models import ClickUpTask
+
+
+# Campos de data que aceitam filtro por intervalo (<campo>__gte / <campo>__lte)
+DATE_FIELDS = (
+    'data_criacao',
+    'data_atualizacao',
+    'data_fechamento',
+    'data_done',
+    'prazo',
+    'data_inicio',
+    'data_de_termino_real',
+)
+
+# Campos de texto filtrados por igualdade; aceitam o parâmetro repetido
+# (ex.: ?lista_origem=A&lista_origem=B) para selecionar vários valores
+CHOICE_FIELDS = ('lista_origem', 'responsavel', 'status')
+
+TRUE_VALUES = {'1', 'true', 'yes', 'sim'}
+FALSE_VALUES = {'0', 'false', 'no', 'nao', 'não'}
+
+# Colunas de controle da sincronização incremental: ficam fora das respostas
+# e do snapshot por padrão; 'versao' ainda pode ser pedida em ?fields=
+SYNC_FIELDS = ('hash_conteudo', 'versao')
+
+# Colunas públicas das tarefas, enviadas quando ?fields= não é informado
+TASK_FIELDS = tuple(
+    field.attname for field in ClickUpTask._meta.concrete_fields
+    if field.attname not in SYNC_FIELDS
+)
+
+# Todos os campos que podem ser pedidos em ?fields=
+SELECTABLE_FIELDS = TASK_FIELDS + ('versao',)
+
+
+def parse_date(name, value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({name: "Data inválida. Use o formato AAAA-MM-DD."})
+
+
+def parse_bool(name, value):
+    normalized = value.strip().lower()
+    if normalized in TRUE_VALUES:
+        return True
+    if normalized in FALSE_VALUES:
+        return False
+    raise ValidationError({name: "Valor booleano inválido. Use 'true' ou 'false'."})
+
+
+def filter_tasks(queryset, query_params):
+    """
+    Aplica ao queryset os filtros recebidos na query string.
+
+    Todos os filtros viram condições do ORM sobre colunas indexadas, de forma
+    que o banco devolve apenas as linhas que o dashboard realmente usa.
+
+    Parâmetros aceitos:
+        lista_origem, responsavel, status: Igualdade (podem ser repetidos)
+        main_only: 'true' para retornar apenas tarefas principais (sem parent_id)
+        <campo_data>__gte, <campo_data>__lte: Intervalo inclusivo em qualquer campo de DATE_FIELDS
+
+    Args:
+        queryset (QuerySet): Queryset de ClickUpTask
+        query_params (QueryDict): Parâmetros da requisição
+
+    Returns:
+        QuerySet: Queryset filtrado
+    """
+    for field in CHOICE_FIELDS:
+        values = [value for value in query_params.getlist(field) if value != '']
+        if len(values) == 1:
+            queryset = queryset.filter(**{field: values[0]})
+        elif values:
+            queryset = queryset.filter(**{f'{field}__in': values})
+
+    main_only = query_params.get('main_only')
+    if main_only is not None and parse_bool('main_only', main_only):
+        queryset = queryset.filter(parent_id__isnull=True)
+
+    for field in DATE_FIELDS:
+        for lookup in ('gte', 'lte'):
+            name = f'{field}__{lookup}'
+            value = query_params.get(name)
+            if value:
+                queryset = queryset.filter(**{name: parse_date(name, value)})
+
+    return queryset
+
+
+def get_projection(query_params, required=('id',)):
+    """
+    Retorna a lista de colunas pedida em ?fields= (separadas por vírgula).
+
+    As colunas em 'required' (usadas pela paginação) são sempre incluídas.
+    Sem o parâmetro, retorna as colunas públicas (TASK_FIELDS).
+
+    Raises:
+        ValidationError: Se algum campo pedido não existir no modelo
+    """
+    raw_value = query_params.get('fields')
+    if not raw_value:
+        return list(TASK_FIELDS)
+
+    fields = [field.strip() for field in raw_value.split(',') if field.strip()]
+    unknown_fields = [field for field in fields if field not in SELECTABLE_FIELDS]
+    if unknown_fields:
+        raise ValidationError({'fields': f"Campos desconhecidos: {', '.join(unknown_fields)}."})
+
+    for field in required:
+        if field not in fields:
+            fields.append(field)
+    return fields
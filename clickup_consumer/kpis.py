@@ -0,0 +1,216 @@
+# clickup_consumer/kpis.py
+
+import datetime
+
+import numpy as np
+from django.db.models import Avg, Case, Count, DurationField, ExpressionWrapper, F, IntegerField, Max, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+# Mesmo calendário de dias úteis dos dashboards (feriados e camadas regionais)
+from clickup_common.business_calendar import count_working_days, is_working_day
+
+# Jornada usada no cálculo de capacidade, a mesma dos dashboards
+HOURS_PER_WEEK = 40
+HOURS_PER_DAY = 8
+
+
+def get_week_bounds(reference_date):
+    """Retorna (segunda-feira, sexta-feira) da semana de 'reference_date'."""
+    start_of_week = reference_date - datetime.timedelta(days=reference_date.weekday())
+    return start_of_week, start_of_week + datetime.timedelta(days=4)
+
+
+def annotate_task_period(queryset, today):
+    """
+    Anota 'data_fim_log' com o último dia do log diário de cada tarefa:
+    data de fechamento (ou hoje, se aberta), nunca antes da data de início.
+
+    É o mesmo período usado por create_daily_log nos dashboards.
+    """
+    return queryset.filter(data_inicio__isnull=False).annotate(
+        data_fim_log=Coalesce('data_fechamento', Value(today)),
+    )
+
+
+def filter_active_between(queryset, start, end, today):
+    """Tarefas cujo período do log diário cruza o intervalo [start, end]."""
+    queryset = annotate_task_period(queryset, today)
+    return queryset.filter(data_inicio__lte=end).filter(
+        Q(data_inicio__gte=start) | Q(data_fim_log__gte=start)
+    )
+
+
+def distribute_hours(queryset, start, end, today):
+    """
+    Soma as horas do log diário das tarefas que caem dentro de [start, end].
+
+    Cada tarefa tem seu 'tempo_estimado' dividido igualmente pelos dias úteis
+    do seu período (sem fins de semana e feriados). Apenas as linhas ativas
+    no intervalo saem do banco; a contagem de dias úteis é feita com numpy,
+    pelo calendário compartilhado com os dashboards.
+
+    Returns:
+        dict: {responsavel: horas no intervalo}
+    """
+    rows = list(
+        filter_active_between(queryset, start, end, today)
+        .values_list('responsavel', 'tempo_estimado', 'data_inicio', 'data_fim_log')
+    )
+    if not rows:
+        return {}
+
+    responsaveis = [row[0] for row in rows]
+    hours = np.array([row[1] or 0 for row in rows], dtype='float64')
+    task_start = np.array([row[2] for row in rows], dtype='datetime64[D]')
+    task_end = np.maximum(np.array([row[3] for row in rows], dtype='datetime64[D]'), task_start)
+
+    # Dias úteis da tarefa inteira e dos que caem dentro do intervalo
+    total_days = count_working_days(task_start, task_end)
+    range_start = np.maximum(task_start, np.datetime64(start, 'D'))
+    range_end = np.minimum(task_end, np.datetime64(end, 'D'))
+    days_in_range = count_working_days(range_start, range_end)
+
+    # Sem dias úteis, a tarefa inteira fica registrada no dia de início
+    no_business_days = total_days == 0
+    start_in_range = (task_start >= np.datetime64(start, 'D')) & (task_start <= np.datetime64(end, 'D'))
+    days_in_range = np.where(no_business_days, start_in_range.astype('int64'), days_in_range)
+    total_days = np.where(no_business_days, 1, total_days)
+
+    hours_in_range = hours / total_days * days_in_range
+    result = {}
+    for responsavel, value, days in zip(responsaveis, hours_in_range, days_in_range):
+        if days:
+            result[responsavel] = result.get(responsavel, 0.0) + float(value)
+    return result
+
+
+def _incident_free(queryset):
+    """
+    Projetos (agrupados por 'tags') sem nenhuma tarefa em lista de 'Incidente'.
+
+    O agrupamento é feito no banco; volta uma linha por projeto. Tarefas sem
+    tag não contam como projeto, como em calculate_incident_free_rate.
+    """
+    projects = list(
+        queryset.order_by().exclude(tags__isnull=True).values('tags').annotate(
+            has_incident=Max(Case(
+                When(lista_origem__icontains='Incidente', then=1),
+                default=0,
+                output_field=IntegerField(),
+            )),
+        ).values_list('has_incident', flat=True)
+    )
+    total_projects = len(projects)
+    clean_projects = sum(1 for has_incident in projects if not has_incident)
+    rate = (clean_projects / total_projects) * 100 if total_projects else 0.0
+    return rate, clean_projects, total_projects
+
+
+def _rounded(value):
+    return round(float(value or 0), 2)
+
+
+def compute_kpis(queryset, date=None, week=None, today=None):
+    """
+    Calcula os KPIs dos dashboards (entrega no prazo, qualidade, horas
+    previstas, capacidade e lead time) com agregações no banco.
+
+    Args:
+        queryset (QuerySet): Tarefas principais já filtradas por lista/responsável
+        date (date): Dia selecionado no modo "Filtrar por data" (opcional)
+        week (date): Qualquer dia da semana usada na capacidade (padrão: semana atual)
+        today (date): Data de referência para tarefas em aberto
+
+    Returns:
+        dict: Mesmos grupos de calculate_all_metrics, mais o período aplicado
+    """
+    today = today or datetime.date.today()
+    main_tasks = queryset
+
+    if date is not None:
+        if not is_working_day(date):
+            # Fins de semana e feriados não têm registros no log diário
+            return _empty_kpis(period='day', date=date, business_day=False)
+        queryset = filter_active_between(queryset, date, date, today)
+
+    lead_time = ExpressionWrapper(F('data_fechamento') - F('data_inicio'), output_field=DurationField())
+    totals = queryset.aggregate(
+        total_completed=Count('id', filter=Q(data_fechamento__isnull=False)),
+        on_time_count=Count('id', filter=Q(data_fechamento__isnull=False, prazo__isnull=False, data_fechamento__lte=F('prazo'))),
+        total_planned_hours=Sum('tempo_estimado'),
+        members=Count('responsavel', distinct=True),
+        average_lead_time=Avg(lead_time, filter=Q(data_fechamento__isnull=False)),
+    )
+
+    total_completed = totals['total_completed']
+    on_time_rate = (totals['on_time_count'] / total_completed) * 100 if total_completed else 0
+    incident_free_rate, clean_projects, total_projects = _incident_free(queryset)
+
+    average_lead_time = totals['average_lead_time']
+    if isinstance(average_lead_time, datetime.timedelta):
+        average_lead_time = average_lead_time.total_seconds() / 86400
+
+    result = {
+        'delivery_performance': {
+            'on_time_rate': _rounded(on_time_rate),
+            'on_time_count': totals['on_time_count'] if total_completed else 0,
+            'total_completed': total_completed,
+        },
+        'quality': {
+            'incident_free_rate': _rounded(incident_free_rate),
+            'clean_projects': clean_projects,
+            'total_projects': total_projects,
+        },
+        'planning': {
+            'total_planned_hours': _rounded(totals['total_planned_hours']),
+        },
+        'efficiency': {
+            'average_lead_time': _rounded(average_lead_time),
+        },
+    }
+
+    if date is not None:
+        # Modo diário: horas do log no dia e 8h por pessoa com horas no dia
+        hours_by_member = distribute_hours(main_tasks, date, date, today)
+        daily_hours = sum(hours_by_member.values())
+        daily_capacity = len([member for member in hours_by_member if member is not None]) * HOURS_PER_DAY
+        result['planning']['total_planned_hours'] = _rounded(daily_hours)
+        result['capacity'] = {
+            'operational_capacity_rate': _rounded(daily_hours / daily_capacity * 100 if daily_capacity else 0),
+            'planned_hours_day': _rounded(daily_hours),
+            'max_capacity_day': daily_capacity,
+        }
+        result['period'] = {'mode': 'day', 'date': date.isoformat(), 'business_day': True}
+        return result
+
+    # Modo geral: tarefas com prazo na semana de referência (segunda a sexta)
+    start_of_week, end_of_week = get_week_bounds(week or today)
+    planned_hours = 0
+    max_capacity = 0
+    if queryset.filter(prazo__isnull=False).exists():
+        planned_hours = queryset.filter(prazo__gte=start_of_week, prazo__lte=end_of_week).aggregate(
+            hours=Sum('tempo_estimado'),
+        )['hours'] or 0
+        max_capacity = totals['members'] * HOURS_PER_WEEK
+    result['capacity'] = {
+        'operational_capacity_rate': _rounded(planned_hours / max_capacity * 100 if max_capacity else 0),
+        'planned_hours_week': _rounded(planned_hours),
+        'max_capacity_week': max_capacity,
+    }
+    result['period'] = {
+        'mode': 'week',
+        'start': start_of_week.isoformat(),
+        'end': end_of_week.isoformat(),
+    }
+    return result
+
+
+def _empty_kpis(period, date, business_day):
+    return {
+        'delivery_performance': {'on_time_rate': 0, 'on_time_count': 0, 'total_completed': 0},
+        'quality': {'incident_free_rate': 0, 'clean_projects': 0, 'total_projects': 0},
+        'planning': {'total_planned_hours': 0},
+        'efficiency': {'average_lead_time': 0},
+        'capacity': {'operational_capacity_rate': 0, 'planned_hours_day': 0, 'max_capacity_day': 0},
+        'period': {'mode': period, 'date': date.isoformat(), 'business_day': business_day},
+    }
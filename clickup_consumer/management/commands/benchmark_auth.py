@@ -0,0 +1,53 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from knox.auth import TokenAuthentication
+from knox.models import get_token_model
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from clickup_consumer.authentication import CachedTokenAuthentication, token_cache
+
+
+class Command(BaseCommand):
+    """
+    Compara o custo por requisição da autenticação Knox padrão com a
+    CachedTokenAuthentication. Cria um usuário e um token temporários e
+    desfaz tudo ao final:
+    python manage.py benchmark_auth --iterations 2000
+    """
+    help = 'Mede o tempo e as consultas por autenticação (Knox x Knox com cache).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000,
+                            help='Autenticações por classe (padrão: 2000).')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(username='benchmark-auth-user')
+            _, token = get_token_model().objects.create(user=user)
+            factory = APIRequestFactory()
+
+            for authentication_class in (TokenAuthentication, CachedTokenAuthentication):
+                token_cache.clear()
+                authenticator = authentication_class()
+
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    for _ in range(iterations):
+                        request = Request(factory.get('/api/tasks/', HTTP_AUTHORIZATION=f'Token {token}'))
+                        authenticator.authenticate(request)
+                    elapsed = time.perf_counter() - start
+
+                self.stdout.write(f"\n{authentication_class.__name__}:")
+                self.stdout.write(f"  {elapsed / iterations * 1e6:.0f} µs por autenticação ({iterations / elapsed:,.0f}/s)")
+                self.stdout.write(f"  {len(queries) / iterations:.3f} consultas por autenticação")
+
+            token_cache.clear()
+            # Remove o usuário e o token criados para a medição
+            transaction.set_rollback(True)
@@ -0,0 +1,95 @@
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from clickup_dashboards.utils.calculate_dates import (
+    calculate_incident_free_rate,
+    calculate_kpis,
+    calculate_lead_time,
+    calculate_on_time_delivery_rate,
+    calculate_operational_capacity,
+    calculate_total_planned_hours,
+    prepare_kpi_frame,
+    _metrics_dict,
+)
+
+
+class Command(BaseCommand):
+    """
+    Compara o cálculo dos KPIs dos dashboards no caminho antigo (cada função
+    converte as datas e percorre o DataFrame de novo, sobre uma cópia) com o
+    calculate_kpis (uma passada sobre o DataFrame já tipado).
+
+    Usa tarefas sintéticas, sem acessar o banco:
+    python manage.py benchmark_kpis --rows 100000 1000000
+    """
+    help = 'Mede o cálculo dos KPIs dos dashboards (funções separadas x calculate_kpis).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000],
+                            help='Quantidades de tarefas (padrão: 100000 1000000).')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Repetições por medição; vale o melhor tempo (padrão: 3).')
+
+    def handle(self, *args, **options):
+        for total_rows in options['rows']:
+            df = self.build_tasks(total_rows)
+
+            legacy_time, legacy_metrics = self.measure(self.metrics_legacy, df, options['repeat'])
+            prepare_time, prepared = self.measure(prepare_kpi_frame, df, options['repeat'])
+            engine_time, engine_metrics = self.measure(calculate_kpis, prepared, options['repeat'])
+
+            self.stdout.write(f"\n{total_rows} tarefas:")
+            self.stdout.write(f"  Funções separadas: {legacy_time:.3f}s")
+            self.stdout.write(f"  prepare_kpi_frame: {prepare_time:.3f}s (uma vez por versão do conjunto)")
+            self.stdout.write(f"  calculate_kpis:    {engine_time:.3f}s ({total_rows / engine_time:,.0f} tarefas/s)")
+            self.stdout.write(self.style.SUCCESS(f"  Ganho por cálculo: {legacy_time / engine_time:.1f}x"))
+            if engine_metrics != legacy_metrics:
+                self.stdout.write(self.style.ERROR("  Resultados diferentes do caminho antigo!"))
+
+    def build_tasks(self, total_rows):
+        """Gera tarefas com as colunas e a distribuição aproximada das reais (datas como texto, como no JSON)."""
+        rng = np.random.default_rng(42)
+        base_date = np.datetime64('2025-01-01')
+        listas = np.array(['Design', 'Desenvolvimento', 'Marketing', 'Suporte', 'Incidentes'], dtype=object)
+        pessoas = np.array([f'Responsável {i}' for i in range(30)], dtype=object)
+        projetos = np.array([f'Projeto {i}' for i in range(max(total_rows // 20, 1))], dtype=object)
+
+        inicio = base_date + rng.integers(0, 365, total_rows).astype('timedelta64[D]')
+        fechamento = inicio + rng.integers(0, 30, total_rows).astype('timedelta64[D]')
+        fechamento[rng.random(total_rows) >= 0.6] = np.datetime64('NaT')
+        prazo = inicio + rng.integers(1, 20, total_rows).astype('timedelta64[D]')
+
+        return pd.DataFrame({
+            'clickup_id': [f'86a{task_id:07d}' for task_id in range(total_rows)],
+            'data_inicio': np.datetime_as_string(inicio),
+            'data_fechamento': np.where(np.isnat(fechamento), None, np.datetime_as_string(fechamento)),
+            'prazo': np.datetime_as_string(prazo),
+            'responsavel': pessoas[rng.integers(0, len(pessoas), total_rows)],
+            'tags': np.where(rng.random(total_rows) < 0.9, projetos[rng.integers(0, len(projetos), total_rows)], None),
+            'parent_id': np.where(rng.random(total_rows) < 0.8, None, '86a0000000'),
+            'tempo_estimado': np.round(rng.uniform(0.5, 40, total_rows), 2),
+            'lista_origem': listas[rng.integers(0, len(listas), total_rows)],
+        })
+
+    def metrics_legacy(self, df):
+        # Reproduz o calculate_all_metrics anterior: cada KPI converte e percorre o DataFrame
+        df = df.copy()
+        on_time = calculate_on_time_delivery_rate(df)
+        incident = calculate_incident_free_rate(df)
+        total_planned_hours = calculate_total_planned_hours(df)
+        capacity = calculate_operational_capacity(df)
+        avg_lead_time, _ = calculate_lead_time(df)
+        return _metrics_dict(on_time, incident, total_planned_hours, capacity, avg_lead_time)
+
+    def measure(self, function, df, repeat):
+        best = None
+        result = None
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            result = function(df)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
@@ -0,0 +1,90 @@
+import datetime
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from clickup_consumer.renderers import FastJSONRenderer, orjson
+
+
+class Command(BaseCommand):
+    """
+    Compara a serialização de uma página da API de tarefas no caminho antigo
+    (loop de isoformat + JSONRenderer do DRF) com o FastJSONRenderer.
+
+    Usa linhas sintéticas no formato do .values() de ClickUpTask, sem acessar o banco:
+    python manage.py benchmark_serialization --rows 10000 100000
+    """
+    help = 'Mede a vazão de serialização JSON da API de tarefas (caminho antigo x orjson).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000],
+                            help='Quantidades de linhas a serializar (padrão: 10000 100000).')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Repetições por medição; vale o melhor tempo (padrão: 3).')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson não instalado: o FastJSONRenderer usa o JSONRenderer do DRF."))
+
+        for total_rows in options['rows']:
+            rows = self.build_rows(total_rows)
+            legacy_time, legacy_size = self.measure(self.render_legacy, rows, options['repeat'])
+            fast_time, fast_size = self.measure(self.render_fast, rows, options['repeat'])
+
+            self.stdout.write(f"\n{total_rows} linhas:")
+            self.stdout.write(f"  Caminho antigo:  {legacy_time:.3f}s ({total_rows / legacy_time:,.0f} linhas/s, {legacy_size / 1e6:.1f} MB)")
+            self.stdout.write(f"  FastJSONRenderer: {fast_time:.3f}s ({total_rows / fast_time:,.0f} linhas/s, {fast_size / 1e6:.1f} MB)")
+            self.stdout.write(self.style.SUCCESS(f"  Ganho: {legacy_time / fast_time:.1f}x"))
+
+    def build_rows(self, total_rows):
+        """Gera linhas com a mesma forma e tipos do .values() do modelo."""
+        rng = random.Random(42)
+        base_date = datetime.date(2025, 1, 1)
+        listas = ['Design', 'Desenvolvimento', 'Marketing', 'Suporte', 'Comercial']
+        pessoas = [f'Responsável {i}' for i in range(30)]
+        rows = []
+        for task_id in range(1, total_rows + 1):
+            inicio = base_date + datetime.timedelta(days=rng.randint(0, 365))
+            rows.append({
+                'id': task_id,
+                'clickup_id': f'86a{task_id:07d}',
+                'task_nome': f'Tarefa {task_id}',
+                'status': rng.choice(['to do', 'in progress', 'done']),
+                'data_criacao': inicio - datetime.timedelta(days=rng.randint(0, 30)),
+                'data_atualizacao': inicio + datetime.timedelta(days=rng.randint(0, 30)),
+                'data_fechamento': inicio + datetime.timedelta(days=rng.randint(0, 30)) if rng.random() < 0.6 else None,
+                'data_inicio': inicio,
+                'prazo': inicio + datetime.timedelta(days=rng.randint(1, 20)),
+                'responsavel': rng.choice(pessoas),
+                'tags': 'retrabalho' if rng.random() < 0.1 else None,
+                'parent_id': None,
+                'prioridade': rng.choice(['urgent', 'high', 'normal', 'low']),
+                'tempo_estimado': round(rng.uniform(0.5, 40), 2),
+                'lista_origem': rng.choice(listas),
+            })
+        return rows
+
+    def render_legacy(self, rows):
+        # Reproduz o TaskListAPIView anterior: copia e converte as datas em Python
+        tasks = [dict(row) for row in rows]
+        for task in tasks:
+            for key, value in task.items():
+                if isinstance(value, (datetime.date, datetime.datetime)):
+                    task[key] = value.isoformat()
+        return JSONRenderer().render({'tasks': tasks, 'next_cursor': None})
+
+    def render_fast(self, rows):
+        tasks = [dict(row) for row in rows]
+        return FastJSONRenderer().render({'tasks': tasks, 'next_cursor': None})
+
+    def measure(self, render, rows, repeat):
+        best = None
+        size = 0
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            size = len(render(rows))
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, size
@@ -0,0 +1,87 @@
+import os
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    Teste de carga local da API: dispara requisições concorrentes contra um
+    servidor já em execução e mede vazão e latência.
+
+    Rode uma vez contra o deploy WSGI e outra contra o ASGI para comparar:
+    python manage.py load_test_api --url http://127.0.0.1:8000/api/tasks/ --concurrency 20 --requests 400 --param stream=true
+    """
+    help = 'Mede a vazão da API sob requisições concorrentes (WSGI x ASGI).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/api/tasks/',
+                            help='Endpoint testado (padrão: http://127.0.0.1:8000/api/tasks/).')
+        parser.add_argument('--token', default=os.getenv('DJANGO_API_TOKEN'),
+                            help='Token Knox (padrão: variável DJANGO_API_TOKEN).')
+        parser.add_argument('--concurrency', type=int, default=20,
+                            help='Clientes simultâneos (padrão: 20).')
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Total de requisições (padrão: 200).')
+        parser.add_argument('--param', action='append', default=[],
+                            help='Parâmetro de query no formato chave=valor (pode ser repetido).')
+        parser.add_argument('--label', default='',
+                            help='Nome do cenário exibido no resultado (ex.: wsgi, asgi).')
+
+    def handle(self, *args, **options):
+        if not options['token']:
+            raise CommandError("Informe --token ou defina DJANGO_API_TOKEN.")
+
+        params = {}
+        for param in options['param']:
+            key, separator, value = param.partition('=')
+            if not separator:
+                raise CommandError(f"Parâmetro inválido: {param}. Use chave=valor.")
+            params[key] = value
+
+        headers = {'Authorization': f"Token {options['token']}"}
+        sessions = threading.local()
+
+        def send_request(_):
+            # Uma sessão por thread reaproveita a conexão, como um cliente real
+            if not hasattr(sessions, 'session'):
+                sessions.session = requests.Session()
+            start = time.perf_counter()
+            try:
+                response = sessions.session.get(options['url'], headers=headers, params=params)
+                # Consome o corpo inteiro, inclusive respostas em streaming
+                size = len(response.content)
+                status = response.status_code
+            except requests.exceptions.RequestException as e:
+                size = 0
+                status = type(e).__name__
+            return time.perf_counter() - start, status, size
+
+        label = f" [{options['label']}]" if options['label'] else ''
+        self.stdout.write(
+            f"Disparando {options['requests']} requisições com {options['concurrency']} clientes "
+            f"contra {options['url']}{label}..."
+        )
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            results = list(executor.map(send_request, range(options['requests'])))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(result[0] for result in results)
+        statuses = Counter(result[1] for result in results)
+        total_bytes = sum(result[2] for result in results)
+
+        self.stdout.write(f"\nTempo total: {elapsed:.2f}s")
+        self.stdout.write(self.style.SUCCESS(f"Vazão: {len(results) / elapsed:.1f} req/s ({total_bytes / elapsed / 1e6:.1f} MB/s)"))
+        self.stdout.write(
+            f"Latência: p50 {statistics.median(latencies) * 1000:.0f}ms | "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f}ms | "
+            f"máx {latencies[-1] * 1000:.0f}ms"
+        )
+        self.stdout.write(f"Status: {dict(statuses)}")
@@ -2,14 +2,28 @@
 
 import os
 import pandas as pd
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from dotenv import load_dotenv
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 # Importa as funções do consumidor de API e o modelo
 from clickup_consumer.api_consumer import _fetch_and_transform_single_list
-from clickup_consumer.models import ClickUpTask
+from clickup_consumer.models import ClickUpTask, DeletedClickUpTask
+from clickup_consumer.changes import task_content_hash
+from clickup_consumer.versioning import bump_dataset_version
+from clickup_consumer.response_cache import clear_response_cache
+from clickup_consumer.arrow_export import arrow_available, write_arrow_snapshot
+from clickup_consumer.filters import TASK_FIELDS
+from clickup_main.db_routers import use_primary
+
+# Campos regravados quando o conteúdo de uma tarefa muda
+UPDATE_FIELDS = [
+    field.name for field in ClickUpTask._meta.concrete_fields
+    if not field.primary_key and field.name != 'clickup_id'
+]
 
 class Command(BaseCommand):
     """
@@ -54,6 +68,14 @@ class Command(BaseCommand):
         
         return df
 
+    @staticmethod
+    def to_date(value):
+        """Converte um valor do DataFrame em date (ou None para valores vazios)."""
+        timestamp = pd.to_datetime(value, errors='coerce')
+        return None if pd.isna(timestamp) else timestamp.date()
+
+    # O ETL lê e escreve sempre no primário, nunca na réplica
+    @use_primary()
     def handle(self, *args, **options):
         """
         Lógica principal do comando que é executada.
@@ -115,14 +137,8 @@ class Command(BaseCommand):
 
         self.stdout.write(f"Iniciando a população do banco de dados com {len(final_df)} registros...")
         
-        # Passo 1: Limpa a tabela antes de popular
-        self.stdout.write("Apagando registros antigos...")
-        deleted_count = ClickUpTask.objects.count()
-        ClickUpTask.objects.all().delete()
-        self.stdout.write(f"Apagados {deleted_count} registros antigos.")
-        
-        # Passo 2: Salvar todas as tarefas
-        successful_inserts = 0
+        # Passo 1: Converte as linhas para os campos do modelo
+        tasks_by_id = {}
         failed_inserts = 0
         
         for index, row in final_df.iterrows():
@@ -132,18 +148,18 @@ class Command(BaseCommand):
                     'clickup_id': str(row.get('clickup_id', '')),
                     'task_nome': str(row.get('task_nome', 'N/A')),
                     'status': str(row.get('status', 'N/A')),
-                    'data_criacao': pd.to_datetime(row.get('data_criacao'), errors='coerce'),
-                    'data_atualizacao': pd.to_datetime(row.get('data_atualizacao'), errors='coerce'),
-                    'data_fechamento': pd.to_datetime(row.get('data_fechamento'), errors='coerce'),
-                    'data_done': pd.to_datetime(row.get('data_done'), errors='coerce'),
+                    'data_criacao': self.to_date(row.get('data_criacao')),
+                    'data_atualizacao': self.to_date(row.get('data_atualizacao')),
+                    'data_fechamento': self.to_date(row.get('data_fechamento')),
+                    'data_done': self.to_date(row.get('data_done')),
                     'arquivado': bool(row.get('arquivado', False)),
                     'criado_por': str(row.get('criado_por', 'N/A')),
                     'responsavel': str(row.get('responsavel', 'N/A')),
                     'tags': str(row.get('tags', '')) if not pd.isna(row.get('tags')) else None,
                     'parent_id': str(row.get('parent_id')) if not pd.isna(row.get('parent_id')) else None,
                     'prioridade': str(row.get('prioridade', 'N/A')),
-                    'prazo': pd.to_datetime(row.get('prazo'), errors='coerce'),
-                    'data_inicio': pd.to_datetime(row.get('data_inicio'), errors='coerce'),
+                    'prazo': self.to_date(row.get('prazo')),
+                    'data_inicio': self.to_date(row.get('data_inicio')),
                     'pontos': float(row.get('pontos')) if not pd.isna(row.get('pontos')) else None,
                     'tempo_estimado': float(row.get('tempo_estimado')) if not pd.isna(row.get('tempo_estimado')) else None,
                     'id_equipe': str(row.get('id_equipe', '')),
@@ -153,22 +169,75 @@ class Command(BaseCommand):
                     'cor_prioridade': str(row.get('cor_prioridade', 'N/A')),
                     'nome_da_entrega': str(row.get('nome_da_entrega', 'N/A')),
                     'cor_entrega': str(row.get('cor_entrega', 'N/A')),
-                    'data_de_termino_real': pd.to_datetime(row.get('data_de_termino_real'), errors='coerce')
+                    'data_de_termino_real': self.to_date(row.get('data_de_termino_real'))
                 }
-            
-                # Cria o registro no banco de dados
-                ClickUpTask.objects.create(**task_data)
-                successful_inserts += 1
                 
-                # Log de progresso a cada 100 registros
-                if successful_inserts % 100 == 0:
-                    self.stdout.write(f"  Processados {successful_inserts} registros...")
+                if task_data['clickup_id'] in tasks_by_id:
+                    raise ValueError("clickup_id duplicado")
+                task_data['hash_conteudo'] = task_content_hash(task_data)
+                tasks_by_id[task_data['clickup_id']] = task_data
                 
             except Exception as e:
                 failed_inserts += 1
                 self.stderr.write(self.style.ERROR(f"Erro ao processar registro {index} (ID: {row.get('clickup_id', 'N/A')}): {e}"))
-                
-        self.stdout.write(self.style.SUCCESS("Sincronização com o banco de dados concluída!"))
-        self.stdout.write(f"Registros inseridos com sucesso: {successful_inserts}")
+        
+        # Passo 2: Compara com o banco pelo hash e grava apenas o que mudou.
+        # Tudo acontece em uma transação: os leitores veem a versão anterior
+        # completa até o commit, e a nova versão (dados + número) de uma só vez.
+        existing = {
+            clickup_id: (pk, content_hash)
+            for pk, clickup_id, content_hash in ClickUpTask.objects.values_list('id', 'clickup_id', 'hash_conteudo')
+        }
+        new_tasks = [task for clickup_id, task in tasks_by_id.items() if clickup_id not in existing]
+        changed_tasks = [
+            task for clickup_id, task in tasks_by_id.items()
+            if clickup_id in existing and existing[clickup_id][1] != task['hash_conteudo']
+        ]
+        removed_ids = [clickup_id for clickup_id in existing if clickup_id not in tasks_by_id]
+        
+        with transaction.atomic():
+            # Publica a nova versão do conjunto, invalidando os ETags anteriores
+            version = bump_dataset_version(len(tasks_by_id))
+            
+            ClickUpTask.objects.bulk_create(
+                [ClickUpTask(versao=version.id, **task) for task in new_tasks],
+                batch_size=500,
+            )
+            ClickUpTask.objects.bulk_update(
+                [ClickUpTask(id=existing[task['clickup_id']][0], versao=version.id, **task) for task in changed_tasks],
+                fields=UPDATE_FIELDS,
+                batch_size=500,
+            )
+            
+            ClickUpTask.objects.filter(clickup_id__in=removed_ids).delete()
+            DeletedClickUpTask.objects.bulk_create(
+                [DeletedClickUpTask(clickup_id=clickup_id, versao=version.id) for clickup_id in removed_ids],
+                batch_size=500,
+            )
+            
+            # Mantém apenas os registros de remoção usados pelo endpoint de mudanças
+            retention = getattr(settings, 'CLICKUP_CHANGES_RETENTION_VERSIONS', 50)
+            DeletedClickUpTask.objects.filter(versao__lt=version.id - retention).delete()
+        
+        # As respostas em cache da versão anterior não serão mais usadas
+        clear_response_cache()
+        
+        # Publica o snapshot Arrow lido pelos dashboards via memory-map
+        snapshot_path = getattr(settings, 'CLICKUP_SNAPSHOT_PATH', '')
+        if snapshot_path and arrow_available():
+            try:
+                write_arrow_snapshot(snapshot_path, version, TASK_FIELDS, settings.CLICKUP_API_STREAM_CHUNK_SIZE)
+                self.stdout.write(f"Snapshot Arrow publicado em {snapshot_path}")
+            except OSError as e:
+                self.stderr.write(self.style.WARNING(f"Não foi possível publicar o snapshot Arrow: {e}"))
+        
+        successful_inserts = len(tasks_by_id)
+        self.stdout.write(
+            f"Novas: {len(new_tasks)} | Alteradas: {len(changed_tasks)} | "
+            f"Sem alteração: {successful_inserts - len(new_tasks) - len(changed_tasks)} | Removidas: {len(removed_ids)}"
+        )
+        
+        self.stdout.write(self.style.SUCCESS(f"Sincronização com o banco de dados concluída! Versão {version}"))
+        self.stdout.write(f"Registros sincronizados com sucesso: {successful_inserts}")
         if failed_inserts > 0:
             self.stdout.write(self.style.WARNING(f"Registros com falha: {failed_inserts}"))
\ No newline at end of file
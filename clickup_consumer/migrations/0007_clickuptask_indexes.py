@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clickup_consumer', '0006_alter_clickuptask_table'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clickuptask',
+            index=models.Index(fields=['lista_origem', 'responsavel'], name='clickuptask_lista_resp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clickuptask',
+            index=models.Index(fields=['responsavel'], name='clickuptask_responsavel_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clickuptask',
+            index=models.Index(fields=['status'], name='clickuptask_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clickuptask',
+            index=models.Index(fields=['parent_id'], name='clickuptask_parent_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clickuptask',
+            index=models.Index(fields=['prazo'], name='clickuptask_prazo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clickuptask',
+            index=models.Index(fields=['data_inicio'], name='clickuptask_data_inicio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clickuptask',
+            index=models.Index(fields=['data_fechamento'], name='clickuptask_data_fech_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clickuptask',
+            index=models.Index(fields=['data_atualizacao', 'id'], name='clickuptask_data_atual_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clickup_consumer', '0007_clickuptask_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('criado_em', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('total_tarefas', models.IntegerField(default=0, verbose_name='Total de Tarefas')),
+            ],
+            options={
+                'db_table': 'clickup_consumer_datasetversion',
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clickup_consumer', '0008_datasetversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clickuptask',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, default='', max_length=40, verbose_name='Hash do Conteúdo'),
+        ),
+        migrations.AddField(
+            model_name='clickuptask',
+            name='versao',
+            field=models.BigIntegerField(default=0, verbose_name='Versão'),
+        ),
+        migrations.AddIndex(
+            model_name='clickuptask',
+            index=models.Index(fields=['versao'], name='clickuptask_versao_idx'),
+        ),
+        migrations.CreateModel(
+            name='DeletedClickUpTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clickup_id', models.CharField(max_length=255, verbose_name='ID da Tarefa ClickUp')),
+                ('versao', models.BigIntegerField(verbose_name='Versão')),
+            ],
+            options={
+                'db_table': 'clickup_consumer_deletedclickuptask',
+                'indexes': [models.Index(fields=['versao'], name='deletedtask_versao_idx')],
+            },
+        ),
+    ]
@@ -145,8 +145,85 @@ class ClickUpTask(models.Model):
         verbose_name="Data de Término Real"
     )
     
+    # Controle de mudanças preenchido pelo loader: hash do conteúdo da tarefa
+    # e versão (DatasetVersion) em que ela foi criada ou alterada pela última vez
+    hash_conteudo = models.CharField(
+        max_length=40,
+        blank=True,
+        default='',
+        verbose_name="Hash do Conteúdo"
+    )
+    
+    versao = models.BigIntegerField(
+        default=0,
+        verbose_name="Versão"
+    )
+    
     class Meta:
         db_table = 'clickup_consumer_clickuptask'
+        # Índices para os filtros da API de tarefas
+        indexes = [
+            models.Index(fields=['lista_origem', 'responsavel'], name='clickuptask_lista_resp_idx'),
+            models.Index(fields=['responsavel'], name='clickuptask_responsavel_idx'),
+            models.Index(fields=['status'], name='clickuptask_status_idx'),
+            models.Index(fields=['parent_id'], name='clickuptask_parent_id_idx'),
+            models.Index(fields=['prazo'], name='clickuptask_prazo_idx'),
+            models.Index(fields=['data_inicio'], name='clickuptask_data_inicio_idx'),
+            models.Index(fields=['data_fechamento'], name='clickuptask_data_fech_idx'),
+            models.Index(fields=['data_atualizacao', 'id'], name='clickuptask_data_atual_idx'),
+            models.Index(fields=['versao'], name='clickuptask_versao_idx'),
+        ]
+
+    def __str__(self):
+        return self.task_nome
+
+
+class DatasetVersion(models.Model):
+    """
+    Registra cada sincronização concluída do conjunto de tarefas.
+
+    O 'id' funciona como número de versão: a API usa a versão mais recente
+    para gerar ETag/Last-Modified e responder 304 quando nada mudou.
+    """
+    criado_em = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Criado em"
+    )
+    
+    total_tarefas = models.IntegerField(
+        default=0,
+        verbose_name="Total de Tarefas"
+    )
+    
+    class Meta:
+        db_table = 'clickup_consumer_datasetversion'
+
+    def __str__(self):
+        return f"v{self.id}"
+
+
+
+class DeletedClickUpTask(models.Model):
+    """
+    Registro das tarefas removidas do ClickUp em cada sincronização.
+
+    Permite que o endpoint de mudanças informe aos clientes quais tarefas
+    devem ser descartadas desde uma versão conhecida.
+    """
+    clickup_id = models.CharField(
+        max_length=255,
+        verbose_name="ID da Tarefa ClickUp"
+    )
+    
+    versao = models.BigIntegerField(
+        verbose_name="Versão"
+    )
+    
+    class Meta:
+        db_table = 'clickup_consumer_deletedclickuptask'
+        indexes = [
+            models.Index(fields=['versao'], name='deletedtask_versao_idx'),
+        ]
 
     def __str__(self):
-        return self.task_nome
\ No newline at end of file
+        return f"{self.clickup_id} (v{self.versao})"
@@ -0,0 +1,164 @@
+# clickup_consumer/pagination.py
+
+import base64
+import binascii
+import datetime
+import json
+
+from django.conf import settings
+from django.db.models import F, Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+
+# Ordenações suportadas e as colunas que compõem a chave do cursor.
+# A última coluna é sempre 'id', o que garante uma ordem total e estável.
+ORDERINGS = {
+    'id': ('id',),
+    'data_atualizacao': ('data_atualizacao', 'id'),
+}
+
+
+class TaskKeysetPagination:
+    """
+    Paginação por keyset (seek) para a API de tarefas.
+
+    Em vez de OFFSET, cada página continua a partir da última chave retornada
+    ('id' ou '(data_atualizacao, id)'), então o custo por página é constante
+    e os cursores continuam válidos mesmo com inserções durante a leitura.
+
+    Parâmetros de query aceitos:
+        page_size: Quantidade de tarefas por página (limitada por CLICKUP_API_MAX_PAGE_SIZE)
+        ordering: 'id' (padrão) ou 'data_atualizacao'
+        cursor: Valor 'next_cursor' retornado pela página anterior
+    """
+    page_size_query_param = 'page_size'
+    ordering_query_param = 'ordering'
+    cursor_query_param = 'cursor'
+
+    def __init__(self):
+        self.default_page_size = getattr(settings, 'CLICKUP_API_PAGE_SIZE', 5000)
+        self.max_page_size = getattr(settings, 'CLICKUP_API_MAX_PAGE_SIZE', 20000)
+        self.page_size = self.default_page_size
+        self.ordering = 'id'
+        self.next_cursor = None
+
+    def get_page_size(self, request):
+        """Lê e valida o tamanho de página solicitado."""
+        raw_value = request.query_params.get(self.page_size_query_param)
+        if raw_value is None:
+            return self.default_page_size
+        try:
+            page_size = int(raw_value)
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: "Deve ser um número inteiro."})
+        if page_size <= 0:
+            raise ValidationError({self.page_size_query_param: "Deve ser maior que zero."})
+        return min(page_size, self.max_page_size)
+
+    def encode_cursor(self, ordering, position):
+        """Serializa a ordenação e a última chave da página em um token opaco."""
+        payload = json.dumps({'o': ordering, 'p': position}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, cursor):
+        """Recupera (ordenação, posição) de um token gerado por encode_cursor."""
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            ordering = payload['o']
+            position = payload['p']
+            if ordering not in ORDERINGS or len(position) != len(ORDERINGS[ordering]):
+                raise ValueError(ordering)
+            if ordering == 'data_atualizacao' and position[0] is not None:
+                position[0] = datetime.date.fromisoformat(position[0])
+            position[-1] = int(position[-1])
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+            raise ValidationError({self.cursor_query_param: "Cursor inválido."})
+        return ordering, position
+
+    def get_ordering_expressions(self, ordering):
+        if ordering == 'data_atualizacao':
+            # Tarefas sem data de atualização vêm primeiro, em qualquer banco
+            return [F('data_atualizacao').asc(nulls_first=True), 'id']
+        return ['id']
+
+    def get_position_filter(self, ordering, position):
+        """Monta o filtro 'depois da posição' equivalente ao keyset."""
+        if ordering == 'data_atualizacao':
+            last_date, last_id = position
+            if last_date is None:
+                return Q(data_atualizacao__isnull=True, id__gt=last_id) | Q(data_atualizacao__isnull=False)
+            return Q(data_atualizacao__gt=last_date) | Q(data_atualizacao=last_date, id__gt=last_id)
+        return Q(id__gt=position[0])
+
+    def get_position(self, ordering, row):
+        """Extrai a chave do cursor de uma linha (dict de .values())."""
+        position = []
+        for column in ORDERINGS[ordering]:
+            value = row[column]
+            if isinstance(value, datetime.date):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    def resolve_ordering(self, request):
+        """Define a ordenação e a posição de partida a partir do cursor ou do parâmetro 'ordering'."""
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            # O cursor carrega a própria ordenação, mantendo as páginas consistentes
+            self.ordering, position = self.decode_cursor(cursor)
+        else:
+            self.ordering = request.query_params.get(self.ordering_query_param, 'id')
+            if self.ordering not in ORDERINGS:
+                raise ValidationError({
+                    self.ordering_query_param: f"Ordenação inválida. Opções: {', '.join(ORDERINGS)}."
+                })
+            position = None
+        return self.ordering, position
+
+    def get_key_fields(self, request):
+        """Colunas que precisam estar no .values() para montar o próximo cursor."""
+        ordering, _ = self.resolve_ordering(request)
+        return ORDERINGS[ordering]
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Ordena e posiciona o queryset a partir do cursor, limitado à página
+        atual mais uma linha (usada apenas para saber se existe próxima página).
+
+        O queryset deve ser um .values() que inclua as colunas de get_key_fields().
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering, position = self.resolve_ordering(request)
+
+        queryset = queryset.order_by(*self.get_ordering_expressions(self.ordering))
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(self.ordering, position))
+        return queryset[:self.page_size + 1]
+
+    def finalize_page(self, rows):
+        """Descarta a linha extra e monta o próximo cursor."""
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            self.next_cursor = self.encode_cursor(self.ordering, self.get_position(self.ordering, rows[-1]))
+        else:
+            self.next_cursor = None
+        return rows
+
+    def paginate_queryset(self, queryset, request):
+        """Retorna a lista de linhas da página atual."""
+        return self.finalize_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request):
+        """Versão assíncrona de paginate_queryset, para as views ASGI."""
+        page = self.get_page_queryset(queryset, request)
+        return self.finalize_page([row async for row in page])
+
+    def get_paginated_response(self, data):
+        return Response({
+            'tasks': data,
+            'next_cursor': self.next_cursor,
+            'page_size': self.page_size,
+            'ordering': self.ordering,
+        })
@@ -0,0 +1,100 @@
+# clickup_consumer/renderers.py
+
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .arrow_export import ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE
+
+try:
+    import orjson
+except ImportError:  # Sem orjson, o JSON é gerado pelo encoder padrão do DRF
+    orjson = None
+
+
+def _default(obj):
+    """
+    Tipos que o orjson não serializa sozinho (ex.: Decimal, timedelta),
+    convertidos pelo encoder do DRF para manter o mesmo JSON.
+    """
+    return JSONEncoder().default(obj)
+
+
+def encode_json(data, indent=False):
+    """
+    Serializa 'data' em bytes UTF-8.
+
+    Com o orjson, datas, datetimes, UUIDs e números são convertidos direto em
+    código nativo, sem passar por um encoder Python objeto a objeto.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_default, option=option)
+
+    return json.dumps(
+        data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False,
+        indent=2 if indent else None, separators=None if indent else (',', ':'),
+    ).encode('utf-8')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer baseado no orjson, registrado como renderer padrão da API.
+
+    Mantém o media type e o formato 'json' do DRF, então a negociação não muda.
+    Se o orjson não estiver instalado, usa o JSONRenderer original.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        return encode_json(data, indent=bool(indent))
+
+
+class ArrowStreamRenderer(BaseRenderer):
+    """
+    Habilita a negociação de 'Accept: application/vnd.apache.arrow.stream'
+    (ou ?format=arrow). O conteúdo é gerado pela view, que já entrega os bytes.
+    """
+    media_type = ARROW_STREAM_MEDIA_TYPE
+    format = 'arrow'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+class ParquetRenderer(BaseRenderer):
+    """
+    Habilita a negociação de 'Accept: application/vnd.apache.parquet'
+    (ou ?format=parquet). O conteúdo é gerado pela view, que já entrega os bytes.
+    """
+    media_type = PARQUET_MEDIA_TYPE
+    format = 'parquet'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Habilita a negociação de 'Accept: text/event-stream' em /api/events/.
+    As mensagens SSE são geradas pela view; erros continuam em JSON.
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
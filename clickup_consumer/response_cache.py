@@ -0,0 +1,133 @@
+# clickup_consumer/response_cache.py
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from .versioning import get_current_version
+
+# Alias do cache em CACHES usado pelas respostas serializadas da API
+CACHE_ALIAS = 'tasks_api'
+
+HITS_KEY = 'stats:hits'
+MISSES_KEY = 'stats:misses'
+
+
+def get_response_cache():
+    return caches[CACHE_ALIAS]
+
+
+def build_cache_key(etag):
+    """
+    Chave de cache de uma resposta.
+
+    O ETag já combina versão do conjunto, caminho, parâmetros e formato, então
+    uma nova sincronização muda todas as chaves de uma só vez.
+    """
+    return 'response:' + etag.strip('"')
+
+
+def _increment(key):
+    cache = get_response_cache()
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # A chave pode ter sido removida entre o add e o incr (ex.: invalidação)
+        cache.set(key, 1, timeout=None)
+
+
+def get_cached_response(key):
+    """Retorna um HttpResponse com o conteúdo salvo, ou None em caso de miss."""
+    entry = get_response_cache().get(key)
+    if entry is None:
+        _increment(MISSES_KEY)
+        return None
+
+    _increment(HITS_KEY)
+    content_type, content = entry
+    response = HttpResponse(content, content_type=content_type)
+    response['X-Cache'] = 'HIT'
+    return response
+
+
+def store_response(key, content, content_type, version):
+    """
+    Salva o conteúdo serializado de uma resposta montada na versão 'version'.
+
+    Se uma sincronização terminou enquanto a resposta era montada, a versão
+    atual já é outra e o conteúdo pode misturar as duas; nesse caso nada é
+    salvo sob a chave da versão antiga. Retorna se a resposta foi salva.
+    """
+    current = get_current_version()
+    if (current.id if current else 0) != (version.id if version else 0):
+        return False
+    get_response_cache().set(key, (content_type, content))
+    return True
+
+
+def cache_streaming_content(key, streaming_content, content_type, version):
+    """
+    Repassa um conteúdo em streaming e, ao final, salva uma cópia no cache.
+
+    O cliente continua recebendo os blocos assim que são gerados. Se o total
+    ultrapassar CLICKUP_API_CACHE_MAX_BYTES a cópia é descartada, mantendo a
+    memória do streaming limitada. A cópia só é salva se 'version' ainda for
+    a atual (ver store_response).
+    """
+    max_bytes = getattr(settings, 'CLICKUP_API_CACHE_MAX_BYTES', 64 * 1024 * 1024)
+    chunks = []
+    size = 0
+    for chunk in streaming_content:
+        if chunks is not None:
+            size += len(chunk)
+            if size > max_bytes:
+                chunks = None
+            else:
+                chunks.append(chunk)
+        yield chunk
+
+    if chunks is not None:
+        store_response(key, b''.join(chunks), content_type, version)
+
+
+async def acache_streaming_content(key, streaming_content, content_type, version):
+    """Versão assíncrona de cache_streaming_content, para streams ASGI."""
+    max_bytes = getattr(settings, 'CLICKUP_API_CACHE_MAX_BYTES', 64 * 1024 * 1024)
+    chunks = []
+    size = 0
+    async for chunk in streaming_content:
+        if chunks is not None:
+            size += len(chunk)
+            if size > max_bytes:
+                chunks = None
+            else:
+                chunks.append(chunk)
+        yield chunk
+
+    if chunks is not None:
+        await sync_to_async(store_response)(key, b''.join(chunks), content_type, version)
+
+
+def clear_response_cache():
+    """
+    Remove todas as respostas salvas e zera os contadores.
+
+    Chamada pelo loader ao publicar uma nova versão; como as chaves incluem a
+    versão, as entradas antigas já deixam de ser usadas no mesmo instante.
+    """
+    get_response_cache().clear()
+
+
+def get_cache_stats():
+    """Contadores de hits/misses desde a última invalidação."""
+    cache = get_response_cache()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total * 100, 2) if total else 0.0,
+    }
@@ -0,0 +1,20 @@
+# clickup_consumer/signals.py
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from knox.models import get_token_model
+
+from .authentication import token_cache
+
+
+@receiver(post_delete, sender=get_token_model())
+def discard_revoked_token(sender, instance, **kwargs):
+    """Logout, logoutall e revogação apagam o token: remove-o do cache."""
+    token_cache.discard(instance.digest)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def discard_user_tokens(sender, instance, **kwargs):
+    """Usuário alterado (ex.: desativado): os tokens dele voltam a ser validados no banco."""
+    token_cache.discard_user(instance.pk)
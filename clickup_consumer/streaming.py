@@ -0,0 +1,57 @@
+# clickup_consumer/streaming.py
+
+from .renderers import encode_json
+
+
+def stream_tasks_json(queryset, chunk_size=2000):
+    """
+    Gera o documento {"tasks": [...]} em pedaços, direto do cursor do banco.
+
+    O queryset é percorrido com .iterator(chunk_size=...), que no PostgreSQL
+    usa um cursor no servidor. Assim nem a lista de dicionários nem a string
+    JSON completa existem em memória: cada bloco de 'chunk_size' linhas é
+    serializado e enviado assim que lido.
+
+    Args:
+        queryset (QuerySet): Queryset .values() já filtrado e ordenado
+        chunk_size (int): Linhas buscadas no banco e enviadas por bloco
+
+    Yields:
+        bytes: Fragmentos consecutivos do documento JSON
+    """
+    yield b'{"tasks":['
+    separator = b''
+    buffer = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        buffer.append(row)
+        if len(buffer) >= chunk_size:
+            # Serializa o bloco como lista e remove os colchetes externos
+            yield separator + encode_json(buffer)[1:-1]
+            separator = b','
+            buffer = []
+
+    if buffer:
+        yield separator + encode_json(buffer)[1:-1]
+    yield b']}'
+
+
+async def astream_tasks_json(queryset, chunk_size=2000):
+    """
+    Versão assíncrona de stream_tasks_json, para servidores ASGI.
+
+    Usa .aiterator(), então o event loop continua atendendo outras
+    requisições enquanto os blocos são lidos do banco.
+    """
+    yield b'{"tasks":['
+    separator = b''
+    buffer = []
+    async for row in queryset.aiterator(chunk_size=chunk_size):
+        buffer.append(row)
+        if len(buffer) >= chunk_size:
+            yield separator + encode_json(buffer)[1:-1]
+            separator = b','
+            buffer = []
+
+    if buffer:
+        yield separator + encode_json(buffer)[1:-1]
+    yield b']}'
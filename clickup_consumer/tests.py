@@ -1,3 +1,802 @@
-from django.test import TestCase
+import datetime
+import decimal
+import io
+import json
+import os
+import tempfile
+from datetime import date
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+import pandas as pd
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from knox.auth import TokenAuthentication
+from knox.models import AuthToken
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from clickup_dashboards.utils.calculate_dates import create_daily_log
+from clickup_dashboards.utils.snapshot_cache import arrow_snapshot_version, load_arrow_snapshot
+from clickup_main import db_routers
+
+from .arrow_export import arrow_available, pa, pq, write_arrow_snapshot
+from .authentication import token_cache
+from .events import astream_version_events, format_version_event, stream_version_events
+from .filters import TASK_FIELDS
+from .management.commands import sync_clickup_data_direct as sync_command
+from .models import ClickUpTask, DeletedClickUpTask
+from .renderers import FastJSONRenderer
+from .response_cache import build_cache_key, clear_response_cache, get_response_cache
+from .versioning import bump_dataset_version, get_current_version
+from .views import TaskListAPIView, VersionedAPIView
+
+# Cache de respostas em memória nos testes (o padrão grava em .cache/tasks_api)
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'tasks_api': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-tasks-api'},
+}
+
+
+def make_task(clickup_id, **fields):
+    """Cria uma tarefa com os campos obrigatórios preenchidos."""
+    defaults = {
+        'task_nome': f'Tarefa {clickup_id}',
+        'status': 'aberta',
+        'criado_por': 'Ana',
+        'responsavel': 'Ana',
+        'prioridade': 'normal',
+        'id_equipe': '1',
+        'nivel_permissao': 'leitura',
+        'espaco': 'Espaço',
+        'lista_origem': 'Design',
+        'cor_prioridade': '#000000',
+        'nome_da_entrega': 'Entrega',
+        'cor_entrega': '#ffffff',
+    }
+    return ClickUpTask.objects.create(clickup_id=clickup_id, **{**defaults, **fields})
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ApiTestCase(APITestCase):
+    """Base dos testes da API: usuário autenticado e cache de respostas vazio."""
+
+    def setUp(self):
+        clear_response_cache()
+        self.user = get_user_model().objects.create_user('ana', password='senha-de-teste')
+        self.client.force_authenticate(self.user)
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    """Leituras vão para a réplica só enquanto ela estiver em dia."""
+
+    def setUp(self):
+        self.router = db_routers.ReplicaRouter()
+        # Réplica configurada e nenhuma verificação de atraso feita ainda
+        patches = (
+            patch.dict(settings.DATABASES, {'replica': settings.DATABASES['default']}),
+            patch.dict(db_routers._lag_state, {'checked_at': 0.0, 'healthy': False}),
+        )
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def stub_lag(self, **kwargs):
+        patcher = patch.object(db_routers, 'replica_lag_seconds', **kwargs)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_reads_go_to_replica_when_in_sync(self):
+        lag = self.stub_lag(return_value=0.5)
+        self.assertEqual(self.router.db_for_read(ClickUpTask), 'replica')
+        self.assertEqual(self.router.db_for_write(ClickUpTask), 'default')
+        # Apps fora de route_app_labels ficam com o roteamento padrão
+        self.assertIsNone(self.router.db_for_read(get_user_model()))
+        lag.assert_called_once()
+
+    @override_settings(DATABASE_REPLICA_MAX_LAG=30)
+    def test_lagging_or_unreachable_replica_falls_back_to_primary(self):
+        self.stub_lag(return_value=120.0)
+        with self.assertLogs('clickup_main.db_routers', 'WARNING'):
+            self.assertEqual(self.router.db_for_read(ClickUpTask), 'default')
+
+        db_routers._lag_state['checked_at'] = 0.0
+        self.stub_lag(side_effect=OSError('connection refused'))
+        with self.assertLogs('clickup_main.db_routers', 'WARNING'):
+            self.assertEqual(self.router.db_for_read(ClickUpTask), 'default')
+
+    @override_settings(DATABASE_REPLICA_LAG_CHECK_INTERVAL=60)
+    def test_lag_check_is_reused_within_interval(self):
+        lag = self.stub_lag(return_value=0.0)
+        for _ in range(3):
+            self.assertEqual(self.router.db_for_read(ClickUpTask), 'replica')
+        lag.assert_called_once()
+
+    def test_use_primary_pins_reads_and_nests(self):
+        self.stub_lag(return_value=0.0)
+        with db_routers.use_primary():
+            with db_routers.use_primary():
+                self.assertEqual(self.router.db_for_read(ClickUpTask), 'default')
+            self.assertEqual(self.router.db_for_read(ClickUpTask), 'default')
+        self.assertEqual(self.router.db_for_read(ClickUpTask), 'replica')
+
+    def test_no_replica_configured(self):
+        lag = self.stub_lag(return_value=0.0)
+        del settings.DATABASES['replica']
+        self.assertEqual(self.router.db_for_read(ClickUpTask), 'default')
+        lag.assert_not_called()
+
+
+class TaskPaginationTests(ApiTestCase):
+    """Paginação por keyset de /api/tasks/."""
+
+    def setUp(self):
+        super().setUp()
+        updates = [date(2025, 5, 2), None, date(2025, 5, 1), date(2025, 5, 2), None]
+        for index, data_atualizacao in enumerate(updates):
+            make_task(f't{index}', data_atualizacao=data_atualizacao)
+
+    def collect(self, **params):
+        """Percorre todas as páginas seguindo o next_cursor."""
+        pages = []
+        response = self.client.get(reverse('tasks-api'), params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            pages.append([task['clickup_id'] for task in data['tasks']])
+            if data['next_cursor'] is None:
+                return pages
+            response = self.client.get(reverse('tasks-api'), {**params, 'cursor': data['next_cursor']})
+
+    def test_pages_by_id(self):
+        self.assertEqual(self.collect(page_size=2), [['t0', 't1'], ['t2', 't3'], ['t4']])
+
+    def test_pages_by_update_date_with_nulls_first(self):
+        self.assertEqual(
+            self.collect(page_size=2, ordering='data_atualizacao'),
+            [['t1', 't4'], ['t2', 't0'], ['t3']],
+        )
+
+    def test_cursor_survives_new_tasks(self):
+        first = self.client.get(reverse('tasks-api'), {'page_size': 3}).json()
+        make_task('t5')
+        second = self.client.get(reverse('tasks-api'), {'page_size': 3, 'cursor': first['next_cursor']}).json()
+        self.assertEqual([task['clickup_id'] for task in second['tasks']], ['t3', 't4', 't5'])
+
+    @override_settings(CLICKUP_API_MAX_PAGE_SIZE=3)
+    def test_page_size_is_capped(self):
+        data = self.client.get(reverse('tasks-api'), {'page_size': 100}).json()
+        self.assertEqual((data['page_size'], len(data['tasks'])), (3, 3))
+
+    def test_invalid_parameters(self):
+        url = reverse('tasks-api')
+        for params in (
+            {'cursor': 'não-é-um-cursor'},
+            {'cursor': 'eyJvIjoibm9tZSIsInAiOlsxXX0='},  # ordenação desconhecida
+            {'page_size': 'dez'},
+            {'page_size': 0},
+            {'ordering': 'nome'},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(next(iter(params)), response.json())
+
+
+class TaskFilterTests(ApiTestCase):
+    """Filtros e projeção de colunas de /api/tasks/."""
+
+    def setUp(self):
+        super().setUp()
+        make_task('a', lista_origem='Design', responsavel='Ana', data_inicio=date(2025, 5, 1))
+        make_task('b', lista_origem='Dev', responsavel='Bruno', data_inicio=date(2025, 5, 10))
+        make_task('c', lista_origem='Dev', responsavel='Ana', parent_id='b', data_inicio=date(2025, 5, 20))
+        make_task('d', lista_origem='Ops', responsavel='Carla')
+
+    def get_ids(self, **params):
+        response = self.client.get(reverse('tasks-api'), params)
+        self.assertEqual(response.status_code, 200)
+        return [task['clickup_id'] for task in response.json()['tasks']]
+
+    def test_choice_filters(self):
+        self.assertEqual(self.get_ids(lista_origem='Dev'), ['b', 'c'])
+        self.assertEqual(self.get_ids(lista_origem=['Design', 'Ops']), ['a', 'd'])
+        self.assertEqual(self.get_ids(lista_origem='Dev', responsavel='Ana'), ['c'])
+
+    def test_main_only_and_date_range(self):
+        self.assertEqual(self.get_ids(main_only='true'), ['a', 'b', 'd'])
+        self.assertEqual(self.get_ids(main_only='false'), ['a', 'b', 'c', 'd'])
+        self.assertEqual(self.get_ids(data_inicio__gte='2025-05-05', data_inicio__lte='2025-05-10'), ['b'])
+
+    def test_projection_keeps_cursor_columns(self):
+        response = self.client.get(reverse('tasks-api'), {'fields': 'clickup_id,responsavel', 'page_size': 1})
+        data = response.json()
+        self.assertEqual(set(data['tasks'][0]), {'clickup_id', 'responsavel', 'id'})
+
+        response = self.client.get(reverse('tasks-api'), {'fields': 'clickup_id', 'ordering': 'data_atualizacao'})
+        self.assertEqual(set(response.json()['tasks'][0]), {'clickup_id', 'data_atualizacao', 'id'})
+
+    def test_invalid_parameters(self):
+        url = reverse('tasks-api')
+        for params in (
+            {'fields': 'clickup_id,senha'},
+            {'main_only': 'talvez'},
+            {'data_inicio__gte': '01/05/2025'},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(next(iter(params)), response.json())
+
+
+@override_settings(CLICKUP_API_STREAM_CHUNK_SIZE=2)
+class TaskStreamTests(ApiTestCase):
+    """?stream=true envia o conjunto filtrado inteiro em blocos."""
+
+    def setUp(self):
+        super().setUp()
+        for index in range(5):
+            make_task(f't{index}', lista_origem='Dev' if index % 2 else 'Design', tempo_estimado=index)
+
+    def get_stream(self, **params):
+        response = self.client.get(reverse('tasks-api'), {'stream': 'true', **params})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_streams_every_task_in_chunks(self):
+        data = self.get_stream()
+        self.assertEqual([task['clickup_id'] for task in data['tasks']], [f't{index}' for index in range(5)])
+        self.assertNotIn('next_cursor', data)
+
+    def test_filters_and_projection(self):
+        data = self.get_stream(lista_origem='Dev', fields='clickup_id,tempo_estimado')
+        self.assertEqual(
+            [(task['clickup_id'], task['tempo_estimado']) for task in data['tasks']],
+            [('t1', 1.0), ('t3', 3.0)],
+        )
+        self.assertEqual(set(data['tasks'][0]), {'id', 'clickup_id', 'tempo_estimado'})
+        self.assertEqual(self.get_stream(lista_origem='Ops'), {'tasks': []})
+
+    def test_invalid_stream_value(self):
+        response = self.client.get(reverse('tasks-api'), {'stream': 'talvez'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('stream', response.json())
+
+
+@skipUnless(arrow_available(), "pyarrow não instalado")
+@override_settings(CLICKUP_API_STREAM_CHUNK_SIZE=2)
+class TaskColumnarFormatTests(ApiTestCase):
+    """Respostas Arrow IPC e Parquet tipadas de /api/tasks/."""
+
+    def setUp(self):
+        super().setUp()
+        make_task('a', data_inicio=date(2025, 5, 1), tempo_estimado=1.5)
+        make_task('b', lista_origem='Dev')
+        make_task('c', data_inicio=date(2025, 5, 3), tempo_estimado=2)
+
+    def test_arrow_stream(self):
+        response = self.client.get(reverse('tasks-api'), {'format': 'arrow', 'fields': 'clickup_id,data_inicio,tempo_estimado'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/vnd.apache.arrow.stream')
+        table = pa.ipc.open_stream(b''.join(response.streaming_content)).read_all()
+        self.assertEqual(table.column_names, ['clickup_id', 'data_inicio', 'tempo_estimado', 'id'])
+        self.assertEqual(table.schema.field('data_inicio').type, pa.date32())
+        self.assertEqual(table.column('clickup_id').to_pylist(), ['a', 'b', 'c'])
+        self.assertEqual(table.column('data_inicio').to_pylist(), [date(2025, 5, 1), None, date(2025, 5, 3)])
+
+    def test_parquet_with_accept_header_and_filters(self):
+        response = self.client.get(
+            reverse('tasks-api'), {'lista_origem': 'Design'}, HTTP_ACCEPT='application/vnd.apache.parquet',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('tasks.parquet', response['Content-Disposition'])
+        table = pq.read_table(io.BytesIO(response.content))
+        self.assertEqual(table.column_names, list(TASK_FIELDS))
+        self.assertEqual(table.column('tempo_estimado').to_pylist(), [1.5, 2.0])
+
+    def test_errors_are_returned_as_json(self):
+        response = self.client.get(reverse('tasks-api'), {'format': 'parquet', 'fields': 'senha'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('fields', response.json())
+
+
+class ConditionalGetTests(ApiTestCase):
+    """ETag e 304 derivados da versão do conjunto."""
+
+    def setUp(self):
+        super().setUp()
+        make_task('a')
+        self.version = bump_dataset_version(1)
+
+    def test_not_modified_until_next_version(self):
+        url = reverse('tasks-api')
+        response = self.client.get(url)
+        self.assertEqual(response['X-Dataset-Version'], str(self.version.id))
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+        self.assertEqual(not_modified['ETag'], etag)
+
+        bump_dataset_version(1)
+        modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(modified.status_code, 200)
+        self.assertNotEqual(modified['ETag'], etag)
+
+    def test_etag_depends_on_query_and_format(self):
+        url = reverse('tasks-api')
+        etags = {
+            self.client.get(url)['ETag'],
+            self.client.get(url, {'lista_origem': 'Design'})['ETag'],
+            self.client.get(url, {'fields': 'clickup_id'})['ETag'],
+            self.client.get(url, {'stream': 'true'})['ETag'],
+        }
+        self.assertEqual(len(etags), 4)
+
+    def test_version_endpoint(self):
+        url = reverse('version-api')
+        response = self.client.get(url)
+        self.assertEqual(response.json()['version'], self.version.id)
+        self.assertEqual(response['ETag'], f'"v{self.version.id}"')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        head = self.client.head(url)
+        self.assertEqual((head.status_code, head.content), (200, b''))
+        self.assertEqual(head['X-Dataset-Version'], str(self.version.id))
+
+
+class ResponseCacheTests(ApiTestCase):
+    """Respostas serializadas ficam no cache até a próxima versão."""
+
+    def setUp(self):
+        super().setUp()
+        make_task('a')
+        bump_dataset_version(1)
+
+    def test_hit_after_miss_until_next_version(self):
+        url = reverse('tasks-api')
+        first = self.client.get(url)
+        second = self.client.get(url)
+        self.assertEqual((first['X-Cache'], second['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first['ETag'], second['ETag'])
+
+        stats = self.client.get(reverse('tasks-cache-stats')).json()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+        make_task('b')
+        bump_dataset_version(2)
+        third = self.client.get(url)
+        self.assertEqual(third['X-Cache'], 'MISS')
+        self.assertEqual([task['clickup_id'] for task in third.json()['tasks']], ['a', 'b'])
+
+    def test_streaming_response_is_cached_when_consumed(self):
+        url = reverse('tasks-api')
+        first = self.client.get(url, {'stream': 'true'})
+        content = b''.join(first.streaming_content)
+        second = self.client.get(url, {'stream': 'true'})
+        self.assertEqual((first['X-Cache'], second['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(second.content, content)
+
+    def test_response_built_during_a_sync_is_not_stored(self):
+        build_response = TaskListAPIView.build_response
+
+        async def build_during_sync(view, request):
+            response = await build_response(view, request)
+            await sync_to_async(bump_dataset_version)(2)
+            return response
+
+        with patch.object(TaskListAPIView, 'build_response', build_during_sync):
+            response = self.client.get(reverse('tasks-api'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(get_response_cache().get(build_cache_key(response['ETag'])))
+
+    def test_base_view_is_abstract(self):
+        with self.assertRaises(TypeError):
+            VersionedAPIView()
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    """O JSON do orjson deve ser igual ao do JSONRenderer do DRF."""
+
+    data = {
+        'data': date(2025, 5, 1),
+        'atualizado_em': datetime.datetime(2025, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+        'valor': decimal.Decimal('1.50'),
+        'horas': 2.5,
+        'nome': 'Tarefa ç',
+        'vazio': None,
+    }
+
+    def test_matches_drf_renderer(self):
+        fast = json.loads(FastJSONRenderer().render(self.data))
+        self.assertEqual(fast, json.loads(JSONRenderer().render(self.data)))
+        self.assertEqual(fast['data'], '2025-05-01')
+        self.assertEqual(fast['valor'], 1.5)
+
+    def test_indent_and_empty(self):
+        rendered = FastJSONRenderer().render({'a': 1}, renderer_context={'indent': 2})
+        self.assertEqual(json.loads(rendered), {'a': 1})
+        self.assertIn(b'\n', rendered)
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+
+@override_settings(CLICKUP_SNAPSHOT_PATH='')
+class TaskChangesTests(ApiTestCase):
+    """Sincronização incremental (hash + remoções) e /api/tasks/changes/."""
+
+    def sync(self, *tasks):
+        """Roda o comando de sincronização com a lista do ClickUp simulada e retorna a versão publicada."""
+        rows = pd.DataFrame([
+            {'status': 'aberta', 'criado_por': 'Ana', 'responsavel': 'Ana', 'List_Origem': 'Design', **task}
+            for task in tasks
+        ])
+        with patch.dict(os.environ, {'LISTS_IDS': '1'}), \
+                patch.object(sync_command, '_fetch_and_transform_single_list', return_value=(rows, None)), \
+                patch.object(pd.DataFrame, 'to_csv'):
+            call_command('sync_clickup_data_direct', stdout=io.StringIO(), stderr=io.StringIO())
+        return get_current_version().id
+
+    def get_changes(self, since, **params):
+        return self.client.get(reverse('tasks-changes-api'), {'since': since, **params})
+
+    def stored_versions(self):
+        return list(ClickUpTask.objects.order_by('clickup_id').values_list('clickup_id', 'versao'))
+
+    def test_sync_rewrites_only_changed_tasks_and_records_removals(self):
+        v1 = self.sync({'clickup_id': 'a', 'task_nome': 'A'}, {'clickup_id': 'b', 'task_nome': 'B'})
+        self.assertEqual(self.stored_versions(), [('a', v1), ('b', v1)])
+
+        v2 = self.sync(
+            {'clickup_id': 'a', 'task_nome': 'A2'}, {'clickup_id': 'b', 'task_nome': 'B'},
+            {'clickup_id': 'c', 'task_nome': 'C'},
+        )
+        self.assertEqual(self.stored_versions(), [('a', v2), ('b', v1), ('c', v2)])
+
+        v3 = self.sync({'clickup_id': 'a', 'task_nome': 'A2'}, {'clickup_id': 'c', 'task_nome': 'C'})
+        self.assertEqual(self.stored_versions(), [('a', v2), ('c', v2)])
+        self.assertEqual(list(DeletedClickUpTask.objects.values_list('clickup_id', 'versao')), [('b', v3)])
+
+    def test_changes_since_version(self):
+        v1 = self.sync({'clickup_id': 'a', 'task_nome': 'A'}, {'clickup_id': 'b', 'task_nome': 'B'})
+        v2 = self.sync({'clickup_id': 'a', 'task_nome': 'A2'}, {'clickup_id': 'c', 'task_nome': 'C', 'List_Origem': 'Dev'})
+
+        data = self.get_changes(v1, fields='task_nome').json()
+        self.assertEqual((data['since'], data['version']), (v1, v2))
+        self.assertEqual(data['tasks'], [
+            {'task_nome': 'A2', 'clickup_id': 'a'},
+            {'task_nome': 'C', 'clickup_id': 'c'},
+        ])
+        self.assertEqual(data['deleted'], ['b'])
+
+        # Tarefas alteradas que saíram do filtro também devem ser descartadas
+        data = self.get_changes(v1, lista_origem='Design').json()
+        self.assertEqual([task['clickup_id'] for task in data['tasks']], ['a'])
+        self.assertEqual(data['deleted'], ['b', 'c'])
+
+        self.assertEqual(self.get_changes(v2).json()['tasks'], [])
+
+    def test_sync_columns_stay_out_of_default_payload(self):
+        v1 = self.sync({'clickup_id': 'a', 'task_nome': 'A'})
+
+        task = self.client.get(reverse('tasks-api')).json()['tasks'][0]
+        self.assertNotIn('hash_conteudo', task)
+        self.assertNotIn('versao', task)
+
+        task = self.client.get(reverse('tasks-api'), {'fields': 'clickup_id,versao'}).json()['tasks'][0]
+        self.assertEqual(task['versao'], v1)
+        self.assertEqual(self.client.get(reverse('tasks-api'), {'fields': 'hash_conteudo'}).status_code, 400)
+
+    def test_conditional_get_and_errors(self):
+        v1 = self.sync({'clickup_id': 'a', 'task_nome': 'A'})
+        v2 = self.sync({'clickup_id': 'a', 'task_nome': 'A2'})
+
+        response = self.get_changes(v1)
+        self.assertEqual(self.client.get(
+            reverse('tasks-changes-api'), {'since': v1}, HTTP_IF_NONE_MATCH=response['ETag'],
+        ).status_code, 304)
+
+        self.assertEqual(self.get_changes('um').status_code, 400)
+        self.assertEqual(self.get_changes(v2 + 1).status_code, 400)
+        with override_settings(CLICKUP_CHANGES_RETENTION_VERSIONS=0):
+            self.assertEqual(self.get_changes(v1).status_code, 410)
+
+
+class KpiAPITests(ApiTestCase):
+    """/api/kpis/ calculado no banco, com os mesmos números dos dashboards."""
+
+    def setUp(self):
+        super().setUp()
+        make_task('a', tags='P1', data_inicio=date(2025, 5, 5), data_fechamento=date(2025, 5, 7), prazo=date(2025, 5, 8), tempo_estimado=6)
+        make_task('b', tags='P2', responsavel='Bruno', lista_origem='Incidente', data_inicio=date(2025, 5, 5), data_fechamento=date(2025, 5, 9), prazo=date(2025, 5, 6), tempo_estimado=10)
+        make_task('c', tags='P1', data_inicio=date(2025, 5, 6), prazo=date(2025, 5, 9), tempo_estimado=4)
+        make_task('d', parent_id='a', data_inicio=date(2025, 5, 5), data_fechamento=date(2025, 5, 5), tempo_estimado=99)
+        bump_dataset_version(4)
+        # Tarefas em aberto vão até "hoje"
+        patcher = patch('django.utils.timezone.localdate', return_value=date(2025, 5, 9))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_kpis(self, **params):
+        response = self.client.get(reverse('kpis-api'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_week_mode(self):
+        kpis = self.get_kpis(week='2025-05-07')
+        self.assertEqual(kpis['delivery_performance'], {'on_time_rate': 50.0, 'on_time_count': 1, 'total_completed': 2})
+        self.assertEqual(kpis['quality'], {'incident_free_rate': 50.0, 'clean_projects': 1, 'total_projects': 2})
+        self.assertEqual(kpis['planning'], {'total_planned_hours': 20.0})
+        self.assertEqual(kpis['efficiency'], {'average_lead_time': 3.0})
+        self.assertEqual(kpis['capacity'], {'operational_capacity_rate': 25.0, 'planned_hours_week': 20.0, 'max_capacity_week': 80})
+        self.assertEqual(kpis['period'], {'mode': 'week', 'start': '2025-05-05', 'end': '2025-05-09'})
+
+    def test_day_mode_uses_daily_log(self):
+        kpis = self.get_kpis(date='2025-05-06')
+        # 6h/3 dias + 10h/5 dias + 4h/4 dias
+        self.assertEqual(kpis['planning'], {'total_planned_hours': 5.0})
+        self.assertEqual(kpis['capacity'], {'operational_capacity_rate': 31.25, 'planned_hours_day': 5.0, 'max_capacity_day': 16})
+
+        kpis = self.get_kpis(date='2025-05-10')
+        self.assertEqual(kpis['period'], {'mode': 'day', 'date': '2025-05-10', 'business_day': False})
+        self.assertEqual(kpis['planning'], {'total_planned_hours': 0})
+
+    def test_filters(self):
+        kpis = self.get_kpis(responsavel='Ana', week='2025-05-07')
+        self.assertEqual(kpis['delivery_performance'], {'on_time_rate': 100.0, 'on_time_count': 1, 'total_completed': 1})
+        self.assertEqual(kpis['capacity']['max_capacity_week'], 40)
+
+    def test_invalid_date(self):
+        response = self.client.get(reverse('kpis-api'), {'date': '06/05/2025'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('date', response.json())
+
+
+class CapacityAPITests(ApiTestCase):
+    """/api/capacity/ deve seguir o log diário dos dashboards."""
+
+    def setUp(self):
+        super().setUp()
+        # Segunda a sexta, 2h por dia útil
+        make_task('a', responsavel='Ana', data_inicio=date(2025, 5, 5), data_fechamento=date(2025, 5, 9), tempo_estimado=10)
+        # Só fim de semana: todas as horas no sábado
+        make_task('b', responsavel='Bruno', lista_origem='Dev', data_inicio=date(2025, 5, 10), data_fechamento=date(2025, 5, 11), tempo_estimado=4)
+        # Subtarefa: ignorada
+        make_task('c', responsavel='Ana', parent_id='a', data_inicio=date(2025, 5, 5), data_fechamento=date(2025, 5, 9), tempo_estimado=50)
+        bump_dataset_version(3)
+
+    def get_capacity(self, **params):
+        return self.client.get(reverse('capacity-api'), {'start': '2025-05-05', 'end': '2025-05-11', **params})
+
+    def test_grid_by_responsavel(self):
+        response = self.get_capacity()
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['working_days']), 5)
+        self.assertEqual(data['total_planned_hours'], 14.0)
+        self.assertEqual(data['grid_responsaveis'], 2)
+        self.assertEqual(
+            [(row['data'], row['responsavel'], row['horas_planejadas']) for row in data['grid']],
+            [(f'2025-05-0{day}', 'Ana', 2.0) for day in range(5, 10)] + [('2025-05-10', 'Bruno', 4.0)],
+        )
+
+    def test_grid_by_day_and_filters(self):
+        data = self.get_capacity(group_by='day').json()
+        self.assertEqual(
+            [(row['data'], row['horas_planejadas']) for row in data['grid']],
+            [(f'2025-05-0{day}', 2.0) for day in range(5, 10)] + [('2025-05-10', 4.0)],
+        )
+        data = self.get_capacity(group_by='lista', lista_origem='Dev').json()
+        self.assertEqual([(row['lista'], row['horas_planejadas']) for row in data['grid']], [('Dev', 4.0)])
+
+    def test_matches_dashboard_daily_log(self):
+        tasks = pd.DataFrame(list(ClickUpTask.objects.values(
+            'clickup_id', 'parent_id', 'responsavel', 'lista_origem', 'data_inicio', 'data_fechamento', 'tempo_estimado',
+        )))
+        daily_log = create_daily_log(tasks)
+        daily_log['registro_data'] = pd.to_datetime(daily_log['registro_data']).dt.date
+        expected = daily_log[daily_log['registro_data'].between(date(2025, 5, 5), date(2025, 5, 11))].groupby(
+            ['responsavel', 'registro_data'], as_index=False,
+        )['registro_horas'].sum()
+        grid = pd.DataFrame(self.get_capacity().json()['grid'])
+        self.assertEqual(list(pd.to_datetime(grid['data']).dt.date), list(expected['registro_data']))
+        self.assertEqual(list(grid['responsavel']), list(expected['responsavel']))
+        self.assertEqual(list(grid['horas_planejadas']), list(expected['registro_horas'].round(3)))
+
+    def test_invalid_parameters(self):
+        url = reverse('capacity-api')
+        self.assertEqual(self.client.get(url, {'start': '2025-05-05'}).status_code, 400)
+        self.assertEqual(self.get_capacity(end='2025-05-01').status_code, 400)
+        self.assertEqual(self.get_capacity(end='2027-01-01').status_code, 400)
+        self.assertEqual(self.get_capacity(group_by='semana').status_code, 400)
+        self.assertEqual(self.get_capacity(start='05/05/2025').status_code, 400)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.get_capacity().status_code, 401)
+
+
+class AsyncViewTests(ApiTestCase):
+    """Sob ASGI, as views usam o ORM assíncrono e streams com .aiterator()."""
+
+    def setUp(self):
+        super().setUp()
+        for index in range(3):
+            make_task(f't{index}', tempo_estimado=index)
+        bump_dataset_version(3)
+
+    async def asgi_get(self, name, params=None, **headers):
+        await self.async_client.aforce_login(self.user)
+        return await self.async_client.get(reverse(name), params or {}, headers=headers)
+
+    async def read_stream(self, response):
+        return b''.join([chunk async for chunk in response.streaming_content])
+
+    async def test_paginated_list(self):
+        response = await self.asgi_get('tasks-api', {'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([task['clickup_id'] for task in response.json()['tasks']], ['t0', 't1'])
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    @override_settings(CLICKUP_API_STREAM_CHUNK_SIZE=2)
+    async def test_async_json_stream_is_cached(self):
+        response = await self.asgi_get('tasks-api', {'stream': 'true'})
+        self.assertTrue(response.is_async)
+        content = await self.read_stream(response)
+        self.assertEqual([task['clickup_id'] for task in json.loads(content)['tasks']], ['t0', 't1', 't2'])
+
+        cached = await self.asgi_get('tasks-api', {'stream': 'true'})
+        self.assertEqual((cached['X-Cache'], cached.content), ('HIT', content))
+
+    @skipUnless(arrow_available(), "pyarrow não instalado")
+    @override_settings(CLICKUP_API_STREAM_CHUNK_SIZE=2)
+    async def test_async_arrow_stream(self):
+        response = await self.asgi_get('tasks-api', {'format': 'arrow', 'fields': 'clickup_id'})
+        self.assertTrue(response.is_async)
+        table = pa.ipc.open_stream(await self.read_stream(response)).read_all()
+        self.assertEqual(table.column('clickup_id').to_pylist(), ['t0', 't1', 't2'])
+
+    async def test_version_and_authentication(self):
+        response = await self.asgi_get('version-api')
+        self.assertEqual(response.json()['total_tarefas'], 3)
+
+        await self.async_client.alogout()
+        response = await self.async_client.get(reverse('version-api'))
+        self.assertEqual(response.status_code, 401)
+
+
+class CachedTokenAuthenticationTests(ApiTestCase):
+    """Tokens do Knox validados uma vez e reaproveitados até o TTL."""
+
+    def setUp(self):
+        super().setUp()
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.client.force_authenticate(None)
+        self.auth_token, token = AuthToken.objects.create(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+
+    def get_version(self):
+        """Faz a requisição e conta quantas vezes o token foi validado no banco."""
+        with patch.object(TokenAuthentication, 'authenticate_credentials', autospec=True,
+                          side_effect=TokenAuthentication.authenticate_credentials) as knox_auth:
+            response = self.client.get(reverse('version-api'))
+        return response.status_code, knox_auth.call_count
+
+    def test_token_is_validated_once(self):
+        self.assertEqual(self.get_version(), (200, 1))
+        self.assertEqual(self.get_version(), (200, 0))
+
+    @override_settings(CLICKUP_AUTH_CACHE_TTL=0)
+    def test_cache_can_be_disabled(self):
+        self.assertEqual(self.get_version(), (200, 1))
+        self.assertEqual(self.get_version(), (200, 1))
+
+    def test_revoked_token_is_discarded(self):
+        self.get_version()
+        self.auth_token.delete()
+        self.assertEqual(self.get_version(), (401, 1))
+
+    def test_changed_user_is_validated_again(self):
+        self.get_version()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get_version(), (401, 1))
+
+    def test_cache_expiry_and_size_limit(self):
+        cache = type(token_cache)()
+        cache.set('expirado', self.user, self.auth_token, ttl=-1, max_entries=2)
+        self.assertIsNone(cache.get('expirado'))
+
+        for digest in ('a', 'b', 'c'):
+            cache.set(digest, self.user, self.auth_token, ttl=60, max_entries=2)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('c'), (self.user, self.auth_token))
+
+
+@override_settings(CLICKUP_EVENTS_POLL_INTERVAL=0, CLICKUP_EVENTS_HEARTBEAT=60, CLICKUP_EVENTS_MAX_DURATION=60)
+class DatasetEventsTests(ApiTestCase):
+    """Stream SSE de novas versões do conjunto."""
+
+    def setUp(self):
+        super().setUp()
+        self.version = bump_dataset_version(1)
+
+    def test_sends_current_and_new_versions(self):
+        events = stream_version_events()
+        self.assertEqual(next(events), 'retry: 0\n\n')
+        self.assertEqual(next(events), format_version_event(self.version))
+        new_version = bump_dataset_version(2)
+        self.assertEqual(next(events), format_version_event(new_version))
+        self.assertIn(f'id: {new_version.id}\nevent: version\n', format_version_event(new_version))
+
+    @override_settings(CLICKUP_EVENTS_HEARTBEAT=0)
+    def test_reconnect_with_last_event_id_gets_heartbeat(self):
+        events = stream_version_events(last_event_id=str(self.version.id))
+        next(events)
+        self.assertEqual(next(events), ': keep-alive\n\n')
+
+    async def test_async_stream(self):
+        events = astream_version_events()
+        self.assertEqual(await anext(events), 'retry: 0\n\n')
+        self.assertEqual(await anext(events), format_version_event(self.version))
+        new_version = await sync_to_async(bump_dataset_version)(2)
+        self.assertEqual(await anext(events), format_version_event(new_version))
+        await events.aclose()
+
+    @override_settings(CLICKUP_EVENTS_MAX_DURATION=0)
+    def test_endpoint(self):
+        response = self.client.get(reverse('events-api'), HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response['Cache-Control'], response['X-Accel-Buffering']), ('no-cache', 'no'))
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertEqual(content, 'retry: 0\n\n' + format_version_event(self.version))
+
+        self.client.force_authenticate(None)
+        response = self.client.get(reverse('events-api'), HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+
+@skipUnless(arrow_available(), "pyarrow não instalado")
+class ArrowSnapshotTests(TestCase):
+    """O snapshot publicado pela sincronização deve abrir nos dashboards via memory-map."""
+
+    def setUp(self):
+        make_task('a', tempo_estimado=1)
+        make_task('b', parent_id='a', tempo_estimado=2)
+        make_task('c', tempo_estimado=3)
+        self.version = bump_dataset_version(3)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'snapshots', 'tasks.arrow')
+        write_arrow_snapshot(self.path, self.version, TASK_FIELDS, chunk_size=2)
+
+    def test_main_tasks_come_first(self):
+        self.assertEqual(arrow_snapshot_version(self.path), self.version.id)
+
+        df, version = load_arrow_snapshot(self.path, version=self.version.id)
+        self.assertEqual(version, self.version.id)
+        self.assertEqual(list(df['clickup_id']), ['a', 'c', 'b'])
+        self.assertEqual(list(df.columns), list(TASK_FIELDS))
+
+    def test_main_only_and_fields(self):
+        fields = ('clickup_id', 'parent_id', 'tempo_estimado')
+        df, _ = load_arrow_snapshot(self.path, version=self.version.id, fields=fields, main_only=True)
+        self.assertEqual(list(df.columns), list(fields))
+        self.assertEqual(list(df['clickup_id']), ['a', 'c'])
+        self.assertEqual(list(df['tempo_estimado']), [1.0, 3.0])
+        self.assertTrue(df['parent_id'].isna().all())
+
+    def test_other_version_or_unknown_fields_are_ignored(self):
+        self.assertEqual(load_arrow_snapshot(self.path, version=self.version.id + 1), (None, None))
+        self.assertEqual(load_arrow_snapshot(self.path, fields=('inexistente',)), (None, None))
+        self.assertIsNone(arrow_snapshot_version(os.path.join(os.path.dirname(self.path), 'outro.arrow')))
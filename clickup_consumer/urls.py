@@ -1,8 +1,14 @@
 # clickup_consumer/urls.py
 
 from django.urls import path
-from .views import TaskListAPIView
+from .views import CapacityAPIView, DatasetEventsAPIView, DatasetVersionAPIView, KpiAPIView, TaskCacheStatsAPIView, TaskChangesAPIView, TaskListAPIView
 
 urlpatterns = [
     path('tasks/', TaskListAPIView.as_view(), name='tasks-api'),
+    path('tasks/changes/', TaskChangesAPIView.as_view(), name='tasks-changes-api'),
+    path('kpis/', KpiAPIView.as_view(), name='kpis-api'),
+    path('capacity/', CapacityAPIView.as_view(), name='capacity-api'),
+    path('version/', DatasetVersionAPIView.as_view(), name='version-api'),
+    path('events/', DatasetEventsAPIView.as_view(), name='events-api'),
+    path('tasks/cache-stats/', TaskCacheStatsAPIView.as_view(), name='tasks-cache-stats'),
 ]
\ No newline at end of file
@@ -0,0 +1,63 @@
+# clickup_consumer/versioning.py
+
+import hashlib
+
+from django.utils.http import http_date
+
+from .models import DatasetVersion
+
+
+def get_current_version():
+    """Retorna a DatasetVersion mais recente, ou None se nunca houve sincronização."""
+    return DatasetVersion.objects.order_by('-id').first()
+
+
+async def aget_current_version():
+    """Versão assíncrona de get_current_version, para as views ASGI."""
+    return await DatasetVersion.objects.order_by('-id').afirst()
+
+
+def bump_dataset_version(total_tarefas):
+    """
+    Registra uma nova versão do conjunto de tarefas.
+
+    Deve ser chamada pelo loader ao final de cada sincronização concluída.
+    """
+    return DatasetVersion.objects.create(total_tarefas=total_tarefas)
+
+
+def build_etag(version, request, extra=''):
+    """
+    Gera o ETag de uma resposta a partir da versão e da consulta feita.
+
+    A mesma versão produz ETags diferentes para filtros, projeções, cursores
+    ou formatos diferentes, já que o conteúdo de cada resposta é diferente.
+    'extra' entra no hash quando a resposta depende de algo além da versão
+    (ex.: a data atual, nos cálculos com tarefas em aberto).
+    """
+    version_id = version.id if version else 0
+    query = '&'.join(
+        f'{key}={value}'
+        for key in sorted(request.query_params)
+        for value in request.query_params.getlist(key)
+    )
+    media_type = getattr(request, 'accepted_media_type', '') or ''
+    digest = hashlib.sha1(f'{request.path}?{query}|{media_type}|{extra}'.encode('utf-8')).hexdigest()[:16]
+    return f'"v{version_id}-{digest}"'
+
+
+def get_last_modified(version):
+    """Timestamp (em segundos) da versão, usado no cabeçalho Last-Modified."""
+    return int(version.criado_em.timestamp()) if version else None
+
+
+def set_version_headers(response, version, etag):
+    """Adiciona à resposta os cabeçalhos de validação condicional da versão."""
+    response['ETag'] = etag
+    response['X-Dataset-Version'] = str(version.id if version else 0)
+    last_modified = get_last_modified(version)
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Permite cache no cliente, mas exige revalidação (barata, via 304) a cada uso
+    response['Cache-Control'] = 'private, no-cache'
+    return response
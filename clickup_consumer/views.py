@@ -1,30 +1,397 @@
 # clickup_consumer/views.py
 
-from rest_framework.views import APIView
+import abc
+
+from adrf.views import APIView
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.settings import api_settings
 from .models import ClickUpTask
-import datetime
+from .pagination import TaskKeysetPagination
+from .filters import filter_tasks, get_projection, parse_bool, parse_date
+from .streaming import astream_tasks_json, stream_tasks_json
+from .arrow_export import arrow_available, astream_arrow_ipc, build_parquet, stream_arrow_ipc
+from .renderers import ArrowStreamRenderer, EventStreamRenderer, ParquetRenderer
+from .versioning import aget_current_version, build_etag, get_last_modified, set_version_headers
+from .changes import changes_available_since, get_changes_since
+from .kpis import compute_kpis
+from .capacity import GROUP_BY_FIELDS, build_capacity_grid
+from .events import astream_version_events, stream_version_events
+from .response_cache import (
+    acache_streaming_content, build_cache_key, cache_streaming_content, get_cache_stats,
+    get_cached_response, store_response,
+)
+
+# Formatos binários gerados diretamente a partir do cursor do banco
+BINARY_FORMATS = {ArrowStreamRenderer.format, ParquetRenderer.format}
+
+# Formatos cujas respostas são guardadas no cache do servidor (a API navegável
+# depende do usuário e da requisição, então não entra)
+CACHEABLE_FORMATS = {'json', ArrowStreamRenderer.format, ParquetRenderer.format}
+
+
+def is_asgi_request(request):
+    """
+    Indica se a requisição chegou por um servidor ASGI (uvicorn).
+
+    Sob ASGI os streams usam geradores assíncronos (.aiterator()); sob WSGI
+    continuam síncronos, já que o Django teria que consumir um gerador
+    assíncrono inteiro em memória antes de enviá-lo.
+    """
+    return isinstance(request._request, ASGIRequest)
+
+
+class VersionedAPIView(APIView, metaclass=abc.ABCMeta):
+    """
+    Base das views de leitura que dependem apenas da versão do conjunto.
+
+    Responde 304 a um If-None-Match com o ETag da versão atual e guarda as
+    respostas serializadas no cache 'tasks_api' (clickup_consumer.response_cache)
+    até a próxima sincronização; o cabeçalho X-Cache indica HIT ou MISS.
+
+    As views são assíncronas (adrf): sob ASGI, uma consulta lenta não
+    bloqueia o worker enquanto outras requisições aguardam. As subclasses
+    implementam a coroutine build_response(request).
+
+    A versão é lida uma única vez por requisição e a mesma leitura vale para
+    o ETag, a chave de cache e a decisão de salvar: uma resposta montada
+    enquanto uma sincronização terminava não é guardada (ver store_response).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_etag(self, version, request):
+        return build_etag(version, request)
+
+    async def get(self, request, *args, **kwargs):
+        # Enquanto nenhuma sincronização acontecer, o conteúdo não muda
+        version = await aget_current_version()
+        etag = self.get_etag(version, request)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=get_last_modified(version))
+        if not_modified is not None:
+            return set_version_headers(not_modified, version, etag)
+
+        if request.accepted_renderer.format not in CACHEABLE_FORMATS:
+            return set_version_headers(await self.build_response(request), version, etag)
+
+        # Mesma versão e mesma consulta: reaproveita a resposta já serializada
+        cache_key = build_cache_key(etag)
+        response = await sync_to_async(get_cached_response)(cache_key)
+        if response is None:
+            response = await self.cache_response(cache_key, version, await self.build_response(request))
+        return set_version_headers(response, version, etag)
+
+    async def cache_response(self, cache_key, version, response):
+        """Guarda no cache o conteúdo serializado de uma resposta montada na versão 'version'."""
+        if isinstance(response, StreamingHttpResponse):
+            # Os blocos seguem para o cliente e a cópia é salva ao final do stream
+            if response.is_async:
+                response.streaming_content = acache_streaming_content(
+                    cache_key, response.streaming_content, response['Content-Type'], version,
+                )
+            else:
+                response.streaming_content = cache_streaming_content(
+                    cache_key, response.streaming_content, response['Content-Type'], version,
+                )
+        else:
+            # Renderiza já aqui para salvar os bytes; o DRF não renderiza de novo
+            response.accepted_renderer = self.request.accepted_renderer
+            response.accepted_media_type = self.request.accepted_media_type
+            response.renderer_context = self.get_renderer_context()
+            response.render()
+            await sync_to_async(store_response)(cache_key, response.content, response['Content-Type'], version)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    @abc.abstractmethod
+    async def build_response(self, request):
+        """Monta a resposta da requisição (sem os cabeçalhos de versão)."""
 
-class TaskListAPIView(APIView):
+
+class TaskListAPIView(VersionedAPIView):
     """
-    Busca todas as tarefas do modelo ClickUpTask e retorna como JSON.
+    Retorna as tarefas do modelo ClickUpTask como JSON, paginadas por cursor.
     Requer autenticação para acesso, via sessão ou token.
+
+    Para percorrer todas as tarefas, repita a requisição enviando o
+    'next_cursor' da resposta no parâmetro 'cursor' até que ele seja nulo.
+
+    Aceita os filtros de clickup_consumer.filters (lista_origem, responsavel,
+    status, main_only e intervalos de datas) e a projeção ?fields=campo1,campo2.
+
+    Com ?stream=true, ignora a paginação e envia todas as tarefas filtradas em
+    um único documento JSON gerado incrementalmente (exportações completas).
+
+    Com o pyarrow instalado, também responde em formato colunar tipado:
+    'Accept: application/vnd.apache.arrow.stream' (ou ?format=arrow) para um
+    stream Arrow IPC e 'Accept: application/vnd.apache.parquet' (ou ?format=parquet)
+    para um arquivo Parquet, ambos com o conjunto completo filtrado.
+
+    Todas as respostas trazem ETag/Last-Modified derivados da versão atual do
+    conjunto (X-Dataset-Version); um If-None-Match com o mesmo ETag recebe 304.
+
+    As respostas já serializadas ficam no cache do servidor até a próxima
+    sincronização (ver VersionedAPIView).
+    """
+    pagination_class = TaskKeysetPagination
+    renderer_classes = list(api_settings.DEFAULT_RENDERER_CLASSES) + (
+        [ArrowStreamRenderer, ParquetRenderer] if arrow_available() else []
+    )
+
+    async def build_response(self, request):
+        """Monta a resposta no formato negociado (JSON paginado, stream, Arrow ou Parquet)."""
+        if request.accepted_renderer.format in BINARY_FORMATS:
+            return await self.get_columnar_response(request)
+
+        stream = request.query_params.get('stream')
+        if stream is not None and parse_bool('stream', stream):
+            return self.get_streaming_response(request)
+
+        paginator = self.pagination_class()
+        
+        # Filtra e projeta no banco apenas as linhas e colunas pedidas
+        fields = get_projection(request.query_params, required=paginator.get_key_fields(request))
+        queryset = filter_tasks(ClickUpTask.objects.all(), request.query_params).values(*fields)
+        
+        # Busca apenas a página atual no banco de dados
+        tasks_list = await paginator.apaginate_queryset(queryset, request)
+
+        # As datas são serializadas direto pelo FastJSONRenderer (ISO 8601)
+        return paginator.get_paginated_response(tasks_list)
+
+    def get_streaming_response(self, request):
+        """Envia o conjunto completo de tarefas filtradas sem montá-lo em memória."""
+        fields = get_projection(request.query_params)
+        queryset = filter_tasks(ClickUpTask.objects.all(), request.query_params).values(*fields).order_by('id')
+        
+        stream = astream_tasks_json if is_asgi_request(request) else stream_tasks_json
+        return StreamingHttpResponse(
+            stream(queryset, chunk_size=settings.CLICKUP_API_STREAM_CHUNK_SIZE),
+            content_type='application/json',
+        )
+
+    async def get_columnar_response(self, request):
+        """Envia o conjunto completo de tarefas filtradas como Arrow IPC ou Parquet."""
+        fields = get_projection(request.query_params)
+        queryset = filter_tasks(ClickUpTask.objects.all(), request.query_params).order_by('id')
+        chunk_size = settings.CLICKUP_API_STREAM_CHUNK_SIZE
+
+        if request.accepted_renderer.format == ParquetRenderer.format:
+            content = await sync_to_async(build_parquet)(queryset, fields, chunk_size)
+            response = Response(content, content_type=ParquetRenderer.media_type)
+            response['Content-Disposition'] = 'attachment; filename="tasks.parquet"'
+            return response
+
+        stream = astream_arrow_ipc if is_asgi_request(request) else stream_arrow_ipc
+        return StreamingHttpResponse(
+            stream(queryset, fields, chunk_size),
+            content_type=ArrowStreamRenderer.media_type,
+        )
+
+    def handle_exception(self, exc):
+        # Erros são sempre devolvidos em JSON, mesmo quando o cliente pediu Arrow/Parquet
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        if renderer is not None and renderer.format in BINARY_FORMATS:
+            fallback_renderer = self.renderer_classes[0]()
+            self.request.accepted_renderer = fallback_renderer
+            self.request.accepted_media_type = fallback_renderer.media_type
+        return super().handle_exception(exc)
+
+
+class TaskChangesAPIView(APIView):
+    """
+    Retorna o que mudou no conjunto de tarefas depois de uma versão conhecida.
+
+    GET /api/tasks/changes/?since=<versão> responde com as tarefas criadas ou
+    alteradas ('tasks') e os clickup_ids a descartar ('deleted') desde aquela
+    versão. Aceita os mesmos filtros e a projeção ?fields= de TaskListAPIView.
+
+    Se 'since' for mais antiga que o histórico de remoções guardado, responde
+    410 e o cliente deve baixar o conjunto completo novamente.
     """
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, *args, **kwargs):
-        # Busca todas as tarefas no banco de dados
-        tasks = ClickUpTask.objects.all().values()
+    async def get(self, request, *args, **kwargs):
+        try:
+            since = int(request.query_params.get('since', ''))
+        except ValueError:
+            raise ValidationError({'since': "Informe a versão conhecida como número inteiro."})
 
-        # Converte o QuerySet em uma lista de dicionários
-        tasks_list = list(tasks)
+        version = await aget_current_version()
+        version_id = version.id if version else 0
+        if since > version_id:
+            raise ValidationError({'since': f"Versão desconhecida. A versão atual é {version_id}."})
+
+        etag = build_etag(version, request)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=get_last_modified(version))
+        if not_modified is not None:
+            return set_version_headers(not_modified, version, etag)
+
+        if not changes_available_since(since, version_id):
+            response = Response(
+                {'detail': "Histórico de mudanças indisponível para esta versão. Baixe o conjunto completo."},
+                status=status.HTTP_410_GONE,
+            )
+            return set_version_headers(response, version, etag)
+
+        fields = get_projection(request.query_params, required=('clickup_id',))
+        tasks, deleted = await sync_to_async(get_changes_since)(since, request.query_params, fields)
+        response = Response({
+            'since': since,
+            'version': version_id,
+            'tasks': tasks,
+            'deleted': deleted,
+        })
+        return set_version_headers(response, version, etag)
+
+
+class KpiAPIView(VersionedAPIView):
+    """
+    Retorna os KPIs dos dashboards calculados no banco, sem enviar as tarefas.
+
+    Parâmetros:
+        lista_origem, responsavel: Mesmos filtros da API de tarefas
+        date: Dia (AAAA-MM-DD) do modo "Filtrar por data"; horas e capacidade
+            passam a ser as do log diário nesse dia
+        week: Qualquer dia da semana usada na capacidade operacional (padrão: semana atual)
+
+    Considera apenas tarefas principais (sem parent_id), como os cards dos dashboards.
+    """
+
+    def get_etag(self, version, request):
+        # Tarefas em aberto vão até "hoje", então o resultado muda a cada dia
+        return build_etag(version, request, extra=timezone.localdate().isoformat())
+
+    async def build_response(self, request):
+        params = request.query_params
+        date = parse_date('date', params['date']) if params.get('date') else None
+        week = parse_date('week', params['week']) if params.get('week') else None
+
+        queryset = filter_tasks(ClickUpTask.objects.filter(parent_id__isnull=True), params)
+        kpis = await sync_to_async(compute_kpis)(queryset, date=date, week=week, today=timezone.localdate())
+        return Response(kpis)
+
+
+class CapacityAPIView(VersionedAPIView):
+    """
+    Retorna a grade de horas planejadas e a capacidade da empresa no período.
+
+    Parâmetros:
+        start, end: Período (AAAA-MM-DD, inclusive); até CLICKUP_CAPACITY_MAX_DAYS dias
+        group_by: 'responsavel' (padrão), 'lista' ou 'day'
+        lista_origem, responsavel: Mesmos filtros da API de tarefas
+
+    As horas seguem o log diário dos dashboards: o tempo estimado de cada
+    tarefa principal dividido pelos seus dias úteis (sem fins de semana e
+    feriados) ou, se ela não tiver nenhum, inteiro no dia de início. A
+    resposta fica em cache por período, filtros e versão.
+    """
+
+    def get_etag(self, version, request):
+        # Tarefas em aberto vão até "hoje", então o resultado muda a cada dia
+        return build_etag(version, request, extra=timezone.localdate().isoformat())
+
+    async def build_response(self, request):
+        params = request.query_params
+        for name in ('start', 'end'):
+            if not params.get(name):
+                raise ValidationError({name: "Parâmetro obrigatório (AAAA-MM-DD)."})
+        start = parse_date('start', params['start'])
+        end = parse_date('end', params['end'])
+        if start > end:
+            raise ValidationError({'end': "Deve ser igual ou posterior a 'start'."})
+        max_days = getattr(settings, 'CLICKUP_CAPACITY_MAX_DAYS', 366)
+        if (end - start).days + 1 > max_days:
+            raise ValidationError({'end': f"Período máximo de {max_days} dias."})
+
+        group_by = params.get('group_by', 'responsavel')
+        if group_by not in GROUP_BY_FIELDS:
+            raise ValidationError({'group_by': f"Opções: {', '.join(GROUP_BY_FIELDS)}."})
+
+        queryset = filter_tasks(ClickUpTask.objects.filter(parent_id__isnull=True), params)
+        grid = await sync_to_async(build_capacity_grid)(queryset, start, end, group_by, today=timezone.localdate())
+        return Response(grid)
+
+
+class DatasetVersionAPIView(APIView):
+    """
+    Retorna apenas a versão atual do conjunto, sem consultar as tarefas.
+
+    É a verificação barata usada pelos dashboards antes de reaproveitar a
+    cópia compartilhada em disco: uma leitura pela chave primária, com ETag
+    próprio (304 com If-None-Match) e suporte a HEAD, que responde só com os
+    cabeçalhos (X-Dataset-Version).
+    """
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request, *args, **kwargs):
+        version = await aget_current_version()
+        version_id = version.id if version else 0
+        etag = f'"v{version_id}"'
+        not_modified = get_conditional_response(request, etag=etag, last_modified=get_last_modified(version))
+        if not_modified is not None:
+            return set_version_headers(not_modified, version, etag)
+
+        response = Response({
+            'version': version_id,
+            'criado_em': version.criado_em if version else None,
+            'total_tarefas': version.total_tarefas if version else 0,
+        })
+        return set_version_headers(response, version, etag)
+
+
+class TaskCacheStatsAPIView(APIView):
+    """
+    Retorna os contadores de hits/misses do cache de respostas da API de
+    tarefas, acumulados desde a última sincronização.
+    """
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request, *args, **kwargs):
+        version = await aget_current_version()
+        stats = await sync_to_async(get_cache_stats)()
+        stats['dataset_version'] = version.id if version else 0
+        return Response(stats)
+
+
+class DatasetEventsAPIView(APIView):
+    """
+    Stream SSE (text/event-stream) que avisa quando uma sincronização publica
+    uma nova versão do conjunto.
+
+    Cada evento 'version' traz o número da versão (também no campo 'id'), a
+    data de criação e o total de tarefas. Ao conectar, o cliente recebe a
+    versão atual, exceto se o cabeçalho Last-Event-ID já for ela. Os
+    dashboards usam esses eventos para invalidar os próprios caches, em vez de
+    revalidar com a API em intervalos fixos.
+
+    Sob ASGI, cada conexão é apenas uma coroutine aguardando entre as
+    consultas; sob WSGI, ocupa uma thread do worker (ver clickup_consumer.events).
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [EventStreamRenderer] + list(api_settings.DEFAULT_RENDERER_CLASSES)
 
-        # Converte os campos de data para um formato de string compatível com JSON
-        for task in tasks_list:
-            for key, value in task.items():
-                if isinstance(value, (datetime.date, datetime.datetime)):
-                    task[key] = value.isoformat()
+    async def get(self, request, *args, **kwargs):
+        last_event_id = request.headers.get('Last-Event-ID')
+        stream = astream_version_events if is_asgi_request(request) else stream_version_events
+        response = StreamingHttpResponse(stream(last_event_id), content_type=EventStreamRenderer.media_type)
+        # Sem cache e sem buffer em proxies (nginx), para o evento chegar na hora
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
 
-        # Retorna os dados usando a classe Response do DRF
-        return Response({"tasks": tasks_list})
\ No newline at end of file
+    def handle_exception(self, exc):
+        # Erros (ex.: 401) são devolvidos em JSON, não como stream de eventos
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        if renderer is not None and renderer.format == EventStreamRenderer.format:
+            fallback_renderer = self.renderer_classes[1]()
+            self.request.accepted_renderer = fallback_renderer
+            self.request.accepted_media_type = fallback_renderer.media_type
+        return super().handle_exception(exc)
@@ -4,19 +4,17 @@ import requests
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import timedelta, datetime
-import holidays
-from utils.api_conection import fetch_tasks_from_api
+from clickup_common.business_calendar import holiday_name
+from utils.api_conection import fetch_tasks_from_api, fetch_kpis_from_api, DASHBOARD_FIELDS
 
 # Importa as funções de cálculo refatoradas do módulo 'utils.calculate_dates'
 from utils.calculate_dates import (
-    calculate_incident_free_rate, 
+    calculate_kpis,
     calculate_lead_time, 
-    calculate_on_time_delivery_rate, 
-    calculate_operational_capacity, 
-    calculate_total_planned_hours,
-    create_daily_log,
-    calculate_daily_capacity_for_person_list
+    get_group_metrics,
+    prepare_kpi_frame
 )
+from utils.dataset_cache import get_capacity_cube, get_filter_index, get_grouped_kpis
 
 # --- Configuração da Página ---
 st.set_page_config(
@@ -286,12 +284,13 @@ def create_gauge_chart(value, title, help_text):
     return fig
 
 # --- Carregar e processar os dados automaticamente ao iniciar a aplicação ---
-df_full = fetch_tasks_from_api()
+df_full = fetch_tasks_from_api(filters={'main_only': 'true'}, fields=DASHBOARD_FIELDS)
 
 # --- Layout da Aplicação ---
 if not df_full.empty:
-    # Cria o DataFrame base com log diário
-    df_daily_log = create_daily_log(df_full)
+    # Máscaras e opções da segmentação e log diário compacto (tarefa, dia, horas),
+    # montados uma vez por versão
+    filter_index = get_filter_index(df_full)
     
     # --- Seção de Filtros ---
     st.subheader("🔍 Segmentação de Dados")
@@ -299,22 +298,14 @@ if not df_full.empty:
     
     # --- Filtro de Lista de Origem ---
     with filter_col1:
-        # Tabela base para filtros, já filtrando por parent_id
-        df_unique_base = df_full[df_full['parent_id'].isnull()].drop_duplicates(subset=['clickup_id'], keep='first')
-        unique_lists_filter = ["Todas"] + sorted(df_unique_base['lista_origem'].unique().tolist())
-        selected_list = st.selectbox("📁 Filtrar por Lista de Origem:", unique_lists_filter)
+        # Opções já ordenadas no índice da segmentação
+        selected_list = st.selectbox("📁 Filtrar por Lista de Origem:", filter_index.list_options)
+        list_filter = selected_list if selected_list != "Todas" else None
 
     # --- Filtro de Responsável ---
     with filter_col2:
-        if selected_list != "Todas":
-            df_temp = df_unique_base[df_unique_base['lista_origem'] == selected_list]
-        else:
-            df_temp = df_unique_base
-        
-        # Filtra 'None' para a exibição no selectbox
-        df_temp_filtered_responsible = df_temp[df_temp['responsavel'].notna()]
-        unique_responsibles = ["Todos"] + sorted(df_temp_filtered_responsible['responsavel'].unique().tolist())
-        selected_responsible = st.selectbox("👤 Filtrar por Responsável:", unique_responsibles)
+        # Responsáveis (sem 'None') das tarefas da lista selecionada
+        selected_responsible = st.selectbox("👤 Filtrar por Responsável:", filter_index.responsible_options(list_filter))
 
     # --- Seletor de modo de filtro de data ---
     with filter_col3:
@@ -331,62 +322,38 @@ if not df_full.empty:
             )
 
     # --- Aplicação dos Filtros ---
+    responsible_filter = selected_responsible if selected_responsible != "Todos" else None
+    
     if date_filter_mode == "Todos os dias":
-        df_unique_filtered = df_unique_base.copy()
-        
-        if selected_list != "Todas":
-            df_unique_filtered = df_unique_filtered[df_unique_filtered['lista_origem'] == selected_list]
-        
-        if selected_responsible != "Todos":
-            df_unique_filtered = df_unique_filtered[df_unique_filtered['responsavel'] == selected_responsible]
-        
-        # DataFrame único de tasks principais para KPIs e gráficos
-        df_for_kpis_and_charts = df_unique_filtered
-        
-        # Para os gráficos de capacidade, usa todos os dados do log diário com filtros
-        df_daily_for_capacity = df_daily_log.copy()
-        if selected_list != "Todas":
-            df_daily_for_capacity = df_daily_for_capacity[df_daily_for_capacity['lista_origem'] == selected_list]
-        if selected_responsible != "Todos":
-            df_daily_for_capacity = df_daily_for_capacity[df_daily_for_capacity['responsavel'] == selected_responsible]
+        # DataFrame único de tasks principais para KPIs e gráficos (interseção das máscaras)
+        df_for_kpis_and_charts = filter_index.filtered_tasks(list_filter, responsible_filter)
         
         # Data para cálculo da semana (usa hoje)
         reference_date = datetime.today().date()
         
     else:
-        br_holidays = holidays.country_holidays('BR', years=selected_date.year)
+        feriado = holiday_name(selected_date)
         
         if selected_date.weekday() >= 5:
             st.warning("⚠️ Selecione apenas dias úteis para visualizar as tarefas.")
             df_for_kpis_and_charts = pd.DataFrame()
             df_daily_filtered_for_charts = pd.DataFrame()
-            df_daily_for_capacity = pd.DataFrame()
             reference_date = selected_date
-        elif selected_date in br_holidays:
-            st.warning(f"⚠️ O dia {selected_date.strftime('%d/%m/%Y')} é um feriado nacional: {br_holidays.get(selected_date)}.")
+        elif feriado:
+            st.warning(f"⚠️ O dia {selected_date.strftime('%d/%m/%Y')} é um feriado: {feriado}.")
             df_for_kpis_and_charts = pd.DataFrame()
             df_daily_filtered_for_charts = pd.DataFrame()
-            df_daily_for_capacity = pd.DataFrame()
             reference_date = selected_date
         else:
-            # Filtra a tabela de log diário
-            df_daily_filtered_for_charts = df_daily_log[df_daily_log['registro_data'] == selected_date].copy()
-            
-            if selected_list != "Todas":
-                df_daily_filtered_for_charts = df_daily_filtered_for_charts[df_daily_filtered_for_charts['lista_origem'] == selected_list]
-            
-            if selected_responsible != "Todos":
-                df_daily_filtered_for_charts = df_daily_filtered_for_charts[df_daily_filtered_for_charts['responsavel'] == selected_responsible]
-            
-            # DataFrame único para KPIs (drop_duplicates para contar por tarefa principal)
-            df_for_kpis_and_charts = df_daily_filtered_for_charts.drop_duplicates(subset=['clickup_id'], keep='first')
+            # Filtra o log diário pelo dia e pela segmentação
+            daily_for_day = filter_index.filtered_log(
+                start=selected_date, end=selected_date,
+                lista_origem=list_filter, responsavel=responsible_filter,
+            )
+            df_daily_filtered_for_charts = daily_for_day.to_frame(columns=['clickup_id', 'responsavel', 'lista_origem'])
             
-            # Para os gráficos de capacidade, usa a semana da data selecionada
-            df_daily_for_capacity = df_daily_log.copy()
-            if selected_list != "Todas":
-                df_daily_for_capacity = df_daily_for_capacity[df_daily_for_capacity['lista_origem'] == selected_list]
-            if selected_responsible != "Todos":
-                df_daily_for_capacity = df_daily_for_capacity[df_daily_for_capacity['responsavel'] == selected_responsible]
+            # DataFrame único para KPIs (uma linha por tarefa principal)
+            df_for_kpis_and_charts = daily_for_day.tasks_frame()
             
             reference_date = selected_date
     
@@ -397,8 +364,56 @@ if not df_full.empty:
         # Criação dos 4 KPIs em colunas com tamanhos iguais
         kpi_col1, kpi_col2, kpi_col3, kpi_col4 = st.columns(4)
 
+        # Os KPIs vêm prontos da API (/api/kpis/); sem ela, são calculados localmente
+        kpi_filters = {}
+        if selected_list != "Todas":
+            kpi_filters['lista_origem'] = selected_list
+        if selected_responsible != "Todos":
+            kpi_filters['responsavel'] = selected_responsible
+        if date_filter_mode == "Filtrar por data":
+            kpi_filters['date'] = selected_date.isoformat()
+        kpis = fetch_kpis_from_api(kpi_filters)
+        
+        if kpis is not None:
+            on_time_rate = kpis['delivery_performance']['on_time_rate']
+            on_time_count = kpis['delivery_performance']['on_time_count']
+            total_completed = kpis['delivery_performance']['total_completed']
+            incident_free_rate = kpis['quality']['incident_free_rate']
+            clean_projects = kpis['quality']['clean_projects']
+            total_projects = kpis['quality']['total_projects']
+            total_hours = kpis['planning']['total_planned_hours']
+            capacity_rate = kpis['capacity']['operational_capacity_rate']
+            if date_filter_mode == "Filtrar por data":
+                planned_hours = kpis['capacity']['planned_hours_day']
+                max_capacity = kpis['capacity']['max_capacity_day']
+            else:
+                planned_hours = kpis['capacity']['planned_hours_week']
+                max_capacity = kpis['capacity']['max_capacity_week']
+        else:
+            if date_filter_mode == "Filtrar por data":
+                # Todos os KPIs do dia em uma única passada
+                kpis = calculate_kpis(prepare_kpi_frame(df_for_kpis_and_charts))
+            else:
+                # Sem filtro de data, os KPIs de cada combinação de lista e responsável já estão calculados
+                kpis = get_group_metrics(get_grouped_kpis(df_full), selected_list, selected_responsible)
+            on_time_rate = kpis['delivery_performance']['on_time_rate']
+            on_time_count = kpis['delivery_performance']['on_time_count']
+            total_completed = kpis['delivery_performance']['total_completed']
+            incident_free_rate = kpis['quality']['incident_free_rate']
+            clean_projects = kpis['quality']['clean_projects']
+            total_projects = kpis['quality']['total_projects']
+            if date_filter_mode == "Filtrar por data":
+                total_hours = df_daily_filtered_for_charts['registro_horas'].sum() if 'registro_horas' in df_daily_filtered_for_charts.columns else 0
+                capacity_rate, planned_hours, max_capacity = get_capacity_cube(df_full).daily_capacity(
+                    selected_date, responsavel=responsible_filter, lista_origem=list_filter
+                )
+            else:
+                total_hours = kpis['planning']['total_planned_hours']
+                capacity_rate = kpis['capacity']['operational_capacity_rate']
+                planned_hours = kpis['capacity']['planned_hours_week']
+                max_capacity = kpis['capacity']['max_capacity_week']
+
         with kpi_col1:
-            on_time_rate, on_time_count, total_completed = calculate_on_time_delivery_rate(df_for_kpis_and_charts)
             create_kpi_card(
                 "Entrega no Prazo",
                 f"{on_time_rate:.1f}%",
@@ -406,7 +421,6 @@ if not df_full.empty:
             )
 
         with kpi_col2:
-            incident_free_rate, clean_projects, total_projects = calculate_incident_free_rate(df_for_kpis_and_charts)
             create_kpi_card(
                 "Qualidade",
                 f"{incident_free_rate:.1f}%",
@@ -415,10 +429,8 @@ if not df_full.empty:
 
         with kpi_col3:
             if date_filter_mode == "Filtrar por data":
-                total_hours = df_daily_filtered_for_charts['registro_horas'].sum() if 'registro_horas' in df_daily_filtered_for_charts.columns else 0
                 help_text = f"Total de horas planejadas para {selected_date.strftime('%d/%m/%Y')} (filtros aplicados)."
             else:
-                total_hours = calculate_total_planned_hours(df_for_kpis_and_charts)
                 help_text = "Soma total de horas estimadas para tarefas principais (sem parent_id) nos filtros selecionados."
             
             create_kpi_card(
@@ -430,12 +442,8 @@ if not df_full.empty:
         with kpi_col4:
             with st.container():               
                 if date_filter_mode == "Filtrar por data":
-                    capacity_rate, daily_hours, daily_capacity = calculate_daily_capacity_for_person_list(
-                        df_daily_filtered_for_charts, selected_responsible, selected_list
-                    )
-                    help_text = f"Capacidade operacional para {selected_date.strftime('%d/%m/%Y')}: {daily_hours:.0f}h de {daily_capacity:.0f}h disponíveis (filtros aplicados)."
+                    help_text = f"Capacidade operacional para {selected_date.strftime('%d/%m/%Y')}: {planned_hours:.0f}h de {max_capacity:.0f}h disponíveis (filtros aplicados)."
                 else:
-                    capacity_rate, planned_hours, max_capacity = calculate_operational_capacity(df_for_kpis_and_charts)
                     help_text = f"Capacidade operacional semanal: {planned_hours:.0f}h planejadas de {max_capacity:.0f}h disponíveis (filtros aplicados)."
                 
                 gauge_fig = create_gauge_chart(capacity_rate, "Capacidade", help_text)
@@ -4,19 +4,17 @@ import requests
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import timedelta, datetime
-import holidays
-from utils.api_conection import fetch_tasks_from_api
+from clickup_common.business_calendar import count_working_days, holiday_name
+from utils.api_conection import fetch_tasks_from_api, fetch_capacity_from_api, DASHBOARD_FIELDS
 
 # Importa as funções de cálculo refatoradas do módulo 'utils.calculate_dates'
 from utils.calculate_dates import (
-    calculate_incident_free_rate, 
+    calculate_kpis,
     calculate_lead_time, 
-    calculate_on_time_delivery_rate, 
-    calculate_operational_capacity, 
-    calculate_total_planned_hours,
-    create_daily_log,
-    calculate_daily_capacity_for_person_list
+    get_group_metrics,
+    prepare_kpi_frame
 )
+from utils.dataset_cache import get_capacity_cube, get_filter_index, get_grouped_kpis
 
 # --- Configuração da Página ---
 st.set_page_config(
@@ -282,13 +280,14 @@ def create_gauge_chart(value, title, help_text):
 
     return fig
 
-def calculate_weekly_capacity_data(df_daily_log, selected_date=None):
+def calculate_weekly_capacity_data(capacity_cube, selected_date=None, filters=None):
     """
     Calcula os dados de capacidade semanal para os gráficos.
     
     Args:
-        df_daily_log: DataFrame com log diário das tarefas
+        capacity_cube: CapacityCube das tarefas
         selected_date: Data selecionada (se None, usa a data atual)
+        filters: Filtros de lista/responsável (enviados para /api/capacity/ e aplicados no cubo)
     
     Returns:
         DataFrame com dados agregados por dia e responsável
@@ -300,15 +299,13 @@ def calculate_weekly_capacity_data(df_daily_log, selected_date=None):
     start_of_week = selected_date - timedelta(days=selected_date.weekday())
     end_of_week = start_of_week + timedelta(days=4)  # Sexta-feira
     
-    # Filtra dados da semana
-    df_week = df_daily_log[
-        (df_daily_log['registro_data'] >= start_of_week) &
-        (df_daily_log['registro_data'] <= end_of_week)
-    ].copy()
-    
-    # Agrupa por data e responsável, somando as horas
-    df_capacity = df_week.groupby(['registro_data', 'responsavel'])['registro_horas'].sum().reset_index()
-    df_capacity.columns = ['data', 'responsavel', 'horas_planejadas']
+    # A grade vem pronta do servidor; sem a API, é calculada com o log diário local
+    capacity = fetch_capacity_from_api(start_of_week, end_of_week, group_by='responsavel', filters=filters)
+    if capacity is not None:
+        df_capacity = capacity['grid']
+    else:
+        # Recorta a semana no cubo de capacidade (redução em cache por filtro)
+        df_capacity = capacity_cube.hours_by_day_and_responsavel(start_of_week, end_of_week, **(filters or {}))
     
     # Adiciona o dia da semana para melhor visualização
     df_capacity['dia_semana'] = pd.to_datetime(df_capacity['data']).dt.strftime('%a %d/%m')
@@ -328,14 +325,7 @@ def create_total_capacity_chart(df_capacity, start_of_week, end_of_week):
         Figura Plotly do gráfico de barras
     """
     # Calcula o número de dias úteis na semana (excluindo feriados e fins de semana)
-    br_holidays = holidays.country_holidays('BR', years=start_of_week.year)
-    dias_uteis = 0
-    current_date = start_of_week
-    
-    while current_date <= end_of_week:
-        if current_date.weekday() < 5 and current_date not in br_holidays:
-            dias_uteis += 1
-        current_date += timedelta(days=1)
+    dias_uteis = count_working_days(start_of_week, end_of_week)
     
     # Número único de responsáveis
     num_responsaveis = df_capacity['responsavel'].nunique()
@@ -490,14 +480,13 @@ def create_chart_card_with_help(title, help_text, chart_figure):
     st.markdown('</div>', unsafe_allow_html=True)
 
 # --- Carregar e processar os dados automaticamente ao iniciar a aplicação ---
-df_full = fetch_tasks_from_api()
+df_full = fetch_tasks_from_api(filters={'main_only': 'true'}, fields=DASHBOARD_FIELDS)
 
 # --- Layout da Aplicação ---
 if not df_full.empty:
-    # Cria o DataFrame base com log diário
-    df_daily_log = create_daily_log(df_full)
-    
-    # df_daily_log.to_csv('df_debug.csv', sep=',')
+    # Máscaras e opções da segmentação e log diário compacto (tarefa, dia, horas),
+    # montados uma vez por versão
+    filter_index = get_filter_index(df_full)
     
     # --- Seção de Filtros ---
     st.subheader("🔍 Segmentação de Dados")
@@ -505,22 +494,14 @@ if not df_full.empty:
     
     # --- Filtro de Lista de Origem ---
     with filter_col1:
-        # Tabela base para filtros, já filtrando por parent_id
-        df_unique_base = df_full[df_full['parent_id'].isnull()].drop_duplicates(subset=['clickup_id'], keep='first')
-        unique_lists_filter = ["Todas"] + sorted(df_unique_base['lista_origem'].unique().tolist())
-        selected_list = st.selectbox("📁 Filtrar por Lista de Origem:", unique_lists_filter)
+        # Opções já ordenadas no índice da segmentação
+        selected_list = st.selectbox("📁 Filtrar por Lista de Origem:", filter_index.list_options)
+        list_filter = selected_list if selected_list != "Todas" else None
 
     # --- Filtro de Responsável ---
     with filter_col2:
-        if selected_list != "Todas":
-            df_temp = df_unique_base[df_unique_base['lista_origem'] == selected_list]
-        else:
-            df_temp = df_unique_base
-        
-        # Filtra 'None' para a exibição no selectbox
-        df_temp_filtered_responsible = df_temp[df_temp['responsavel'].notna()]
-        unique_responsibles = ["Todos"] + sorted(df_temp_filtered_responsible['responsavel'].unique().tolist())
-        selected_responsible = st.selectbox("👤 Filtrar por Responsável:", unique_responsibles)
+        # Responsáveis (sem 'None') das tarefas da lista selecionada
+        selected_responsible = st.selectbox("👤 Filtrar por Responsável:", filter_index.responsible_options(list_filter))
 
     # --- Seletor de modo de filtro de data ---
     with filter_col3:
@@ -537,62 +518,46 @@ if not df_full.empty:
             )
 
     # --- Aplicação dos Filtros ---
+    responsible_filter = selected_responsible if selected_responsible != "Todos" else None
+    
     if date_filter_mode == "Todos os dias":
-        df_unique_filtered = df_unique_base.copy()
-        
-        if selected_list != "Todas":
-            df_unique_filtered = df_unique_filtered[df_unique_filtered['lista_origem'] == selected_list]
-        
-        if selected_responsible != "Todos":
-            df_unique_filtered = df_unique_filtered[df_unique_filtered['responsavel'] == selected_responsible]
+        # DataFrame único de tasks principais para KPIs e gráficos (interseção das máscaras)
+        df_for_kpis_and_charts = filter_index.filtered_tasks(list_filter, responsible_filter)
         
-        # DataFrame único de tasks principais para KPIs e gráficos
-        df_for_kpis_and_charts = df_unique_filtered
-        
-        # Para os gráficos de capacidade, usa todos os dados do log diário com filtros
-        df_daily_for_capacity = df_daily_log.copy()
-        if selected_list != "Todas":
-            df_daily_for_capacity = df_daily_for_capacity[df_daily_for_capacity['lista_origem'] == selected_list]
-        if selected_responsible != "Todos":
-            df_daily_for_capacity = df_daily_for_capacity[df_daily_for_capacity['responsavel'] == selected_responsible]
+        # Para os gráficos de capacidade, usa todas as tarefas com filtros
+        capacity_cube = get_capacity_cube(df_full)
         
         # Data para cálculo da semana (usa hoje)
         reference_date = datetime.today().date()
         
     else:
-        br_holidays = holidays.country_holidays('BR', years=selected_date.year)
+        feriado = holiday_name(selected_date)
         
         if selected_date.weekday() >= 5:
             st.warning("⚠️ Selecione apenas dias úteis para visualizar as tarefas.")
             df_for_kpis_and_charts = pd.DataFrame()
             df_daily_filtered_for_charts = pd.DataFrame()
-            df_daily_for_capacity = pd.DataFrame()
+            capacity_cube = None
             reference_date = selected_date
-        elif selected_date in br_holidays:
-            st.warning(f"⚠️ O dia {selected_date.strftime('%d/%m/%Y')} é um feriado nacional: {br_holidays.get(selected_date)}.")
+        elif feriado:
+            st.warning(f"⚠️ O dia {selected_date.strftime('%d/%m/%Y')} é um feriado: {feriado}.")
             df_for_kpis_and_charts = pd.DataFrame()
             df_daily_filtered_for_charts = pd.DataFrame()
-            df_daily_for_capacity = pd.DataFrame()
+            capacity_cube = None
             reference_date = selected_date
         else:
-            # Filtra a tabela de log diário
-            df_daily_filtered_for_charts = df_daily_log[df_daily_log['registro_data'] == selected_date].copy()
-            
-            if selected_list != "Todas":
-                df_daily_filtered_for_charts = df_daily_filtered_for_charts[df_daily_filtered_for_charts['lista_origem'] == selected_list]
-            
-            if selected_responsible != "Todos":
-                df_daily_filtered_for_charts = df_daily_filtered_for_charts[df_daily_filtered_for_charts['responsavel'] == selected_responsible]
+            # Filtra o log diário pelo dia e pela segmentação
+            daily_for_day = filter_index.filtered_log(
+                start=selected_date, end=selected_date,
+                lista_origem=list_filter, responsavel=responsible_filter,
+            )
+            df_daily_filtered_for_charts = daily_for_day.to_frame(columns=['clickup_id', 'responsavel', 'lista_origem'])
             
-            # DataFrame único para KPIs (drop_duplicates para contar por tarefa principal)
-            df_for_kpis_and_charts = df_daily_filtered_for_charts.drop_duplicates(subset=['clickup_id'], keep='first')
+            # DataFrame único para KPIs (uma linha por tarefa principal)
+            df_for_kpis_and_charts = daily_for_day.tasks_frame()
             
             # Para os gráficos de capacidade, usa a semana da data selecionada
-            df_daily_for_capacity = df_daily_log.copy()
-            if selected_list != "Todas":
-                df_daily_for_capacity = df_daily_for_capacity[df_daily_for_capacity['lista_origem'] == selected_list]
-            if selected_responsible != "Todos":
-                df_daily_for_capacity = df_daily_for_capacity[df_daily_for_capacity['responsavel'] == selected_responsible]
+            capacity_cube = get_capacity_cube(df_full)
             
             reference_date = selected_date
     
@@ -600,11 +565,20 @@ if not df_full.empty:
 
     # --- Seção de KPIs ---
     if not df_for_kpis_and_charts.empty:
+        # KPIs da segmentação: da tabela por lista e responsável ou, no modo por data,
+        # em uma única passada sobre as tarefas do dia
+        if date_filter_mode == "Filtrar por data":
+            kpis = calculate_kpis(prepare_kpi_frame(df_for_kpis_and_charts))
+        else:
+            kpis = get_group_metrics(get_grouped_kpis(df_full), selected_list, selected_responsible)
+        
         # Criação dos 4 KPIs em colunas com tamanhos iguais
         kpi_col1, kpi_col2, kpi_col3, kpi_col4 = st.columns(4)
 
         with kpi_col1:
-            on_time_rate, on_time_count, total_completed = calculate_on_time_delivery_rate(df_for_kpis_and_charts)
+            on_time_rate = kpis['delivery_performance']['on_time_rate']
+            on_time_count = kpis['delivery_performance']['on_time_count']
+            total_completed = kpis['delivery_performance']['total_completed']
             create_kpi_card(
                 "Entrega no Prazo",
                 f"{on_time_rate:.1f}%",
@@ -612,7 +586,9 @@ if not df_full.empty:
             )
 
         with kpi_col2:
-            incident_free_rate, clean_projects, total_projects = calculate_incident_free_rate(df_for_kpis_and_charts)
+            incident_free_rate = kpis['quality']['incident_free_rate']
+            clean_projects = kpis['quality']['clean_projects']
+            total_projects = kpis['quality']['total_projects']
             create_kpi_card(
                 "Qualidade",
                 f"{incident_free_rate:.1f}%",
@@ -624,7 +600,7 @@ if not df_full.empty:
                 total_hours = df_daily_filtered_for_charts['registro_horas'].sum() if 'registro_horas' in df_daily_filtered_for_charts.columns else 0
                 help_text = f"Total de horas planejadas para {selected_date.strftime('%d/%m/%Y')} (filtros aplicados)."
             else:
-                total_hours = calculate_total_planned_hours(df_for_kpis_and_charts)
+                total_hours = kpis['planning']['total_planned_hours']
                 help_text = "Soma total de horas estimadas para tarefas principais (sem parent_id) nos filtros selecionados."
             
             create_kpi_card(
@@ -636,12 +612,14 @@ if not df_full.empty:
         with kpi_col4:
             with st.container():
                 if date_filter_mode == "Filtrar por data":
-                    capacity_rate, daily_hours, daily_capacity = calculate_daily_capacity_for_person_list(
-                        df_daily_filtered_for_charts, selected_responsible, selected_list
+                    capacity_rate, daily_hours, daily_capacity = capacity_cube.daily_capacity(
+                        selected_date, responsavel=responsible_filter, lista_origem=list_filter
                     )
                     help_text = f"Capacidade operacional para {selected_date.strftime('%d/%m/%Y')}: {daily_hours:.0f}h de {daily_capacity:.0f}h disponíveis (filtros aplicados)."
                 else:
-                    capacity_rate, planned_hours, max_capacity = calculate_operational_capacity(df_for_kpis_and_charts)
+                    capacity_rate = kpis['capacity']['operational_capacity_rate']
+                    planned_hours = kpis['capacity']['planned_hours_week']
+                    max_capacity = kpis['capacity']['max_capacity_week']
                     help_text = f"Capacidade operacional semanal: {planned_hours:.0f}h planejadas de {max_capacity:.0f}h disponíveis (filtros aplicados)."
                 
                 gauge_fig = create_gauge_chart(capacity_rate, "Capacidade", help_text)
@@ -653,11 +631,17 @@ if not df_full.empty:
         st.subheader("📊 Análise de Capacidade Semanal")
         
         # Prepara os dados de capacidade se houver dados disponíveis
-        if not df_daily_for_capacity.empty and 'df_daily_for_capacity' in locals():
+        if capacity_cube is not None and not capacity_cube.empty:
             # Calcula os dados de capacidade para a semana
+            capacity_filters = {}
+            if selected_list != "Todas":
+                capacity_filters['lista_origem'] = selected_list
+            if selected_responsible != "Todos":
+                capacity_filters['responsavel'] = selected_responsible
             df_capacity_data, start_week, end_week = calculate_weekly_capacity_data(
-                df_daily_for_capacity, 
-                reference_date
+                capacity_cube, 
+                reference_date,
+                filters=capacity_filters
             )
             
             if not df_capacity_data.empty:
@@ -4,8 +4,8 @@ import requests
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import timedelta, datetime
-import holidays
-from utils.api_conection import fetch_tasks_from_api
+from clickup_common.business_calendar import working_days_in_range
+from utils.api_conection import fetch_tasks_from_api, fetch_capacity_from_api, DASHBOARD_FIELDS
 
 # Importa as funções de cálculo refatoradas do módulo 'utils.calculate_dates'
 from utils.calculate_dates import (
@@ -14,9 +14,9 @@ from utils.calculate_dates import (
     calculate_on_time_delivery_rate, 
     calculate_operational_capacity, 
     calculate_total_planned_hours,
-    create_daily_log,
     calculate_daily_capacity_for_person_list
 )
+from utils.dataset_cache import get_capacity_cube, get_daily_log
 
 # --- Configuração da Página ---
 st.set_page_config(
@@ -293,27 +293,14 @@ def get_working_days_in_range(start_date, end_date):
     Returns:
         List: Lista de datas dos dias úteis
     """
-    # Obtém feriados brasileiros para os anos do período
-    years = list(range(start_date.year, end_date.year + 1))
-    br_holidays = holidays.country_holidays('BR', years=years)
-    
-    working_days = []
-    current_date = start_date
-    
-    while current_date <= end_date:
-        # Verifica se é dia útil (segunda a sexta) e não é feriado
-        if current_date.weekday() < 5 and current_date not in br_holidays:
-            working_days.append(current_date)
-        current_date += timedelta(days=1)
-    
-    return working_days
+    return working_days_in_range(start_date, end_date).tolist()
 
-def calculate_period_capacity_data(df_daily_log, start_date, end_date, total_company_responsaveis):
+def calculate_period_capacity_data(capacity_cube, start_date, end_date, total_company_responsaveis):
     """
     Calcula os dados de capacidade para o período especificado.
     
     Args:
-        df_daily_log: DataFrame com log diário das tarefas
+        capacity_cube: CapacityCube das tarefas
         start_date: Data de início do período
         end_date: Data de fim do período
         total_company_responsaveis: Número total de responsáveis da empresa
@@ -321,11 +308,13 @@ def calculate_period_capacity_data(df_daily_log, start_date, end_date, total_com
     Returns:
         DataFrame com dados agregados por dia
     """
-    # Filtra dados do período
-    df_period = df_daily_log[
-        (df_daily_log['registro_data'] >= start_date) &
-        (df_daily_log['registro_data'] <= end_date)
-    ].copy()
+    # As horas por dia útil vêm prontas do servidor quando a API está disponível
+    capacity = fetch_capacity_from_api(start_date, end_date, group_by='day')
+    if capacity is not None:
+        df_capacity = capacity['grid'].rename(columns={'horas_planejadas': 'horas_planejadas_total'})
+        df_capacity.insert(1, 'dia_semana', [d.strftime('%a %d/%m') for d in df_capacity['data']])
+        df_capacity.insert(2, 'capacidade_maxima_empresa', total_company_responsaveis * 8)
+        return df_capacity
     
     # Obtém todos os dias úteis do período
     working_days = get_working_days_in_range(start_date, end_date)
@@ -337,13 +326,16 @@ def calculate_period_capacity_data(df_daily_log, start_date, end_date, total_com
         'capacidade_maxima_empresa': [total_company_responsaveis * 8] * len(working_days)
     })
     
-    # Agrupa dados do período por data, somando todas as horas planejadas
-    if not df_period.empty:
-        df_aggregated = df_period.groupby(['registro_data'])['registro_horas'].sum().reset_index()
+    # Soma as horas planejadas do período por data (recorte do cubo de capacidade)
+    df_aggregated = capacity_cube.hours_by_day(start_date, end_date)
+    if not df_aggregated.empty:
         df_aggregated.columns = ['data', 'horas_planejadas_total']
         
-        # Faz merge com o DataFrame base
-        df_capacity = pd.merge(df_base, df_aggregated, on='data', how='left')
+        # Faz merge com o DataFrame base; mantém, como a API, os dias de início
+        # das tarefas sem dias úteis (fim de semana ou feriado com horas)
+        df_capacity = pd.merge(df_base, df_aggregated, on='data', how='outer').sort_values('data', ignore_index=True)
+        df_capacity['dia_semana'] = [d.strftime('%a %d/%m') for d in df_capacity['data']]
+        df_capacity['capacidade_maxima_empresa'] = total_company_responsaveis * 8
     else:
         df_capacity = df_base.copy()
         df_capacity['horas_planejadas_total'] = 0
@@ -445,15 +437,18 @@ def create_chart_card_with_help(title, help_text, chart_figure):
     st.plotly_chart(chart_figure, use_container_width=True, config={'displayModeBar': False})
 
 # --- Carregar e processar os dados automaticamente ao iniciar a aplicação ---
-df_full = fetch_tasks_from_api()
+df_full = fetch_tasks_from_api(fields=DASHBOARD_FIELDS)
 
 # --- Layout da Aplicação ---
 if not df_full.empty:
     # IMPORTANTE: Calcula o número total de responsáveis únicos da empresa ANTES dos filtros
     total_company_responsaveis = df_full['responsavel'].nunique()
     
-    # Cria o DataFrame base com log diário
-    df_daily_log = create_daily_log(df_full)
+    # Cria o log diário compacto (tarefa, dia, horas)
+    daily_log = get_daily_log(df_full)
+    
+    # Cubo de horas planejadas (dia x responsável x lista), montado uma vez por versão
+    capacity_cube = get_capacity_cube(df_full)
         
     # --- Seção de Gráficos de Capacidade com Filtro de Período ---
     st.subheader("📊 Análise de Capacidade por Período")
@@ -492,9 +487,9 @@ if not df_full.empty:
         st.warning("⚠️ Período muito longo (>90 dias). Para melhor visualização, recomenda-se períodos menores.")
     else:
         # Prepara os dados de capacidade para o período
-        if not df_daily_log.empty:
+        if not capacity_cube.empty:
             df_period_capacity = calculate_period_capacity_data(
-                df_daily_log, 
+                capacity_cube, 
                 period_start, 
                 period_end,
                 total_company_responsaveis
@@ -503,7 +498,8 @@ if not df_full.empty:
             if not df_period_capacity.empty:
                 # Calcula KPIs baseados no período selecionado
                 total_planned_period = df_period_capacity['horas_planejadas_total'].sum()
-                working_days = len(df_period_capacity)
+                # A grade pode ter dias não úteis com horas de tarefas sem dias úteis
+                working_days = len(get_working_days_in_range(period_start, period_end))
                 total_capacity_period = working_days * total_company_responsaveis * 8
                 overall_utilization = (total_planned_period / total_capacity_period * 100) if total_capacity_period > 0 else 0
                 avg_daily_planned = total_planned_period / working_days if working_days > 0 else 0
@@ -635,23 +631,13 @@ if not df_full.empty:
                 # Tabela de Tarefas Principais do Período
                 st.subheader("📋 Tarefas Principais do Período")
                 
-                # Filtra tarefas principais (sem parent_id) que têm atividade no período
-                df_tasks_period = df_daily_log[
-                    (df_daily_log['registro_data'] >= period_start) &
-                    (df_daily_log['registro_data'] <= period_end) &
-                    (df_daily_log['parent_id'].isnull())
-                ].copy()
+                # Tarefas principais (o log só contém estas) com atividade no período
+                tasks_period_log = daily_log.filter(start=period_start, end=period_end)
                 
-                if not df_tasks_period.empty:
-                    # Remove duplicatas para mostrar cada tarefa apenas uma vez
-                    df_tasks_display = df_tasks_period.drop_duplicates(subset=['clickup_id'], keep='first').copy()
-                    
-                    # Calcula total de horas por tarefa no período
-                    df_hours_summary = df_tasks_period.groupby(['clickup_id'])['registro_horas'].sum().reset_index()
-                    df_hours_summary.columns = ['clickup_id', 'total_horas_periodo']
-                    
-                    # Faz merge com os dados principais
-                    df_tasks_display = pd.merge(df_tasks_display, df_hours_summary, on='clickup_id', how='left')
+                if not tasks_period_log.empty:
+                    # Cada tarefa aparece uma vez, com o total de horas no período
+                    df_tasks_display = tasks_period_log.tasks_frame().reset_index(drop=True)
+                    df_tasks_display['total_horas_periodo'] = tasks_period_log.hours_by_task()
                     
                     # Prepara colunas para exibição
                     df_tasks_display['ID ClickUp'] = df_tasks_display['clickup_id']
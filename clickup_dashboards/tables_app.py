@@ -2,9 +2,9 @@ import streamlit as st
 import pandas as pd
 import requests
 from datetime import timedelta, datetime
-import holidays
+from clickup_common.business_calendar import holiday_name, is_working_day
 from utils.api_conection import fetch_tasks_from_api
-from utils.calculate_dates import create_daily_log
+from utils.dataset_cache import get_daily_log, get_filter_index
 
 
 # --- Configuração da Página ---
@@ -20,14 +20,16 @@ st.markdown("Visualize as tarefas em formato de tabela para conferência e anál
 
 
 # --- Carregar os dados automaticamente ao iniciar a aplicação ---
-df_full = fetch_tasks_from_api()
-df_full.to_csv("df_full_debug.csv", sep=';')
+df_full = fetch_tasks_from_api(filters={'main_only': 'true'})
 
 # --- Layout da Aplicação ---
 if not df_full.empty:
-    # Cria o DataFrame base com log diário
-    df_daily_log = create_daily_log(df_full)
-    df_daily_log.to_csv("daily_logo_debug.csv", sep=';')
+    # Cria o log diário compacto (tarefa, dia, horas); as colunas das tarefas
+    # só são juntadas quando a tabela é exibida
+    daily_log = get_daily_log(df_full)
+    
+    # Máscaras e opções da segmentação, montadas uma vez por versão
+    filter_index = get_filter_index(df_full)
     
     # --- Seção de Filtros ---
     st.subheader("🔍 Segmentação de Dados")
@@ -35,22 +37,14 @@ if not df_full.empty:
     
     # --- Filtro de Lista de Origem ---
     with filter_col1:
-        # Tabela base para filtros, já filtrando por parent_id
-        df_unique_base = df_full[df_full['parent_id'].isnull()].drop_duplicates(subset=['clickup_id'], keep='first')
-        unique_lists_filter = ["Todas"] + sorted(df_unique_base['lista_origem'].unique().tolist())
-        selected_list = st.selectbox("📁 Filtrar por Lista de Origem:", unique_lists_filter)
+        # Opções já ordenadas no índice da segmentação
+        selected_list = st.selectbox("📁 Filtrar por Lista de Origem:", filter_index.list_options)
+        list_filter = selected_list if selected_list != "Todas" else None
 
     # --- Filtro de Responsável ---
     with filter_col2:
-        if selected_list != "Todas":
-            df_temp = df_unique_base[df_unique_base['lista_origem'] == selected_list]
-        else:
-            df_temp = df_unique_base
-        
-        # Filtra 'None' para a exibição no selectbox
-        df_temp_filtered_responsible = df_temp[df_temp['responsavel'].notna()]
-        unique_responsibles = ["Todos"] + sorted(df_temp_filtered_responsible['responsavel'].unique().tolist())
-        selected_responsible = st.selectbox("👤 Filtrar por Responsável:", unique_responsibles)
+        # Responsáveis (sem 'None') das tarefas da lista selecionada
+        selected_responsible = st.selectbox("👤 Filtrar por Responsável:", filter_index.responsible_options(list_filter))
 
     # --- Seletor de modo de filtro de data ---
     with filter_col3:
@@ -67,62 +61,38 @@ if not df_full.empty:
             )
 
     # --- Aplicação dos Filtros ---
+    responsible_filter = selected_responsible if selected_responsible != "Todos" else None
+    
     if date_filter_mode == "Todos os dias":
-        df_unique_filtered = df_unique_base.copy()
-        
-        if selected_list != "Todas":
-            df_unique_filtered = df_unique_filtered[df_unique_filtered['lista_origem'] == selected_list]
-        
-        if selected_responsible != "Todos":
-            df_unique_filtered = df_unique_filtered[df_unique_filtered['responsavel'] == selected_responsible]
-        
-        # DataFrame único de tasks principais para KPIs e gráficos
-        df_for_kpis_and_charts = df_unique_filtered
-        
-        # Para os gráficos de capacidade, usa todos os dados do log diário com filtros
-        df_daily_for_capacity = df_daily_log.copy()
-        if selected_list != "Todas":
-            df_daily_for_capacity = df_daily_for_capacity[df_daily_for_capacity['lista_origem'] == selected_list]
-        if selected_responsible != "Todos":
-            df_daily_for_capacity = df_daily_for_capacity[df_daily_for_capacity['responsavel'] == selected_responsible]
+        # DataFrame único de tasks principais para KPIs e gráficos (interseção das máscaras)
+        df_for_kpis_and_charts = filter_index.filtered_tasks(list_filter, responsible_filter)
         
         # Data para cálculo da semana (usa hoje)
         reference_date = datetime.today().date()
         
     else:
-        br_holidays = holidays.country_holidays('BR', years=selected_date.year)
+        feriado = holiday_name(selected_date)
         
         if selected_date.weekday() >= 5:
             st.warning("⚠️ Selecione apenas dias úteis para visualizar as tarefas.")
             df_for_kpis_and_charts = pd.DataFrame()
             df_daily_filtered_for_charts = pd.DataFrame()
-            df_daily_for_capacity = pd.DataFrame()
             reference_date = selected_date
-        elif selected_date in br_holidays:
-            st.warning(f"⚠️ O dia {selected_date.strftime('%d/%m/%Y')} é um feriado nacional: {br_holidays.get(selected_date)}.")
+        elif feriado:
+            st.warning(f"⚠️ O dia {selected_date.strftime('%d/%m/%Y')} é um feriado: {feriado}.")
             df_for_kpis_and_charts = pd.DataFrame()
             df_daily_filtered_for_charts = pd.DataFrame()
-            df_daily_for_capacity = pd.DataFrame()
             reference_date = selected_date
         else:
-            # Filtra a tabela de log diário
-            df_daily_filtered_for_charts = df_daily_log[df_daily_log['registro_data'] == selected_date].copy()
-            
-            if selected_list != "Todas":
-                df_daily_filtered_for_charts = df_daily_filtered_for_charts[df_daily_filtered_for_charts['lista_origem'] == selected_list]
-            
-            if selected_responsible != "Todos":
-                df_daily_filtered_for_charts = df_daily_filtered_for_charts[df_daily_filtered_for_charts['responsavel'] == selected_responsible]
-            
-            # DataFrame único para KPIs (drop_duplicates para contar por tarefa principal)
-            df_for_kpis_and_charts = df_daily_filtered_for_charts.drop_duplicates(subset=['clickup_id'], keep='first')
+            # Filtra o log diário pelo dia e pela segmentação; a tabela do dia é exibida inteira
+            daily_for_day = filter_index.filtered_log(
+                start=selected_date, end=selected_date,
+                lista_origem=list_filter, responsavel=responsible_filter,
+            )
+            df_daily_filtered_for_charts = daily_for_day.to_frame()
             
-            # Para os gráficos de capacidade, usa a semana da data selecionada
-            df_daily_for_capacity = df_daily_log.copy()
-            if selected_list != "Todas":
-                df_daily_for_capacity = df_daily_for_capacity[df_daily_for_capacity['lista_origem'] == selected_list]
-            if selected_responsible != "Todos":
-                df_daily_for_capacity = df_daily_for_capacity[df_daily_for_capacity['responsavel'] == selected_responsible]
+            # DataFrame único para KPIs (uma linha por tarefa principal)
+            df_for_kpis_and_charts = daily_for_day.tasks_frame()
             
             reference_date = selected_date
     
@@ -130,18 +100,10 @@ if not df_full.empty:
 
     # --- Aplicação dos filtros nas tabelas originais ---
     # Filtra tarefas principais com base nos filtros selecionados
-    main_tasks = df_full[df_full['parent_id'].isnull()].copy()
-    if selected_list != "Todas":
-        main_tasks = main_tasks[main_tasks['lista_origem'] == selected_list]
-    if selected_responsible != "Todos":
-        main_tasks = main_tasks[main_tasks['responsavel'] == selected_responsible]
+    main_tasks = filter_index.filtered_tasks(list_filter, responsible_filter)
 
     # Filtra log diário com base nos filtros selecionados
-    df_daily_log_filtered = df_daily_log.copy()
-    if selected_list != "Todas":
-        df_daily_log_filtered = df_daily_log_filtered[df_daily_log_filtered['lista_origem'] == selected_list]
-    if selected_responsible != "Todos":
-        df_daily_log_filtered = df_daily_log_filtered[df_daily_log_filtered['responsavel'] == selected_responsible]
+    daily_log_filtered = filter_index.filtered_log(lista_origem=list_filter, responsavel=responsible_filter)
 
     with st.expander("📁 Tarefas Principais"):
         if not main_tasks.empty:
@@ -174,7 +136,7 @@ if not df_full.empty:
             
     st.markdown("---")
     with st.expander("🗓️ Tabela de Registro Diário", expanded=True):
-        if not df_daily_log_filtered.empty:
+        if not daily_log_filtered.empty:
             # Define as colunas que devem aparecer com seus novos nomes
             columns_to_show = {
                 'task_nome': 'Tarefa',
@@ -196,7 +158,11 @@ if not df_full.empty:
             
             # A tabela responde apenas aos filtros da seção de Segmentação de Dados
             if date_filter_mode == "Todos os dias":
-                # Exibe a tabela completa filtrada apenas pelos filtros de segmentação
+                # Exibe a tabela completa filtrada apenas pelos filtros de segmentação,
+                # juntando ao log só as colunas exibidas
+                df_daily_log_filtered = daily_log_filtered.to_frame(
+                    columns=[column for column in columns_to_show if column in daily_log.tasks.columns]
+                )
                 available_columns = {k: v for k, v in columns_to_show.items() if k in df_daily_log_filtered.columns}
                 df_display = df_daily_log_filtered[list(available_columns.keys())].rename(columns=available_columns)
                 st.dataframe(df_display, use_container_width=True)
@@ -207,7 +173,7 @@ if not df_full.empty:
                     df_display = df_daily_filtered_for_charts[list(available_columns.keys())].rename(columns=available_columns)
                     st.dataframe(df_display, use_container_width=True)
                 else:
-                    if selected_date.weekday() >= 5 or selected_date in holidays.country_holidays('BR', years=selected_date.year):
+                    if not is_working_day(selected_date):
                         st.info("Nenhuma tarefa agendada para este dia.")
                     else:
                         st.info(f"Nenhuma tarefa agendada para o dia {selected_date.strftime('%d/%m/%Y')}.")
@@ -1,3 +1,371 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
 
-# Create your tests here.
+import holidays
+import pandas as pd
+import requests
+from django.test import SimpleTestCase
+
+from clickup_dashboards.utils import api_conection
+from clickup_dashboards.utils.calculate_dates import (
+    ALL_LISTS,
+    ALL_RESPONSIBLES,
+    calculate_all_metrics,
+    calculate_grouped_kpis,
+    calculate_incident_free_rate,
+    calculate_kpis,
+    calculate_lead_time,
+    calculate_on_time_delivery_rate,
+    calculate_operational_capacity,
+    calculate_total_planned_hours,
+    create_daily_log,
+    get_group_metrics,
+    prepare_kpi_frame,
+)
+from clickup_dashboards.utils.capacity_cube import CapacityCube
+from clickup_dashboards.utils.daily_log import DailyLog
+from clickup_dashboards.utils.filter_index import FilterIndex
+from clickup_dashboards.utils.snapshot_cache import load_snapshot, snapshot_key, snapshot_lock, store_snapshot
+
+
+def reference_create_daily_log(df):
+    """Implementação original (tarefa a tarefa, dia a dia), usada como referência."""
+    main_tasks = df[df['parent_id'].isnull()].copy()
+    main_tasks['data_inicio'] = pd.to_datetime(main_tasks['data_inicio'], errors='coerce')
+    main_tasks['data_fechamento'] = pd.to_datetime(main_tasks['data_fechamento'], errors='coerce')
+    main_tasks['tempo_estimado'] = pd.to_numeric(main_tasks['tempo_estimado'], errors='coerce').fillna(0)
+
+    years = []
+    for col in ['data_inicio', 'data_fechamento']:
+        years.extend(main_tasks[col].dropna().dt.year.unique())
+    br_holidays = holidays.country_holidays('BR', years=list(set(years)))
+
+    daily_records = []
+    for index, row in main_tasks.iterrows():
+        if pd.isna(row['data_inicio']):
+            continue
+        start_date = row['data_inicio'].date()
+        if pd.notna(row['data_fechamento']):
+            end_date = row['data_fechamento'].date()
+        else:
+            end_date = datetime.today().date()
+        if end_date < start_date:
+            end_date = start_date
+
+        current_date = start_date
+        working_days = []
+        while current_date <= end_date:
+            if current_date.weekday() < 5 and current_date not in br_holidays:
+                working_days.append(current_date)
+            current_date += timedelta(days=1)
+        if not working_days:
+            working_days = [start_date]
+
+        horas_por_dia = row['tempo_estimado'] / len(working_days)
+        for working_day in working_days:
+            new_row = row.copy()
+            new_row['registro'] = f"{working_day.strftime('%d/%m/%Y')} ({horas_por_dia:.3f}h)"
+            new_row['registro_data'] = working_day
+            new_row['registro_horas'] = horas_por_dia
+            daily_records.append(new_row)
+
+    return pd.DataFrame(daily_records)
+
+
+class CreateDailyLogParityTests(SimpleTestCase):
+    """create_daily_log vetorizado deve gerar os mesmos registros da implementação original."""
+
+    def build_tasks(self):
+        today = date.today()
+        return pd.DataFrame([
+            # Atravessa Natal e Ano Novo
+            {'clickup_id': 'a', 'parent_id': None, 'responsavel': 'Ana', 'lista_origem': 'Design',
+             'data_inicio': '2024-12-20', 'data_fechamento': '2025-01-03', 'tempo_estimado': 40},
+            # Só fim de semana: tudo no dia de início
+            {'clickup_id': 'b', 'parent_id': None, 'responsavel': 'Bruno', 'lista_origem': 'Dev',
+             'data_inicio': '2025-03-01', 'data_fechamento': '2025-03-02', 'tempo_estimado': 5},
+            # Fechada antes do início
+            {'clickup_id': 'c', 'parent_id': None, 'responsavel': 'Ana', 'lista_origem': 'Dev',
+             'data_inicio': '2025-04-10', 'data_fechamento': '2025-04-01', 'tempo_estimado': 3},
+            # Em aberto: vai até hoje
+            {'clickup_id': 'd', 'parent_id': None, 'responsavel': 'Carla', 'lista_origem': 'Design',
+             'data_inicio': (today - timedelta(days=20)).isoformat(), 'data_fechamento': None, 'tempo_estimado': 7},
+            # Feriado de Tiradentes em um único dia (sem dias úteis)
+            {'clickup_id': 'e', 'parent_id': None, 'responsavel': 'Bruno', 'lista_origem': 'Dev',
+             'data_inicio': '2025-04-21', 'data_fechamento': '2025-04-21', 'tempo_estimado': 2},
+            # Sem tempo estimado
+            {'clickup_id': 'f', 'parent_id': None, 'responsavel': 'Carla', 'lista_origem': 'Dev',
+             'data_inicio': '2025-05-05', 'data_fechamento': '2025-05-09', 'tempo_estimado': None},
+            # Sem data de início: ignorada
+            {'clickup_id': 'g', 'parent_id': None, 'responsavel': 'Ana', 'lista_origem': 'Dev',
+             'data_inicio': None, 'data_fechamento': '2025-05-09', 'tempo_estimado': 8},
+            # Subtarefa: ignorada
+            {'clickup_id': 'h', 'parent_id': 'a', 'responsavel': 'Ana', 'lista_origem': 'Design',
+             'data_inicio': '2025-01-06', 'data_fechamento': '2025-01-10', 'tempo_estimado': 10},
+            # Horas que não dividem exatamente pelos dias úteis
+            {'clickup_id': 'i', 'parent_id': None, 'responsavel': 'Bruno', 'lista_origem': 'Design',
+             'data_inicio': '2023-02-17', 'data_fechamento': '2023-02-24', 'tempo_estimado': 10},
+        ])
+
+    def test_matches_reference_implementation(self):
+        tasks = self.build_tasks()
+        expected = reference_create_daily_log(tasks)
+        result = create_daily_log(tasks)
+
+        self.assertEqual(list(result.index), list(expected.index))
+        self.assertEqual(list(result['clickup_id']), list(expected['clickup_id']))
+        self.assertEqual(list(result['registro']), list(expected['registro']))
+        self.assertEqual(list(result['registro_data']), list(expected['registro_data']))
+        self.assertEqual(list(result['registro_horas']), list(expected['registro_horas']))
+
+    def test_does_not_modify_input(self):
+        tasks = self.build_tasks()
+        original = tasks.copy()
+        create_daily_log(tasks)
+        pd.testing.assert_frame_equal(tasks, original)
+
+    def test_without_start_dates_returns_empty(self):
+        tasks = self.build_tasks()
+        tasks['data_inicio'] = None
+        self.assertTrue(create_daily_log(tasks).empty)
+
+
+class CapacityCubeParityTests(SimpleTestCase):
+    """As reduções do CapacityCube devem bater com as agregações do log diário."""
+
+    build_tasks = CreateDailyLogParityTests.build_tasks
+
+    def test_hours_by_day_and_responsavel_matches_daily_log(self):
+        daily_log = DailyLog.from_tasks(self.build_tasks())
+        cube = CapacityCube(daily_log.tasks)
+        start, end = date(2023, 1, 1), date.today()
+
+        expected = daily_log.filter(start=start, end=end).hours_by('registro_data', 'responsavel')
+        result = cube.hours_by_day_and_responsavel(start, end)
+
+        self.assertEqual(list(result['data']), list(expected['registro_data']))
+        self.assertEqual(list(result['responsavel']), list(expected['responsavel']))
+        for value, reference in zip(result['horas_planejadas'], expected['registro_horas']):
+            self.assertAlmostEqual(value, reference)
+
+    def test_filtered_views_match_daily_log(self):
+        daily_log = DailyLog.from_tasks(self.build_tasks())
+        cube = CapacityCube(daily_log.tasks)
+        start, end = date(2024, 12, 1), date(2025, 5, 31)
+
+        for filters in ({'lista_origem': 'Design'}, {'responsavel': 'Bruno'}, {'responsavel': 'Bruno', 'lista_origem': 'Dev'}):
+            expected = daily_log.filter(start=start, end=end, **filters).hours_by('registro_data')
+            result = cube.hours_by_day(start, end, **filters)
+
+            self.assertEqual(list(result['data']), list(expected['registro_data']))
+            for value, reference in zip(result['horas_planejadas'], expected['registro_horas']):
+                self.assertAlmostEqual(value, reference)
+            self.assertAlmostEqual(cube.total_hours(start, end, **filters), expected['registro_horas'].sum())
+
+    def test_unknown_filter_value_is_empty(self):
+        cube = CapacityCube(DailyLog.from_tasks(self.build_tasks()).tasks)
+        self.assertTrue(cube.hours_by_day(date(2023, 1, 1), date.today(), responsavel='Ninguém').empty)
+
+    def test_daily_capacity_counts_active_members(self):
+        cube = CapacityCube(DailyLog.from_tasks(self.build_tasks()).tasks)
+
+        # Tiradentes: só a tarefa 'e' (Bruno), com todas as horas no dia de início
+        self.assertEqual(cube.daily_capacity(date(2025, 4, 21)), (25.0, 2.0, 8))
+        self.assertEqual(cube.daily_capacity(date(2025, 4, 21), lista_origem='Design'), (0, 0.0, 0))
+        # Fim de semana sem tarefas
+        self.assertEqual(cube.daily_capacity(date(2025, 3, 8)), (0, 0.0, 0))
+
+
+class FilterIndexTests(SimpleTestCase):
+    """As máscaras do FilterIndex devem reproduzir os filtros feitos direto nos DataFrames."""
+
+    build_tasks = CreateDailyLogParityTests.build_tasks
+
+    def build_index(self):
+        tasks = self.build_tasks()
+        return tasks, FilterIndex(tasks, DailyLog.from_tasks(tasks))
+
+    def test_options_are_sorted_without_nulls(self):
+        _, index = self.build_index()
+        self.assertEqual(index.list_options, ["Todas", "Design", "Dev"])
+        self.assertEqual(index.responsible_options(), ["Todos", "Ana", "Bruno", "Carla"])
+        self.assertEqual(index.responsible_options('Design'), ["Todos", "Ana", "Bruno", "Carla"])
+        self.assertEqual(index.responsible_options('Dev'), ["Todos", "Ana", "Bruno", "Carla"])
+
+    def test_filtered_tasks_matches_boolean_filters(self):
+        tasks, index = self.build_index()
+        main = tasks[tasks['parent_id'].isnull()]
+        expected = main[(main['lista_origem'] == 'Dev') & (main['responsavel'] == 'Bruno')]
+        self.assertEqual(list(index.filtered_tasks('Dev', 'Bruno')['clickup_id']), list(expected['clickup_id']))
+        self.assertTrue(index.filtered_tasks('Inexistente').empty)
+
+    def test_filtered_log_matches_daily_log_filter(self):
+        tasks, index = self.build_index()
+        daily_log = index.daily_log
+        for kwargs in (
+            {},
+            {'lista_origem': 'Design'},
+            {'start': date(2024, 12, 23), 'end': date(2024, 12, 31), 'responsavel': 'Ana'},
+            {'start': date(2025, 4, 21), 'end': date(2025, 4, 21)},
+        ):
+            expected = daily_log.filter(**kwargs)
+            result = index.filtered_log(**kwargs)
+            self.assertEqual(list(result.task_index), list(expected.task_index))
+            self.assertEqual(list(result.days), list(expected.days))
+
+
+class CalculateKpisTests(SimpleTestCase):
+    """calculate_kpis deve reproduzir as funções de cada KPI sem alterar o DataFrame."""
+
+    def build_tasks(self):
+        today = date.today()
+        monday = today - timedelta(days=today.weekday())
+        tasks = CreateDailyLogParityTests.build_tasks(self)
+        tasks['prazo'] = [
+            '2025-01-02', '2025-03-05', None, monday.isoformat(), '2025-04-20',
+            (monday + timedelta(days=4)).isoformat(), None, '2025-01-08', '2023-02-20',
+        ]
+        tasks['tags'] = ['Projeto A', 'Projeto A', 'Projeto B', None, 'Projeto C', 'Projeto B', None, 'Projeto A', 'Projeto C']
+        tasks.loc[tasks['clickup_id'] == 'e', 'lista_origem'] = 'Incidentes'
+        return tasks
+
+    def expected_metrics(self, tasks):
+        on_time_rate, on_time_count, total_completed = calculate_on_time_delivery_rate(tasks)
+        incident_free_rate, clean_projects, total_projects = calculate_incident_free_rate(tasks)
+        capacity_rate, planned_hours, max_capacity = calculate_operational_capacity(tasks)
+        avg_lead_time, _ = calculate_lead_time(tasks)
+        return {
+            'delivery_performance': {'on_time_rate': round(on_time_rate, 2), 'on_time_count': on_time_count, 'total_completed': total_completed},
+            'quality': {'incident_free_rate': round(incident_free_rate, 2), 'clean_projects': clean_projects, 'total_projects': total_projects},
+            'planning': {'total_planned_hours': round(calculate_total_planned_hours(tasks), 2)},
+            'capacity': {'operational_capacity_rate': round(capacity_rate, 2), 'planned_hours_week': round(planned_hours, 2), 'max_capacity_week': max_capacity},
+            'efficiency': {'average_lead_time': round(avg_lead_time, 2) if avg_lead_time else 0},
+        }
+
+    def test_matches_individual_functions(self):
+        tasks = self.build_tasks()
+        self.assertEqual(calculate_kpis(prepare_kpi_frame(tasks)), self.expected_metrics(tasks))
+        self.assertEqual(calculate_all_metrics(tasks), self.expected_metrics(tasks))
+
+    def test_does_not_modify_input(self):
+        tasks = self.build_tasks()
+        original = tasks.copy()
+        prepared = prepare_kpi_frame(tasks)
+        typed = prepared.copy()
+
+        calculate_all_metrics(tasks)
+        calculate_kpis(prepared)
+        calculate_on_time_delivery_rate(tasks)
+        calculate_incident_free_rate(tasks)
+        calculate_operational_capacity(tasks)
+        calculate_lead_time(tasks)
+
+        pd.testing.assert_frame_equal(tasks, original)
+        pd.testing.assert_frame_equal(prepared, typed)
+        self.assertIs(prepare_kpi_frame(prepared), prepared)
+
+    def test_empty_frame(self):
+        tasks = self.build_tasks().iloc[:0]
+        self.assertEqual(calculate_kpis(prepare_kpi_frame(tasks))['planning']['total_planned_hours'], 0)
+
+    def test_incident_free_rate_ignores_tasks_without_tags(self):
+        # Só o Projeto C tem tarefa em lista de incidentes; a tarefa sem tag em
+        # 'incidente crítico' não forma um projeto
+        tasks = self.build_tasks()
+        tasks.loc[tasks['clickup_id'] == 'd', 'lista_origem'] = 'incidente crítico'
+        incident_free_rate, clean_projects, total_projects = calculate_incident_free_rate(tasks)
+        self.assertAlmostEqual(incident_free_rate, 200 / 3)
+        self.assertEqual((clean_projects, total_projects), (2, 3))
+        self.assertEqual(calculate_incident_free_rate(tasks.iloc[:0]), (0.0, 0, 0))
+
+
+class GroupedKpisTests(SimpleTestCase):
+    """Cada linha de calculate_grouped_kpis deve bater com calculate_kpis nas tarefas filtradas."""
+
+    build_tasks = CalculateKpisTests.build_tasks
+
+    def test_every_combination_matches_filtered_kpis(self):
+        tasks = prepare_kpi_frame(self.build_tasks())
+        grouped = calculate_grouped_kpis(tasks)
+
+        for lista_origem in [ALL_LISTS, *sorted(tasks['lista_origem'].dropna().unique())]:
+            for responsavel in [ALL_RESPONSIBLES, *sorted(tasks['responsavel'].dropna().unique())]:
+                filtered = tasks
+                if lista_origem != ALL_LISTS:
+                    filtered = filtered[filtered['lista_origem'] == lista_origem]
+                if responsavel != ALL_RESPONSIBLES:
+                    filtered = filtered[filtered['responsavel'] == responsavel]
+                with self.subTest(lista_origem=lista_origem, responsavel=responsavel):
+                    self.assertEqual(get_group_metrics(grouped, lista_origem, responsavel), calculate_kpis(filtered))
+
+    def test_unknown_combination_is_empty(self):
+        grouped = calculate_grouped_kpis(prepare_kpi_frame(self.build_tasks()))
+        self.assertEqual(get_group_metrics(grouped, 'Inexistente'), calculate_kpis(self.build_tasks().iloc[:0]))
+
+
+class SnapshotCacheTests(SimpleTestCase):
+    """Cópias das consultas em disco, compartilhadas entre os processos por versão."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_dir = directory.name
+        self.key = snapshot_key({'main_only': 'true'}, arrow=False)
+
+    def test_key_depends_on_params_and_format(self):
+        self.assertEqual(self.key, snapshot_key({'main_only': 'true'}, arrow=False))
+        self.assertNotEqual(self.key, snapshot_key({'main_only': 'true'}, arrow=True))
+        self.assertNotEqual(self.key, snapshot_key({}, arrow=False))
+
+    def test_store_replaces_previous_versions(self):
+        self.assertIsNone(load_snapshot(self.cache_dir, self.key))
+        store_snapshot(self.cache_dir, self.key, '"v1"', pd.DataFrame({'a': [1]}), version=1)
+        store_snapshot(self.cache_dir, self.key, '"v2"', pd.DataFrame({'a': [2]}), version=2)
+
+        latest = load_snapshot(self.cache_dir, self.key)
+        self.assertEqual((latest['etag'], latest['version'], latest['df']['a'].tolist()), ('"v2"', 2, [2]))
+        self.assertEqual(load_snapshot(self.cache_dir, self.key, version=2)['etag'], '"v2"')
+        self.assertIsNone(load_snapshot(self.cache_dir, self.key, version=1))
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_lock_is_released(self):
+        with snapshot_lock(self.cache_dir, self.key):
+            self.assertEqual(os.listdir(self.cache_dir), [f'tasks-{self.key}.lock'])
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+
+class VersionListenerTests(SimpleTestCase):
+    """Sem conexão com os eventos, os caches voltam a ser limpos pelo TTL."""
+
+    def run_listener(self, listen_results):
+        """Roda o listener com relógio simulado até 'listen_results' acabar ou 1000s passarem."""
+        clock = [0.0]
+
+        def sleep(seconds):
+            clock[0] += seconds
+            if clock[0] > 1000:
+                raise StopIteration
+
+        fake_time = SimpleNamespace(monotonic=lambda: clock[0], sleep=sleep)
+        listener = api_conection._VersionListener()
+        with patch.object(api_conection, 'time', fake_time), \
+                patch.object(api_conection, 'API_CACHE_TTL', 300), \
+                patch.object(api_conection, '_clear_api_caches') as clear_caches, \
+                patch.object(listener, 'listen', side_effect=listen_results), \
+                self.assertLogs(api_conection.logger, 'DEBUG'):
+            with self.assertRaises(StopIteration):
+                listener.run()
+        return clear_caches.call_count
+
+    def test_persistent_failure_clears_caches_every_ttl(self):
+        error = requests.exceptions.HTTPError('401 Client Error')
+        # Falhas em 0s, 1s, 3s, ... (espera até 60s): limpezas em 303s, 603s e 903s
+        self.assertEqual(self.run_listener(error), 3)
+
+    def test_reconnection_restarts_the_countdown(self):
+        error = requests.exceptions.ConnectionError('502 Bad Gateway')
+        # Duas quedas de 243s cada, separadas por uma conexão bem-sucedida
+        self.assertEqual(self.run_listener([error] * 9 + [True] + [error] * 9), 0)
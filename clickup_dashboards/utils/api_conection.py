@@ -2,8 +2,21 @@ import streamlit as st
 import requests
 import pandas as pd
 import os
+import json
+import logging
+import threading
+import time
 from dotenv import load_dotenv
 
+from .snapshot_cache import arrow_snapshot_version, load_arrow_snapshot, load_snapshot, snapshot_key, snapshot_lock, store_snapshot
+
+try:
+    import pyarrow as pa
+except ImportError:  # Sem pyarrow, os dados são baixados em JSON paginado
+    pa = None
+
+logger = logging.getLogger(__name__)
+
 # Carrega variáveis de ambiente do .env.local em ambiente de desenvolvimento
 load_dotenv(dotenv_path='.env.local')
 
@@ -11,55 +24,545 @@ load_dotenv(dotenv_path='.env.local')
 API_URL = os.getenv("API_URL")
 API_TOKEN = os.getenv("DJANGO_API_TOKEN") # Carrega o token
 
+# Endpoint de mudanças incrementais (padrão: <API_URL>changes/)
+API_CHANGES_URL = os.getenv("API_CHANGES_URL", f"{API_URL.rstrip('/')}/changes/" if API_URL else None)
+
+# Endpoint de KPIs calculados no servidor (padrão: /api/kpis/ ao lado de API_URL)
+API_KPIS_URL = os.getenv("API_KPIS_URL", f"{API_URL.rstrip('/').rsplit('/', 1)[0]}/kpis/" if API_URL else None)
+
+# Endpoint da grade de capacidade calculada no servidor (padrão: /api/capacity/)
+API_CAPACITY_URL = os.getenv("API_CAPACITY_URL", f"{API_URL.rstrip('/').rsplit('/', 1)[0]}/capacity/" if API_URL else None)
+
+# Quantidade de tarefas por página ao percorrer a API
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "5000"))
+
+# Verificação barata da versão atual do conjunto (padrão: /api/version/)
+API_VERSION_URL = os.getenv("API_VERSION_URL", f"{API_URL.rstrip('/').rsplit('/', 1)[0]}/version/" if API_URL else None)
+
+# Stream de eventos de nova versão (ex.: <host>/api/events/). Opcional e só
+# para o deploy ASGI: sob WSGI cada dashboard conectado prenderia um worker
+# do gunicorn. Vazio (padrão) mantém a revalidação a cada API_CACHE_TTL segundos
+API_EVENTS_URL = os.getenv("API_EVENTS_URL") or None
+
+# Tempo (em segundos) que o Streamlit reaproveita os dados em memória antes de
+# revalidar com a API. Com os eventos ativos, os dados só são descartados
+# quando uma sincronização publica uma nova versão; este valor volta a valer
+# se o servidor não tiver o endpoint de eventos ou enquanto ele estiver fora.
+API_CACHE_TTL = int(os.getenv("API_CACHE_TTL", "300"))
+_MEMORY_CACHE_TTL = None if API_EVENTS_URL else API_CACHE_TTL
+
+# Pasta onde a última resposta de cada consulta fica salva junto com seu ETag e
+# versão; aponte todos os dashboards para a mesma pasta para compartilhar as cópias
+API_CACHE_DIR = os.getenv("API_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache'))
+
+# Snapshot Arrow publicado por sync_clickup_data_direct (CLICKUP_SNAPSHOT_PATH).
+# Quando os dashboards rodam na mesma máquina que a sincronização, ele é aberto
+# via memory-map em vez de baixar as tarefas da API; vazio desativa.
+API_SNAPSHOT_PATH = os.getenv(
+    "API_SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '.cache', 'snapshots', 'tasks.arrow'),
+)
+
+# Formato colunar Arrow IPC, servido pela API quando o pyarrow está instalado
+ARROW_STREAM_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+
+# Colunas usadas pelos KPIs e gráficos dos dashboards (projeção ?fields=)
+DASHBOARD_FIELDS = (
+    'clickup_id', 'task_nome', 'status', 'data_criacao', 'data_fechamento',
+    'data_inicio', 'prazo', 'responsavel', 'tags', 'parent_id', 'prioridade',
+    'tempo_estimado', 'lista_origem',
+)
+
 # --- Funções de Lógica e Cálculo dos KPIs ---
-@st.cache_data
-def fetch_tasks_from_api():
-    """Busca os dados da API com autenticação e cria um DataFrame com cache."""
+def fetch_tasks_from_api(filters=None, fields=None):
+    """
+    Busca os dados da API com autenticação e cria um DataFrame com cache.
+
+    Quando o snapshot Arrow da sincronização (API_SNAPSHOT_PATH) está na
+    versão atual do servidor e atende à consulta, o DataFrame vem dele e é o
+    mesmo objeto para todas as sessões do processo. Caso contrário, as
+    tarefas vêm de _fetch_tasks_cached.
+
+    Args:
+        filters (dict): Filtros aplicados no servidor (ex.: {'main_only': 'true',
+            'lista_origem': 'Design', 'prazo__gte': '2025-01-01'})
+        fields (tuple): Colunas a serem retornadas (padrão: todas)
+    """
     if not API_URL:
         st.error("Variável de ambiente 'API_URL' não configurada.")
         return pd.DataFrame()
-        
+    
+    df = _load_local_snapshot(filters, fields)
+    if df is not None:
+        return df
+    return _fetch_tasks_cached(filters, fields)
+
+
+@st.cache_data(ttl=_MEMORY_CACHE_TTL)
+def _fetch_tasks_cached(filters=None, fields=None):
+    """
+    Busca os dados da API, com cópia em memória por sessão (st.cache_data).
+
+    A última resposta de cada consulta fica salva em API_CACHE_DIR, por versão
+    do conjunto, e é compartilhada por todos os processos dos dashboards.
+    Antes de baixar, a versão atual é consultada em /api/version/: se já
+    houver cópia dela em disco, nada mais é baixado. Caso contrário, um único
+    processo atualiza a cópia (os demais aguardam e a reaproveitam), baixando
+    apenas as tarefas alteradas e removidas desde a versão salva
+    (/api/tasks/changes/); o conjunto completo só é baixado de novo quando o
+    servidor não tem mais o histórico dessa versão.
+
+    Args:
+        filters (dict): Filtros aplicados no servidor
+        fields (tuple): Colunas a serem retornadas (padrão: todas)
+    """
     # Adiciona o token de autenticação nos headers da requisição
     headers = {
         'Authorization': f'Token {API_TOKEN}'
     }
     
     try:
-        response = requests.get(API_URL, headers=headers)
+        params = dict(filters or {})
+        if fields:
+            params['fields'] = ','.join(fields)
+        key = snapshot_key(params, arrow=pa is not None)
+        
+        # Verificação barata: se a versão atual já está em disco, não baixa nada
+        server_version = _fetch_server_version(headers)
+        if server_version is not None:
+            snapshot = load_snapshot(API_CACHE_DIR, key, server_version)
+            if snapshot is not None:
+                return _with_version(snapshot['df'], server_version)
+        
+        with snapshot_lock(API_CACHE_DIR, key):
+            # Outro processo pode ter salvo a versão enquanto aguardávamos
+            if server_version is not None:
+                snapshot = load_snapshot(API_CACHE_DIR, key, server_version)
+                if snapshot is not None:
+                    return _with_version(snapshot['df'], server_version)
+            return _with_version(_download_tasks(headers, params, key), server_version)
+    except requests.exceptions.RequestException as e:
+        st.error(f"Erro ao conectar com a API: {e}")
+        st.warning("Verifique a URL da API e se o servidor do Django está rodando.")
+        return pd.DataFrame()
+
+
+def _with_version(df, version):
+    """
+    Marca o DataFrame com a versão do conjunto (df.attrs['dataset_version']),
+    usada como chave pelas estruturas derivadas montadas uma vez por versão.
+    """
+    df.attrs['dataset_version'] = version
+    return df
+
+
+def _load_local_snapshot(filters, fields):
+    """
+    Usa o snapshot Arrow da sincronização quando ele atende à consulta: mesma
+    versão do servidor e nenhum filtro além de main_only (os dashboards
+    pedem apenas tarefas principais e a projeção DASHBOARD_FIELDS).
+
+    Returns:
+        DataFrame: Tarefas do snapshot, ou None para buscar na API
+    """
+    filters = dict(filters or {})
+    if not API_SNAPSHOT_PATH or set(filters) - {'main_only'}:
+        return None
+    
+    server_version = _current_server_version()
+    if server_version is None:
+        # Não guarda a falha: a próxima execução consulta a versão de novo
+        _current_server_version.clear()
+        return None
+    # A sincronização publica a versão antes de regravar o arquivo
+    if arrow_snapshot_version(API_SNAPSHOT_PATH) != server_version:
+        return None
+    
+    main_only = str(filters.get('main_only', '')).lower() == 'true'
+    return _snapshot_for_version(server_version, tuple(fields) if fields else None, main_only)
+
+
+@st.cache_data(ttl=_MEMORY_CACHE_TTL, show_spinner=False)
+def _current_server_version():
+    """Versão atual do servidor, revalidada junto com os dados em memória."""
+    return _fetch_server_version({'Authorization': f'Token {API_TOKEN}'})
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _snapshot_for_version(version, fields, main_only):
+    """
+    DataFrame do snapshot Arrow, convertido uma vez por processo e versão.
+
+    st.cache_resource devolve o mesmo objeto para todas as sessões (sem a
+    cópia por sessão do st.cache_data), então cada processo guarda uma única
+    cópia do conjunto e os buffers Arrow ficam nas páginas compartilhadas do
+    arquivo mapeado.
+    """
+    df, _ = load_arrow_snapshot(API_SNAPSHOT_PATH, version=version, fields=fields, main_only=main_only)
+    if df is None or df.empty:
+        return None
+    return _with_version(_prepare_tasks(df), version)
+
+
+def _download_tasks(headers, params, key):
+    """Atualiza a cópia salva de uma consulta (delta, revalidação ou download completo)."""
+    cached = load_snapshot(API_CACHE_DIR, key)
+    if cached is not None and cached.get('version'):
+        # Aplica à cópia salva apenas o que mudou desde a versão dela
+        df = _fetch_tasks_changes(headers, params, key, cached)
+        if df is not None:
+            return df
+    elif cached is not None:
+        # Revalida a cópia salva em disco com o servidor
+        headers = {**headers, 'If-None-Match': cached['etag']}
+    
+    if pa is not None:
+        df, etag, version = _fetch_tasks_arrow(headers, params)
+    else:
+        df, etag, version = _fetch_tasks_json(headers, params)
+    
+    if df is None:
+        # 304: o conjunto não mudou desde a última cópia salva
+        return cached['df']
+    
+    if df.empty:
+        st.warning("A API não retornou dados. Verifique se o banco de dados está populado e o servidor do Django está rodando.")
+        return pd.DataFrame()
+    
+    df = _prepare_tasks(df)
+    
+    # Salva o DataFrame já tratado para os outros processos e a próxima revalidação
+    if etag:
+        store_snapshot(API_CACHE_DIR, key, etag, df, version)
+    
+    return df
+
+
+@st.cache_data(ttl=_MEMORY_CACHE_TTL)
+def fetch_kpis_from_api(filters=None):
+    """
+    Busca os KPIs já calculados no servidor (/api/kpis/).
+
+    Args:
+        filters (dict): Filtros dos dashboards (lista_origem, responsavel, date, week)
+
+    Returns:
+        dict: Mesmos grupos de calculate_all_metrics, ou None se a API não
+              estiver disponível (o dashboard calcula localmente)
+    """
+    if not API_KPIS_URL:
+        return None
+    
+    headers = {
+        'Authorization': f'Token {API_TOKEN}'
+    }
+    try:
+        response = requests.get(API_KPIS_URL, headers=headers, params=filters or {})
+        response.raise_for_status() # Lança um erro para status 4xx ou 5xx
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        logger.warning("KPIs indisponíveis na API, calculando localmente: %s", e)
+        return None
+
+
+@st.cache_data(ttl=_MEMORY_CACHE_TTL)
+def fetch_capacity_from_api(start_date, end_date, group_by='responsavel', filters=None):
+    """
+    Busca a grade de horas planejadas do período no servidor (/api/capacity/).
+
+    Args:
+        start_date (date): Início do período
+        end_date (date): Fim do período
+        group_by (str): 'responsavel', 'lista' ou 'day'
+        filters (dict): Filtros de lista_origem/responsavel
+
+    Returns:
+        dict: Resposta da API com 'grid' convertido em DataFrame (coluna 'data'
+              como date), ou None se a API não estiver disponível
+    """
+    if not API_CAPACITY_URL:
+        return None
+    
+    headers = {
+        'Authorization': f'Token {API_TOKEN}'
+    }
+    params = {
+        **(filters or {}),
+        'start': start_date.isoformat(),
+        'end': end_date.isoformat(),
+        'group_by': group_by,
+    }
+    try:
+        response = requests.get(API_CAPACITY_URL, headers=headers, params=params)
+        response.raise_for_status() # Lança um erro para status 4xx ou 5xx
+        data = response.json()
+    except requests.exceptions.RequestException as e:
+        logger.warning("Capacidade indisponível na API, calculando localmente: %s", e)
+        return None
+    
+    columns = ['data', 'horas_planejadas'] if group_by == 'day' else ['data', group_by, 'horas_planejadas']
+    grid = pd.DataFrame(data['grid'], columns=columns)
+    grid['data'] = pd.to_datetime(grid['data']).dt.date
+    data['grid'] = grid
+    return data
+
+
+def _prepare_tasks(df):
+    """Ajusta nomes e tipos das colunas recebidas da API."""
+    # Mapeia as colunas do JSON para os nomes esperados pelas funções
+    column_mapping = {
+        'clickup_id': 'clickup_id',
+        'task_nome': 'task_nome', 
+        'status': 'status',
+        'data_criacao': 'data_criacao',
+        'data_fechamento': 'data_fechamento',
+        'responsavel': 'responsavel',
+        'tags': 'tags',
+        'parent_id': 'parent_id',
+        'prioridade': 'prioridade',
+        'prazo': 'prazo',
+        'time_estimate': 'tempo_estimado',
+        'lista_origem': 'lista_origem'
+    }
+    
+    # Renomeia as colunas se necessário
+    df = df.rename(columns=column_mapping)
+    
+    # Converte time_estimate para numérico (assumindo que está em horas)
+    if 'tempo_estimado' in df.columns:
+        df['tempo_estimado'] = pd.to_numeric(df['tempo_estimado'], errors='coerce').fillna(0)
+    
+    return df
+
+
+def _fetch_tasks_changes(headers, params, key, cached):
+    """
+    Atualiza a cópia salva com /api/tasks/changes/, baixando apenas as
+    tarefas alteradas e os IDs removidos desde a versão da cópia.
+
+    Returns:
+        DataFrame: Cópia atualizada, ou None se for preciso baixar tudo novamente
+    """
+    response = requests.get(API_CHANGES_URL, headers=headers, params={**params, 'since': cached['version']})
+    if response.status_code in (404, 410):
+        # Servidor sem o endpoint ou histórico de mudanças já descartado
+        return None
+    response.raise_for_status() # Lança um erro para status 4xx ou 5xx
+    
+    data = response.json()
+    df = cached['df']
+    if data['version'] == cached['version']:
+        return df
+    if 'clickup_id' not in df.columns:
+        return None
+    
+    # Remove as tarefas excluídas e as versões antigas das alteradas
+    replaced = set(data['deleted']) | {task['clickup_id'] for task in data['tasks']}
+    df = df[~df['clickup_id'].isin(replaced)]
+    
+    if data['tasks']:
+        changes = _prepare_tasks(pd.DataFrame(data['tasks']))
+        changes = changes[changes.columns.intersection(df.columns)]
+        # Mantém os tipos da cópia salva (ex.: datas vindas do Arrow)
+        for column in changes.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[column]):
+                changes[column] = pd.to_datetime(changes[column], errors='coerce')
+        df = pd.concat([df, changes], ignore_index=True)
+    
+    df = df.reset_index(drop=True)
+    store_snapshot(API_CACHE_DIR, key, cached['etag'], df, data['version'])
+    return df
+
+
+def _fetch_tasks_json(headers, params):
+    """
+    Percorre as páginas da API pelo cursor, convertendo cada página em
+    DataFrame assim que chega para não acumular o JSON bruto em memória.
+
+    Returns:
+        tuple: (DataFrame, ETag e versão da primeira página), ou (None, None, None) em um 304
+    """
+    params = {'page_size': API_PAGE_SIZE, **params}
+    pages = []
+    etag = None
+    version = None
+    while True:
+        response = requests.get(API_URL, headers=headers, params=params)
+        if response.status_code == 304:
+            return None, None, None
         response.raise_for_status() # Lança um erro para status 4xx ou 5xx
         
+        # Só a primeira página é condicional; as demais seguem a mesma versão
+        if etag is None:
+            etag = response.headers.get('ETag', '')
+            version = _response_version(response)
+            headers = {key: value for key, value in headers.items() if key != 'If-None-Match'}
+        
         data = response.json()
         tasks = data.get("tasks", [])
-        if not tasks:
-            st.warning("A API não retornou dados. Verifique se o banco de dados está populado e o servidor do Django está rodando.")
-            return pd.DataFrame()
-        
-        df = pd.DataFrame(tasks)
+        if tasks:
+            pages.append(pd.DataFrame(tasks))
         
-        # Mapeia as colunas do JSON para os nomes esperados pelas funções
-        column_mapping = {
-            'clickup_id': 'clickup_id',
-            'task_nome': 'task_nome', 
-            'status': 'status',
-            'data_criacao': 'data_criacao',
-            'data_fechamento': 'data_fechamento',
-            'responsavel': 'responsavel',
-            'tags': 'tags',
-            'parent_id': 'parent_id',
-            'prioridade': 'prioridade',
-            'prazo': 'prazo',
-            'time_estimate': 'tempo_estimado',
-            'lista_origem': 'lista_origem'
+        next_cursor = data.get("next_cursor")
+        if not next_cursor:
+            break
+        params['cursor'] = next_cursor
+    
+    if not pages:
+        return pd.DataFrame(), etag, version
+    return pd.concat(pages, ignore_index=True), etag, version
+
+
+def _fetch_tasks_arrow(headers, params):
+    """
+    Baixa o conjunto completo como stream Arrow IPC e converte para pandas.
+
+    As colunas já chegam tipadas (datas como datetime64, números como float64),
+    e as colunas numéricas são convertidas sem cópia a partir do buffer recebido.
+
+    Returns:
+        tuple: (DataFrame, ETag, versão), ou (None, None, None) em um 304
+    """
+    response = requests.get(API_URL, headers={**headers, 'Accept': ARROW_STREAM_MEDIA_TYPE}, params=params)
+    if response.status_code == 406:
+        # Servidor sem pyarrow: volta para o JSON paginado
+        return _fetch_tasks_json(headers, params)
+    if response.status_code == 304:
+        return None, None, None
+    response.raise_for_status() # Lança um erro para status 4xx ou 5xx
+    
+    table = pa.ipc.open_stream(response.content).read_all()
+    df = table.to_pandas(date_as_object=False, split_blocks=True, self_destruct=True)
+    return df, response.headers.get('ETag', ''), _response_version(response)
+
+
+def _fetch_server_version(headers):
+    """
+    Versão atual do conjunto segundo /api/version/ (uma leitura pela chave
+    primária no servidor), ou None se o endpoint não estiver disponível.
+    """
+    if not API_VERSION_URL:
+        return None
+    try:
+        response = requests.get(API_VERSION_URL, headers=headers, timeout=10)
+        response.raise_for_status() # Lança um erro para status 4xx ou 5xx
+        return int(response.json()['version'])
+    except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+        logger.warning("Versão do conjunto indisponível na API: %s", e)
+        return None
+
+
+def _response_version(response):
+    """Versão do conjunto informada pela API no cabeçalho X-Dataset-Version."""
+    try:
+        return int(response.headers.get('X-Dataset-Version', ''))
+    except ValueError:
+        return None
+
+
+# --- Invalidação por eventos de nova versão ---
+def _clear_api_caches():
+    """Descarta os dados da API guardados em memória pelo Streamlit."""
+    _fetch_tasks_cached.clear()
+    _current_server_version.clear()
+    fetch_kpis_from_api.clear()
+    fetch_capacity_from_api.clear()
+
+
+def _iter_sse_events(response):
+    """Lê um stream SSE e gera cada evento como {'id', 'event', 'data'}."""
+    event = {}
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            if 'data' in event:
+                yield event
+            event = {}
+        elif line.startswith(':'):
+            continue  # Comentário (keep-alive)
+        else:
+            field, _, value = line.partition(':')
+            event[field] = value[1:] if value.startswith(' ') else value
+
+
+class _VersionListener(threading.Thread):
+    """
+    Thread em segundo plano que acompanha /api/events/ e limpa os caches
+    quando a versão do conjunto muda.
+
+    Reconecta com espera crescente quando a conexão cai, enviando o
+    Last-Event-ID; se a versão tiver mudado enquanto estava desconectada, o
+    primeiro evento após a reconexão já limpa os caches. Se o servidor não
+    tiver o endpoint, ou enquanto a conexão falhar (401, 502, timeout...),
+    volta a limpar os caches a cada API_CACHE_TTL segundos, como sem eventos.
+    """
+
+    def __init__(self):
+        super().__init__(name='api-version-listener', daemon=True)
+        self.version = None
+
+    def run(self):
+        backoff = 1
+        # Momento da última limpeza enquanto desconectado (None = conectado)
+        cleared_at = None
+        while True:
+            try:
+                if not self.listen():
+                    # Servidor sem eventos: mesmo comportamento do TTL
+                    time.sleep(API_CACHE_TTL)
+                    _clear_api_caches()
+                    continue
+                backoff = 1
+                cleared_at = None
+            except (requests.exceptions.RequestException, ValueError) as e:
+                # Só a primeira falha vira aviso; as tentativas seguintes ficam no debug
+                log = logger.warning if backoff == 1 else logger.debug
+                log("Conexão com os eventos da API perdida, reconectando em %ss: %s", backoff, e)
+
+                # Sem eventos, os caches (sem TTL) nunca seriam limpos: enquanto
+                # a conexão falhar, limpa-os a cada API_CACHE_TTL segundos
+                now = time.monotonic()
+                if cleared_at is None:
+                    cleared_at = now
+                elif now - cleared_at >= API_CACHE_TTL:
+                    _clear_api_caches()
+                    cleared_at = now
+
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+    def listen(self):
+        """Consome o stream até o servidor encerrar; False se o endpoint não existir."""
+        headers = {
+            'Authorization': f'Token {API_TOKEN}',
+            'Accept': 'text/event-stream',
         }
+        if self.version is not None:
+            headers['Last-Event-ID'] = str(self.version)
         
-        # Renomeia as colunas se necessário
-        df = df.rename(columns=column_mapping)
-        
-        # Converte time_estimate para numérico (assumindo que está em horas)
-        df['tempo_estimado'] = pd.to_numeric(df['tempo_estimado'], errors='coerce').fillna(0)
-        
-        return df
-    except requests.exceptions.RequestException as e:
-        st.error(f"Erro ao conectar com a API: {e}")
-        st.warning("Verifique a URL da API e se o servidor do Django está rodando.")
-        return pd.DataFrame()
\ No newline at end of file
+        # O servidor envia keep-alives; sem nada por 60s, a conexão é refeita
+        with requests.get(API_EVENTS_URL, headers=headers, stream=True, timeout=(10, 60)) as response:
+            if response.status_code == 404:
+                return False
+            response.raise_for_status() # Lança um erro para status 4xx ou 5xx
+            for event in _iter_sse_events(response):
+                if event.get('event') == 'version':
+                    self.on_version(int(json.loads(event['data'])['version']))
+        return True
+
+    def on_version(self, version):
+        if self.version is not None and version != self.version:
+            logger.info("Nova versão do conjunto publicada (%s), limpando os caches da API.", version)
+            _clear_api_caches()
+        self.version = version
+
+
+@st.cache_resource
+def _start_version_listener():
+    """Inicia uma única thread de eventos por processo do Streamlit."""
+    listener = _VersionListener()
+    listener.start()
+    return listener
+
+
+if API_EVENTS_URL:
+    _start_version_listener()
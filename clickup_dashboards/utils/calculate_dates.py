@@ -1,6 +1,22 @@
+import functools
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 
+from .daily_log import DailyLog
+
+# Colunas de data usadas pelos KPIs
+KPI_DATE_COLUMNS = ('prazo', 'data_fechamento', 'data_inicio')
+
+
+def _as_datetime(series):
+    """Converte para datetime sem fuso (datas locais); colunas já tipadas não são reconvertidas."""
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        series = pd.to_datetime(series, errors='coerce')
+    if getattr(series.dt, 'tz', None) is not None:
+        series = series.dt.tz_localize(None)
+    return series
+
 
 def calculate_on_time_delivery_rate(df):
     """
@@ -20,26 +36,21 @@ def calculate_on_time_delivery_rate(df):
         return 0, 0, 0
     
     # Converte as colunas de data para datetime, tratando erros como NaT
-    df['prazo'] = pd.to_datetime(df['prazo'], errors='coerce')
-    df['data_fechamento'] = pd.to_datetime(df['data_fechamento'], errors='coerce')
+    # (sem alterar o DataFrame recebido)
+    prazo = _as_datetime(df['prazo'])
+    data_fechamento = _as_datetime(df['data_fechamento'])
     
     # Conta o total de tarefas concluídas (com data de fechamento preenchida)
-    df_completed = df[df['data_fechamento'].notnull()]
-    total_completed = len(df_completed)
+    completed = data_fechamento.notnull()
+    total_completed = int(completed.sum())
     
     # Se não há tarefas concluídas, retorna zeros
     if total_completed == 0: 
         return 0, 0, 0
     
-    # Filtra tarefas que foram concluídas no prazo
+    # Conta quantas tarefas foram concluídas no prazo
     # (data_fechamento <= prazo)
-    df_on_time = df_completed[
-        (df_completed['prazo'].notnull()) & 
-        (df_completed['data_fechamento'] <= df_completed['prazo'])
-    ]
-    
-    # Conta quantas tarefas foram entregues no prazo
-    on_time_count = len(df_on_time)
+    on_time_count = int((completed & prazo.notnull() & (data_fechamento <= prazo)).sum())
     
     # Calcula o percentual de entregas no prazo
     on_time_rate = (on_time_count / total_completed) * 100
@@ -47,12 +58,39 @@ def calculate_on_time_delivery_rate(df):
     return on_time_rate, on_time_count, total_completed
 
 
+@functools.lru_cache(maxsize=1024)
+def _is_incident_list(lista_origem):
+    """Indica se a lista de origem é de incidentes (contém 'Incidente', sem diferenciar maiúsculas)."""
+    return 'incidente' in str(lista_origem).lower()
+
+
+def _incident_flags(lista_origem):
+    """
+    Flag de incidente de cada tarefa, consultando _is_incident_list uma vez por
+    lista distinta (a flag depende apenas de 'lista_origem'). Nulos não são incidentes.
+    """
+    codes, listas = pd.factorize(lista_origem)
+    lookup = np.array([_is_incident_list(lista) for lista in listas] + [False], dtype=bool)
+    return lookup[codes]
+
+
+def _incident_projects(tags, incident):
+    """
+    Flag de incidente de cada projeto ('tags'), com groupby(...).any() sobre os
+    códigos inteiros dos projetos. Tarefas sem tag não pertencem a nenhum projeto.
+    """
+    tag_codes, _ = pd.factorize(tags)
+    has_tag = tag_codes >= 0
+    return pd.Series(incident[has_tag]).groupby(tag_codes[has_tag]).any()
+
+
 def calculate_incident_free_rate(df: pd.DataFrame) -> tuple:
     """
     Calcula a taxa de projetos livres de incidentes.
     
     Um projeto (identificado pela coluna 'tags') é considerado com incidente 
     se qualquer uma de suas tarefas contiver a palavra 'Incidente' na coluna 'lista_origem'.
+    Tarefas sem tag não contam como projeto.
 
     Args:
         df (pd.DataFrame): DataFrame contendo os dados das tarefas
@@ -64,22 +102,16 @@ def calculate_incident_free_rate(df: pd.DataFrame) -> tuple:
     if 'tags' not in df.columns or 'lista_origem' not in df.columns:
         raise ValueError("O DataFrame deve conter as colunas 'tags' e 'lista_origem'.")
     
-    # Garante que as colunas sejam tratadas como strings
-    df['tags'] = df['tags'].astype(str)
-    df['lista_origem'] = df['lista_origem'].astype(str)
-    
     # Para cada projeto (agrupado por 'tags'), verifica se alguma tarefa
-    # contém a palavra 'Incidente' na coluna 'lista_origem'
-    incident_projects = df.groupby('tags')['lista_origem'].apply(
-        lambda x: x.str.contains('Incidente', case=False, na=False).any()
-    )
+    # está em uma lista de incidentes
+    incident_projects = _incident_projects(df['tags'], _incident_flags(df['lista_origem']))
     
     # Conta o número total de projetos únicos
     total_projects = len(incident_projects)
     
     # Conta quantos projetos NÃO têm incidentes
     # (~incident_projects) inverte os valores booleanos
-    clean_projects = (~incident_projects).sum()
+    clean_projects = int((~incident_projects).sum())
     
     # Calcula o percentual de projetos livres de incidentes
     if total_projects == 0:
@@ -135,13 +167,13 @@ def calculate_operational_capacity(df, hours_per_week=40):
     if df.empty:
         return 0, 0, 0
     
-    # Converte a coluna prazo para datetime
-    df['prazo'] = pd.to_datetime(df['prazo'], errors='coerce')
+    # Converte a coluna prazo para datetime (sem alterar o DataFrame recebido)
+    prazo = _as_datetime(df['prazo'])
     
     # Remove tarefas sem prazo definido
-    df_with_deadline = df[df['prazo'].notnull()]
+    has_deadline = prazo.notnull()
     
-    if df_with_deadline.empty:
+    if not has_deadline.any():
         return 0, 0, 0
     
     # Obtém a data atual
@@ -155,10 +187,12 @@ def calculate_operational_capacity(df, hours_per_week=40):
     end_of_week = start_of_week + timedelta(days=4)  # +4 dias = sexta-feira
     
     # Filtra tarefas principais que vencem na semana atual (segunda a sexta)
-    df_current_week = df_with_deadline[
-        (df_with_deadline['parent_id'].isnull()) &  # Apenas tarefas principais
-        (df_with_deadline['prazo'].dt.date >= start_of_week) &  # A partir de segunda
-        (df_with_deadline['prazo'].dt.date <= end_of_week)      # Até sexta-feira
+    prazo_day = prazo.dt.normalize()
+    df_current_week = df[
+        has_deadline &
+        (df['parent_id'].isnull()) &  # Apenas tarefas principais
+        (prazo_day >= pd.Timestamp(start_of_week)) &  # A partir de segunda
+        (prazo_day <= pd.Timestamp(end_of_week))      # Até sexta-feira
     ]
     
     # Soma as horas estimadas das tarefas da semana atual
@@ -201,18 +235,22 @@ def calculate_lead_time(df):
     if df.empty: 
         return None, pd.DataFrame()
     
-    # Converte as colunas de data para datetime
-    df['data_fechamento'] = pd.to_datetime(df['data_fechamento'], errors='coerce')
-    df['data_inicio'] = pd.to_datetime(df['data_inicio'], errors='coerce')
+    # Converte as colunas de data para datetime (sem alterar o DataFrame recebido)
+    data_fechamento = _as_datetime(df['data_fechamento'])
+    data_inicio = _as_datetime(df['data_inicio'])
     
     # Filtra apenas tarefas que foram concluídas (têm data de fechamento)
-    df_completed = df[df['data_fechamento'].notnull()]
+    completed = data_fechamento.notnull()
     
-    if df_completed.empty: 
+    if not completed.any(): 
         return 0, pd.DataFrame()
     
     # Calcula o lead time em dias para cada tarefa concluída
     # dt.days extrai apenas os dias da diferença entre datas
+    df_completed = df[completed].assign(
+        data_fechamento=data_fechamento[completed],
+        data_inicio=data_inicio[completed],
+    )
     df_completed['lead_time'] = (
         df_completed['data_fechamento'] - df_completed['data_inicio']
     ).dt.days
@@ -241,34 +279,18 @@ def validate_dataframe(df, required_columns):
         raise ValueError(f"Colunas obrigatórias faltando: {missing_columns}")
 
 
-# Função principal para calcular todas as métricas
-def calculate_all_metrics(df):
-    """
-    Calcula todas as métricas de uma só vez.
-    
-    Args:
-        df (pd.DataFrame): DataFrame com os dados das tarefas
-        
-    Returns:
-        dict: Dicionário com todas as métricas calculadas
-    """
-    # Lista das colunas obrigatórias para os cálculos
-    required_columns = [
-        'prazo', 'data_fechamento', 'data_inicio', 'tempo_estimado',
-        'parent_id', 'responsavel', 'tags', 'lista_origem'
-    ]
-    
-    # Valida se todas as colunas necessárias estão presentes
-    validate_dataframe(df, required_columns)
-    
-    # Calcula todas as métricas
-    on_time_rate, on_time_count, total_completed = calculate_on_time_delivery_rate(df)
-    incident_free_rate, clean_projects, total_projects = calculate_incident_free_rate(df)
-    total_planned_hours = calculate_total_planned_hours(df)
-    capacity_rate, planned_hours, max_capacity = calculate_operational_capacity(df)
-    avg_lead_time, lead_time_df = calculate_lead_time(df)
-    
-    # Retorna um dicionário com todas as métricas
+# Colunas obrigatórias para os cálculos dos KPIs
+KPI_REQUIRED_COLUMNS = [
+    'prazo', 'data_fechamento', 'data_inicio', 'tempo_estimado',
+    'parent_id', 'responsavel', 'tags', 'lista_origem'
+]
+
+
+def _metrics_dict(on_time, incident, total_planned_hours, capacity, avg_lead_time):
+    """Monta o dicionário de calculate_all_metrics a partir das tuplas de cada KPI."""
+    on_time_rate, on_time_count, total_completed = on_time
+    incident_free_rate, clean_projects, total_projects = incident
+    capacity_rate, planned_hours, max_capacity = capacity
     return {
         'delivery_performance': {
             'on_time_rate': round(on_time_rate, 2),
@@ -292,11 +314,310 @@ def calculate_all_metrics(df):
             'average_lead_time': round(avg_lead_time, 2) if avg_lead_time else 0
         }
     }
+
+
+def prepare_kpi_frame(df):
+    """
+    Tipa uma vez as colunas usadas pelos KPIs (datas sem fuso e tempo_estimado
+    numérico), para que calculate_kpis não precise converter nada.
+
+    Returns:
+        pd.DataFrame: O próprio DataFrame, se já estiver tipado, ou um novo
+                      com as colunas convertidas (o original não é alterado)
+    """
+    columns = {}
+    for column in KPI_DATE_COLUMNS:
+        if column not in df.columns:
+            continue
+        series = df[column]
+        if not pd.api.types.is_datetime64_any_dtype(series) or getattr(series.dt, 'tz', None) is not None:
+            columns[column] = _as_datetime(series)
+    if 'tempo_estimado' in df.columns and not pd.api.types.is_float_dtype(df['tempo_estimado']):
+        columns['tempo_estimado'] = pd.to_numeric(df['tempo_estimado'], errors='coerce').fillna(0)
+    return df.assign(**columns) if columns else df
+
+
+def calculate_kpis(df, today=None, hours_per_week=40):
+    """
+    Calcula os cinco KPIs em uma única passada sobre um DataFrame já tipado
+    (prepare_kpi_frame), sem alterar nem copiar o DataFrame.
+
+    As colunas são lidas uma vez como arrays e as máscaras (concluídas, com
+    prazo, tarefas principais) são compartilhadas entre os KPIs.
+
+    Args:
+        df (pd.DataFrame): Tarefas com as colunas de KPI_REQUIRED_COLUMNS tipadas
+        today (date): Data de referência da semana de capacidade (padrão: hoje)
+        hours_per_week (int): Horas de trabalho por semana por pessoa (padrão: 40h)
+
+    Returns:
+        dict: Mesmo formato de calculate_all_metrics
+    """
+    if df.empty:
+        return _metrics_dict((0, 0, 0), (0.0, 0, 0), 0, (0, 0, 0), None)
     
+    # --- Colunas e máscaras compartilhadas ---
+    prazo = df['prazo'].to_numpy(dtype='datetime64[ns]')
+    data_fechamento = df['data_fechamento'].to_numpy(dtype='datetime64[ns]')
+    data_inicio = df['data_inicio'].to_numpy(dtype='datetime64[ns]')
+    horas = df['tempo_estimado'].to_numpy(dtype='float64')
     
-import pandas as pd
-import holidays
-from datetime import datetime, timedelta
+    completed = ~np.isnat(data_fechamento)
+    has_deadline = ~np.isnat(prazo)
+    main = df['parent_id'].isna().to_numpy()
+    
+    # --- Entrega no prazo ---
+    total_completed = int(completed.sum())
+    on_time_count = int((completed & has_deadline & (data_fechamento <= prazo)).sum())
+    on_time_rate = (on_time_count / total_completed) * 100 if total_completed else 0
+    
+    # --- Qualidade (projetos sem incidentes) ---
+    incident_projects = _incident_projects(df['tags'], _incident_flags(df['lista_origem']))
+    total_projects = len(incident_projects)
+    clean_projects = int((~incident_projects).sum())
+    incident_free_rate = (clean_projects / total_projects) * 100 if total_projects else 0.0
+    
+    # --- Horas previstas (tarefas principais) ---
+    total_planned_hours = float(np.nansum(horas[main]))
+    
+    # --- Capacidade operacional da semana atual ---
+    if has_deadline.any():
+        today = today or datetime.now().date()
+        start_of_week = np.datetime64(today - timedelta(days=today.weekday()), 'D')
+        prazo_day = prazo.astype('datetime64[D]')
+        current_week = main & (prazo_day >= start_of_week) & (prazo_day <= start_of_week + 4)
+        planned_hours = float(np.nansum(horas[current_week]))
+        max_capacity = df['responsavel'].nunique() * hours_per_week
+        capacity_rate = (planned_hours / max_capacity) * 100 if max_capacity else 0
+        capacity = (capacity_rate, planned_hours, max_capacity)
+    else:
+        capacity = (0, 0, 0)
+    
+    # --- Lead time (dias inteiros entre início e fechamento) ---
+    if total_completed:
+        with_start = completed & ~np.isnat(data_inicio)
+        lead_times = (data_fechamento[with_start] - data_inicio[with_start]) // np.timedelta64(1, 'D')
+        avg_lead_time = lead_times.mean() if len(lead_times) else np.nan
+    else:
+        avg_lead_time = 0
+    
+    return _metrics_dict(
+        (on_time_rate, on_time_count, total_completed),
+        (incident_free_rate, clean_projects, total_projects),
+        total_planned_hours,
+        capacity,
+        avg_lead_time,
+    )
+
+
+# Função principal para calcular todas as métricas
+def calculate_all_metrics(df):
+    """
+    Calcula todas as métricas de uma só vez.
+    
+    Args:
+        df (pd.DataFrame): DataFrame com os dados das tarefas
+        
+    Returns:
+        dict: Dicionário com todas as métricas calculadas
+    """
+    # Valida se todas as colunas necessárias estão presentes
+    validate_dataframe(df, KPI_REQUIRED_COLUMNS)
+    
+    # Tipa as colunas uma vez e calcula todos os KPIs em uma única passada
+    return calculate_kpis(prepare_kpi_frame(df))
+    
+    
+# --- KPIs agrupados por lista e responsável ---
+# Rótulos das linhas de totalização, os mesmos das opções "todas/todos" dos seletores
+ALL_LISTS = "Todas"
+ALL_RESPONSIBLES = "Todos"
+
+# Colunas da tabela de calculate_grouped_kpis
+GROUPED_KPI_COLUMNS = [
+    'on_time_count', 'total_completed', 'clean_projects', 'total_projects',
+    'total_planned_hours', 'planned_hours_week', 'max_capacity_week', 'average_lead_time',
+]
+
+
+def _project_flags(group_codes, tag_codes, tag_count, incident):
+    """Um registro por (grupo, projeto) com a flag de incidente combinada (any)."""
+    keys, inverse = np.unique(group_codes * tag_count + tag_codes, return_inverse=True)
+    flags = np.bincount(inverse, weights=incident) > 0
+    return keys // tag_count, keys % tag_count, flags
+
+
+def _project_counts(groups, flags, group_count):
+    """(projetos limpos, total de projetos) por grupo."""
+    total = np.bincount(groups, minlength=group_count)
+    clean = np.bincount(groups, weights=~flags, minlength=group_count).astype('int64')
+    return clean, total
+
+
+def calculate_grouped_kpis(df, today=None, hours_per_week=40):
+    """
+    Calcula os KPIs de todas as combinações de (lista_origem, responsavel) de
+    uma só vez, incluindo as totalizações por lista, por responsável e geral.
+
+    Cada linha tem os mesmos valores que calculate_kpis daria para as tarefas
+    filtradas pela combinação (ALL_LISTS/ALL_RESPONSIBLES = sem filtro). As
+    somas aditivas (concluídas, no prazo, horas, lead time) são agregadas uma
+    vez por célula com np.bincount e as totalizações são somas das células;
+    os projetos, que não são aditivos, são reduzidos por (grupo, projeto).
+
+    Args:
+        df (pd.DataFrame): Tarefas já tipadas (prepare_kpi_frame)
+        today (date): Data de referência da semana de capacidade (padrão: hoje)
+        hours_per_week (int): Horas de trabalho por semana por pessoa (padrão: 40h)
+
+    Returns:
+        pd.DataFrame: Indexado por (lista_origem, responsavel), com GROUPED_KPI_COLUMNS
+    """
+    list_codes, listas = pd.factorize(df['lista_origem'], sort=True)
+    responsible_codes, responsaveis = pd.factorize(df['responsavel'], sort=True)
+    list_count, responsible_count = len(listas) + 1, len(responsaveis) + 1
+    # Nulos ficam no último índice: entram nas totalizações, mas não viram linhas
+    list_codes = np.where(list_codes < 0, list_count - 1, list_codes)
+    responsible_codes = np.where(responsible_codes < 0, responsible_count - 1, responsible_codes)
+    cells = list_codes * responsible_count + responsible_codes
+    shape = (list_count, responsible_count)
+    
+    # --- Colunas e máscaras compartilhadas (como em calculate_kpis) ---
+    prazo = df['prazo'].to_numpy(dtype='datetime64[ns]')
+    data_fechamento = df['data_fechamento'].to_numpy(dtype='datetime64[ns]')
+    data_inicio = df['data_inicio'].to_numpy(dtype='datetime64[ns]')
+    horas = np.nan_to_num(df['tempo_estimado'].to_numpy(dtype='float64'))
+    
+    completed = ~np.isnat(data_fechamento)
+    has_deadline = ~np.isnat(prazo)
+    main = df['parent_id'].isna().to_numpy()
+    on_time = completed & has_deadline & (data_fechamento <= prazo)
+    
+    today = today or datetime.now().date()
+    start_of_week = np.datetime64(today - timedelta(days=today.weekday()), 'D')
+    prazo_day = prazo.astype('datetime64[D]')
+    current_week = main & (prazo_day >= start_of_week) & (prazo_day <= start_of_week + 4)
+    
+    with_start = completed & ~np.isnat(data_inicio)
+    lead_times = np.zeros(len(df))
+    lead_times[with_start] = (data_fechamento[with_start] - data_inicio[with_start]) // np.timedelta64(1, 'D')
+    
+    # --- Uma passada: somas por célula (lista, responsável) ---
+    def per_cell(weights=None):
+        return np.bincount(cells, weights=weights, minlength=list_count * responsible_count).reshape(shape)
+    
+    sums = {
+        'rows': per_cell(),
+        'on_time_count': per_cell(on_time),
+        'total_completed': per_cell(completed),
+        'total_planned_hours': per_cell(np.where(main, horas, 0.0)),
+        'with_deadline': per_cell(has_deadline),
+        'planned_hours_week': per_cell(np.where(current_week, horas, 0.0)),
+        'lead_time_sum': per_cell(lead_times),
+        'lead_time_count': per_cell(with_start),
+    }
+    
+    # Totalizações: a última linha/coluna de cada eixo recebe a soma do eixo inteiro
+    def with_totals(values):
+        values = np.concatenate([values, values.sum(axis=0, keepdims=True)], axis=0)
+        return np.concatenate([values, values.sum(axis=1, keepdims=True)], axis=1)
+    
+    totals = {name: with_totals(values) for name, values in sums.items()}
+    
+    # Responsáveis (não nulos) com tarefas em cada grupo, para a capacidade máxima
+    present = sums['rows'][:, :-1] > 0
+    members = np.zeros((list_count + 1, responsible_count + 1), dtype='int64')
+    members[:-1, :-2] = present
+    members[:-1, -1] = present.sum(axis=1)
+    members[-1, :-2] = present.any(axis=0)
+    members[-1, -1] = present.any(axis=0).sum()
+    
+    # --- Projetos sem incidentes: reduzidos por (célula, projeto) e depois por totalização ---
+    # (tarefas sem tag não pertencem a nenhum projeto)
+    incident = _incident_flags(df['lista_origem'])
+    tag_codes, tags = pd.factorize(df['tags'])
+    tag_count = max(len(tags), 1)
+    has_tag = tag_codes >= 0
+    cell_groups, cell_tags, cell_flags = _project_flags(cells[has_tag], tag_codes[has_tag], tag_count, incident[has_tag])
+    
+    clean = np.zeros((list_count + 1, responsible_count + 1), dtype='int64')
+    projects = np.zeros_like(clean)
+    cell_clean, cell_total = _project_counts(cell_groups, cell_flags, list_count * responsible_count)
+    clean[:-1, :-1] = cell_clean.reshape(shape)
+    projects[:-1, :-1] = cell_total.reshape(shape)
+    
+    cell_lists, cell_responsibles = np.divmod(cell_groups, responsible_count)
+    for axis_codes, axis_count, target in (
+        (cell_lists, list_count, (slice(None, -1), -1)),
+        (cell_responsibles, responsible_count, (-1, slice(None, -1))),
+        (np.zeros_like(cell_lists), 1, (-1, -1)),
+    ):
+        groups, _, flags = _project_flags(axis_codes, cell_tags, tag_count, cell_flags)
+        group_clean, group_total = _project_counts(groups, flags, axis_count)
+        clean[target] = group_clean if axis_count > 1 else group_clean[0]
+        projects[target] = group_total if axis_count > 1 else group_total[0]
+    
+    # --- Tabela: uma linha por combinação de rótulos dos seletores ---
+    list_labels = np.array([*listas, None, ALL_LISTS], dtype=object)
+    responsible_labels = np.array([*responsaveis, None, ALL_RESPONSIBLES], dtype=object)
+    keep = np.ones((list_count + 1, responsible_count + 1), dtype=bool)
+    keep[list_count - 1, :] = False  # Lista nula
+    keep[:, responsible_count - 1] = False  # Responsável nulo
+    rows, columns = np.nonzero(keep)
+    
+    total_completed = totals['total_completed'][rows, columns]
+    lead_time_count = totals['lead_time_count'][rows, columns]
+    average_lead_time = np.where(
+        total_completed == 0, 0.0,
+        np.divide(totals['lead_time_sum'][rows, columns], lead_time_count,
+                  out=np.full(len(rows), np.nan), where=lead_time_count > 0),
+    )
+    with_deadline = totals['with_deadline'][rows, columns] > 0
+    
+    table = pd.DataFrame({
+        'lista_origem': list_labels[rows],
+        'responsavel': responsible_labels[columns],
+        'on_time_count': totals['on_time_count'][rows, columns].astype('int64'),
+        'total_completed': total_completed.astype('int64'),
+        'clean_projects': clean[rows, columns],
+        'total_projects': projects[rows, columns],
+        'total_planned_hours': totals['total_planned_hours'][rows, columns],
+        'planned_hours_week': np.where(with_deadline, totals['planned_hours_week'][rows, columns], 0.0),
+        'max_capacity_week': np.where(with_deadline, members[rows, columns] * hours_per_week, 0),
+        'average_lead_time': average_lead_time,
+    })
+    return table.set_index(['lista_origem', 'responsavel'])
+
+
+def get_group_metrics(grouped, lista_origem=ALL_LISTS, responsavel=ALL_RESPONSIBLES):
+    """
+    Lê uma combinação da tabela de calculate_grouped_kpis, no formato de
+    calculate_all_metrics. Combinações sem tarefas retornam os KPIs zerados.
+
+    Args:
+        grouped (pd.DataFrame): Resultado de calculate_grouped_kpis
+        lista_origem (str): Lista selecionada ou ALL_LISTS
+        responsavel (str): Responsável selecionado ou ALL_RESPONSIBLES
+    """
+    try:
+        row = grouped.loc[(lista_origem, responsavel)]
+    except KeyError:
+        return _metrics_dict((0, 0, 0), (0.0, 0, 0), 0, (0, 0, 0), None)
+    
+    total_completed = int(row['total_completed'])
+    on_time_count = int(row['on_time_count'])
+    total_projects = int(row['total_projects'])
+    clean_projects = int(row['clean_projects'])
+    planned_hours = float(row['planned_hours_week'])
+    max_capacity = int(row['max_capacity_week'])
+    return _metrics_dict(
+        ((on_time_count / total_completed) * 100 if total_completed else 0, on_time_count, total_completed),
+        ((clean_projects / total_projects) * 100 if total_projects else 0.0, clean_projects, total_projects),
+        float(row['total_planned_hours']),
+        ((planned_hours / max_capacity) * 100 if max_capacity else 0, planned_hours, max_capacity),
+        float(row['average_lead_time']),
+    )
+
 
 def create_daily_log(df):
     """
@@ -305,6 +626,10 @@ def create_daily_log(df):
     A função calcula as horas diárias baseado na duração real da tarefa
     (data_inicio até data_fechamento), distribuindo o tempo_estimado
     uniformemente pelos dias úteis disponíveis.
+    
+    Monta a tabela completa (todas as colunas da tarefa repetidas em cada
+    dia). Os dashboards usam DailyLog.from_tasks, que guarda apenas
+    (tarefa, dia, horas) e junta as colunas só para exibição.
 
     Args:
         df (pd.DataFrame): O DataFrame de entrada contendo as tarefas.
@@ -313,82 +638,10 @@ def create_daily_log(df):
         pd.DataFrame: Um novo DataFrame com a coluna 'registro' detalhando
                       o log diário de cada tarefa.
     """
-    # Filtra apenas as linhas onde 'parent_id' é null (tasks principais)
-    main_tasks = df[df['parent_id'].isnull()].copy()
-    
-    # Converte colunas para os tipos adequados
-    main_tasks['data_inicio'] = pd.to_datetime(main_tasks['data_inicio'], errors='coerce')
-    main_tasks['data_fechamento'] = pd.to_datetime(main_tasks['data_fechamento'], errors='coerce')
-    main_tasks['tempo_estimado'] = pd.to_numeric(main_tasks['tempo_estimado'], errors='coerce').fillna(0)
-    
-    # Obtém feriados brasileiros para os anos relevantes
-    years = []
-    for col in ['data_inicio', 'data_fechamento']:
-        years.extend(main_tasks[col].dropna().dt.year.unique())
-    
-    br_holidays = holidays.country_holidays('BR', years=list(set(years)))
-    
-    # Cria uma lista para armazenar os registros diários
-    daily_records = []
-    
-    # Itera sobre cada tarefa principal para criar o log diário
-    for index, row in main_tasks.iterrows():
-        tempo_estimado = row['tempo_estimado']
-        data_inicio = row['data_inicio']
-        data_fechamento = row['data_fechamento']
-        
-        # Pula tarefas sem tempo estimado ou datas inválidas
-        # Retirei tempo_estimado <= 0 or 
-        if pd.isna(data_inicio):
-            continue
-        
-        # Define data de início
-        start_date = data_inicio.date()
-        
-        # Define data de fim baseado na data_fechamento ou calcula automaticamente
-        if pd.notna(data_fechamento):
-            end_date = data_fechamento.date()
-        else:
-            # Se não há data de fechamento, usa a data atual como referência
-            end_date = datetime.today().date()
-        
-        # Garante que a data de fim seja pelo menos igual à data de início
-        if end_date < start_date:
-            end_date = start_date
-        
-        # Calcula o número de dias úteis entre as datas
-        current_date = start_date
-        working_days = []
-        
-        while current_date <= end_date:
-            # Verifica se é dia útil (segunda a sexta) e não é feriado
-            if current_date.weekday() < 5 and current_date not in br_holidays:
-                working_days.append(current_date)
-            current_date += timedelta(days=1)
-        
-        # Se não há dias úteis, usa pelo menos 1 dia (o dia de criação)
-        if not working_days:
-            working_days = [start_date]
-        
-        # Calcula as horas por dia útil
-        total_working_days = len(working_days)
-        horas_por_dia = tempo_estimado / total_working_days
-        
-        # Cria um registro para cada dia útil
-        for working_day in working_days:
-            # Cria uma cópia da linha original
-            new_row = row.copy()
-            new_row['registro'] = f"{working_day.strftime('%d/%m/%Y')} ({horas_por_dia:.3f}h)"
-            new_row['registro_data'] = working_day  # Data para facilitar filtros
-            new_row['registro_horas'] = horas_por_dia  # Horas para facilitar cálculos
-            daily_records.append(new_row)
-    
-    # Cria o novo DataFrame a partir da lista de registros
-    df_daily_log = pd.DataFrame(daily_records)
-    
-    # df_daily_log.to_csv("daily-debug.csv", sep=',')
-    
-    return df_daily_log
+    daily_log = DailyLog.from_tasks(df)
+    if daily_log.empty:
+        return pd.DataFrame()
+    return daily_log.to_frame()
 
 
 def calculate_daily_capacity_for_person_list(df_day_filtered, selected_responsible, selected_list):
@@ -0,0 +1,208 @@
+import numpy as np
+import pandas as pd
+
+from clickup_common.business_calendar import count_working_days, working_days_in_range
+from .daily_log import task_periods
+
+# Jornada diária usada na capacidade, a mesma dos dashboards
+HOURS_PER_DAY = 8
+
+
+class CapacityCube:
+    """
+    Cubo denso de horas planejadas indexado por (dia, responsável, lista).
+
+    Montado uma vez por versão do conjunto, sem explodir as tarefas em dias:
+    cada tarefa é uma taxa constante (horas por dia útil) no seu intervalo de
+    dias úteis, somada na posição do primeiro dia e subtraída logo após o
+    último em um array de diferenças; a soma acumulada no eixo dos dias dá as
+    horas de cada (dia, responsável, lista). Um cubo booleano paralelo marca
+    onde há tarefas ativas, como as linhas do log diário.
+
+    Qualquer semana, período, pessoa ou lista é uma redução de um recorte do
+    cubo. As reduções por combinação de filtros (horas por dia e responsável,
+    totais por dia e suas somas acumuladas) ficam em cache, então consultas
+    seguintes com os mesmos filtros custam O(dias do recorte).
+
+    Responsáveis e listas nulos ocupam o último índice de cada eixo: contam
+    nos totais, mas não aparecem nos agrupamentos por responsável.
+
+    Args:
+        tasks (pd.DataFrame): Tarefas principais tipadas (DailyLog.tasks ou prepare_main_tasks)
+    """
+
+    def __init__(self, tasks):
+        responsavel_codes, responsaveis = pd.factorize(tasks['responsavel'], sort=True)
+        lista_codes, listas = pd.factorize(tasks['lista_origem'], sort=True)
+        self.responsaveis = np.asarray(responsaveis, dtype=object)
+        self.listas = np.asarray(listas, dtype=object)
+        responsavel_count = len(self.responsaveis)
+        lista_count = len(self.listas)
+        responsavel_codes = np.where(responsavel_codes < 0, responsavel_count, responsavel_codes)
+        lista_codes = np.where(lista_codes < 0, lista_count, lista_codes)
+        shape = (responsavel_count + 1, lista_count + 1)
+
+        self._marginals = {}
+        if tasks.empty:
+            self.days = np.array([], dtype='datetime64[D]')
+            self.hours = np.zeros((0, *shape))
+            self.active = np.zeros((0, *shape), dtype=bool)
+            return
+
+        start_dates, end_dates, working_days, horas_por_dia = task_periods(tasks)
+
+        # Tarefas com dias úteis: taxa constante de first até first + working_days - 1
+        origin = start_dates.min()
+        business_days = working_days_in_range(origin, end_dates.max())
+        spans = working_days > 0
+        first = count_working_days(np.full(spans.sum(), origin), start_dates[spans] - 1)
+        last = first + working_days[spans]
+        cells = (responsavel_codes[spans], lista_codes[spans])
+
+        diff_hours = np.zeros((len(business_days) + 1, *shape))
+        diff_active = np.zeros((len(business_days) + 1, *shape), dtype='int32')
+        np.add.at(diff_hours, (first, *cells), horas_por_dia[spans])
+        np.add.at(diff_hours, (last, *cells), -horas_por_dia[spans])
+        np.add.at(diff_active, (first, *cells), 1)
+        np.add.at(diff_active, (last, *cells), -1)
+
+        active = np.cumsum(diff_active, axis=0)[:-1] > 0
+        # Zera os resíduos de ponto flutuante onde não há tarefas ativas
+        hours = np.where(active, np.cumsum(diff_hours, axis=0)[:-1], 0.0)
+
+        # Tarefas sem dias úteis: todas as horas no dia de início (fim de semana ou
+        # feriado), que entra no eixo dos dias apenas para elas
+        extra_days = start_dates[~spans]
+        self.days = np.union1d(business_days, extra_days)
+        if len(self.days) > len(business_days):
+            positions = np.searchsorted(self.days, business_days)
+            self.hours = np.zeros((len(self.days), *shape))
+            self.active = np.zeros((len(self.days), *shape), dtype=bool)
+            self.hours[positions] = hours
+            self.active[positions] = active
+
+            extra_cells = (np.searchsorted(self.days, extra_days), responsavel_codes[~spans], lista_codes[~spans])
+            np.add.at(self.hours, extra_cells, horas_por_dia[~spans])
+            self.active[extra_cells] = True
+        else:
+            self.hours = hours
+            self.active = active
+
+    @property
+    def empty(self):
+        return len(self.days) == 0
+
+    # --- Reduções em cache ---
+    @staticmethod
+    def _position(categories, value):
+        """Índice de 'value' no eixo (None = todos; -1 se não existir)."""
+        if value is None:
+            return None
+        position = np.searchsorted(categories, value)
+        if position < len(categories) and categories[position] == value:
+            return int(position)
+        return -1
+
+    def _marginal(self, responsavel=None, lista_origem=None):
+        """
+        Reduções do cubo para uma combinação de filtros, calculadas uma vez.
+
+        Returns:
+            dict: 'hours' e 'active' por (dia, responsável), 'totals' e
+                  'has_tasks' por dia e 'cumulative' (somas acumuladas dos totais)
+        """
+        key = (responsavel, lista_origem)
+        if key not in self._marginals:
+            responsavel_index = self._position(self.responsaveis, responsavel)
+            lista_index = self._position(self.listas, lista_origem)
+
+            if lista_index is None:
+                hours = self.hours.sum(axis=2)
+                active = self.active.any(axis=2)
+            elif lista_index < 0:
+                hours = np.zeros(self.hours.shape[:2])
+                active = np.zeros(self.hours.shape[:2], dtype=bool)
+            else:
+                hours = self.hours[:, :, lista_index]
+                active = self.active[:, :, lista_index]
+
+            if responsavel_index is not None:
+                selected = np.zeros(hours.shape[1], dtype=bool)
+                if responsavel_index >= 0:
+                    selected[responsavel_index] = True
+                hours = hours * selected
+                active = active & selected
+
+            totals = hours.sum(axis=1)
+            self._marginals[key] = {
+                'hours': hours,
+                'active': active,
+                'totals': totals,
+                'has_tasks': active.any(axis=1),
+                'cumulative': np.concatenate([[0.0], np.cumsum(totals)]),
+            }
+        return self._marginals[key]
+
+    def _bounds(self, start, end):
+        lo = np.searchsorted(self.days, np.datetime64(start, 'D'))
+        hi = np.searchsorted(self.days, np.datetime64(end, 'D'), side='right')
+        return lo, hi
+
+    # --- Consultas ---
+    def total_hours(self, start, end, responsavel=None, lista_origem=None):
+        """Total de horas planejadas entre as datas (inclusive), em O(1) após a primeira consulta."""
+        lo, hi = self._bounds(start, end)
+        cumulative = self._marginal(responsavel, lista_origem)['cumulative']
+        return float(cumulative[hi] - cumulative[lo])
+
+    def hours_by_day(self, start, end, responsavel=None, lista_origem=None):
+        """
+        Total de horas por dia no período, apenas nos dias com tarefas ativas.
+
+        Returns:
+            pd.DataFrame: colunas 'data' e 'horas_planejadas'
+        """
+        lo, hi = self._bounds(start, end)
+        marginal = self._marginal(responsavel, lista_origem)
+        has_tasks = marginal['has_tasks'][lo:hi]
+        return pd.DataFrame({
+            'data': self.days[lo:hi][has_tasks].astype(object),
+            'horas_planejadas': marginal['totals'][lo:hi][has_tasks],
+        })
+
+    def hours_by_day_and_responsavel(self, start, end, responsavel=None, lista_origem=None):
+        """
+        Horas por (dia, responsável) no período, apenas onde há tarefas ativas.
+
+        Mesmo resultado de groupby(['registro_data', 'responsavel']) no log diário.
+
+        Returns:
+            pd.DataFrame: colunas 'data', 'responsavel' e 'horas_planejadas'
+        """
+        lo, hi = self._bounds(start, end)
+        marginal = self._marginal(responsavel, lista_origem)
+        # Sem a última coluna (responsável nulo)
+        hours = marginal['hours'][lo:hi, :-1]
+        positions, groups = np.nonzero(marginal['active'][lo:hi, :-1])
+        return pd.DataFrame({
+            'data': self.days[lo:hi][positions].astype(object),
+            'responsavel': self.responsaveis[groups],
+            'horas_planejadas': hours[positions, groups],
+        })
+
+    def daily_capacity(self, day, responsavel=None, lista_origem=None):
+        """
+        Capacidade de um dia, como calculate_daily_capacity_for_person_list.
+
+        Returns:
+            tuple: (taxa de capacidade, horas do dia, capacidade do dia = 8h por
+                   responsável com tarefas no dia)
+        """
+        lo, hi = self._bounds(day, day)
+        marginal = self._marginal(responsavel, lista_origem)
+        daily_hours = float(marginal['totals'][lo:hi].sum())
+        members = int(marginal['active'][lo:hi, :-1].any(axis=0).sum())
+
+        daily_capacity = members * HOURS_PER_DAY
+        capacity_rate = (daily_hours / daily_capacity * 100) if daily_capacity > 0 else 0
+        return capacity_rate, daily_hours, daily_capacity
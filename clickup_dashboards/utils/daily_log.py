@@ -0,0 +1,218 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from clickup_common.business_calendar import count_working_days, offset_working_days
+
+
+def prepare_main_tasks(df):
+    """Tarefas principais com data de início, com datas e tempo_estimado já tipados."""
+    # Filtra apenas as linhas onde 'parent_id' é null (tasks principais)
+    main_tasks = df[df['parent_id'].isnull()].copy()
+
+    # Converte colunas para os tipos adequados
+    main_tasks['data_inicio'] = pd.to_datetime(main_tasks['data_inicio'], errors='coerce')
+    main_tasks['data_fechamento'] = pd.to_datetime(main_tasks['data_fechamento'], errors='coerce')
+    main_tasks['tempo_estimado'] = pd.to_numeric(main_tasks['tempo_estimado'], errors='coerce').fillna(0)
+
+    # Pula tarefas sem data de início
+    return main_tasks[main_tasks['data_inicio'].notna()]
+
+
+def task_periods(main_tasks):
+    """
+    Período e taxa diária de cada tarefa de prepare_main_tasks.
+
+    Returns:
+        tuple: (início, fim, dias úteis, horas por dia útil) como arrays. O fim
+               é o fechamento (ou hoje), nunca antes do início; tarefas sem
+               dias úteis têm 0 dias e todas as horas no dia de início.
+    """
+    today = np.datetime64(datetime.today().date(), 'D')
+    start_dates = main_tasks['data_inicio'].to_numpy(dtype='datetime64[D]')
+    end_dates = main_tasks['data_fechamento'].to_numpy(dtype='datetime64[D]')
+    end_dates = np.where(np.isnat(end_dates), today, end_dates)
+    end_dates = np.maximum(end_dates, start_dates)
+
+    working_days = count_working_days(start_dates, end_dates)
+    horas_por_dia = main_tasks['tempo_estimado'].to_numpy(dtype='float64') / np.maximum(working_days, 1)
+    return start_dates, end_dates, working_days, horas_por_dia
+
+
+class DailyLog:
+    """
+    Log diário compacto: uma linha por (tarefa principal, dia útil).
+
+    Em vez de copiar todas as colunas da tarefa para cada dia, guarda três
+    arrays: a posição da tarefa em 'tasks', o dia (datetime64[D]) e as horas.
+    Filtros e agregações usam códigos inteiros das colunas das tarefas
+    (pd.factorize, calculados uma vez e compartilhados pelos recortes), e as
+    colunas de exibição só são juntadas em to_frame(), quando uma tabela
+    precisa delas.
+
+    Attributes:
+        tasks (pd.DataFrame): Tarefas principais com data de início, já tipadas
+        task_index (np.ndarray): Posição da tarefa (iloc em 'tasks') de cada registro
+        days (np.ndarray): Dia útil de cada registro
+        hours (np.ndarray): Horas de cada registro
+    """
+
+    def __init__(self, tasks, task_index, days, hours, codes=None):
+        self.tasks = tasks
+        self.task_index = task_index
+        self.days = days
+        self.hours = hours
+        self._codes = {} if codes is None else codes
+
+    @classmethod
+    def from_tasks(cls, df):
+        """
+        Monta o log diário a partir do DataFrame de tarefas.
+
+        O tempo_estimado de cada tarefa principal é distribuído uniformemente
+        pelos dias úteis entre data_inicio e data_fechamento (ou hoje); sem
+        nenhum dia útil, vai inteiro para o dia de início.
+        """
+        main_tasks = prepare_main_tasks(df)
+        if main_tasks.empty:
+            return cls(main_tasks, np.array([], dtype='int64'), np.array([], dtype='datetime64[D]'), np.array([], dtype='float64'))
+
+        start_dates, _, days_per_task, horas_por_dia = task_periods(main_tasks)
+        no_working_days = days_per_task == 0
+        days_per_task = np.where(no_working_days, 1, days_per_task)
+
+        # Repete cada tarefa uma vez por dia útil; 'offsets' é a posição do dia dentro da tarefa
+        positions = np.repeat(np.arange(len(main_tasks)), days_per_task)
+        offsets = np.arange(len(positions)) - np.repeat(np.cumsum(days_per_task) - days_per_task, days_per_task)
+
+        # O k-ésimo dia útil a partir do início (o próprio início, se a tarefa não tem dias úteis)
+        task_starts = start_dates[positions]
+        days = np.where(
+            no_working_days[positions],
+            task_starts,
+            offset_working_days(task_starts, offsets),
+        )
+        return cls(main_tasks, positions, days, horas_por_dia[positions])
+
+    def __len__(self):
+        return len(self.task_index)
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    # --- Recortes ---
+    def task_codes(self, column):
+        """(códigos por tarefa, categorias ordenadas) de uma coluna de 'tasks'; nulos recebem -1."""
+        if column not in self._codes:
+            self._codes[column] = pd.factorize(self.tasks[column], sort=True)
+        return self._codes[column]
+
+    def codes(self, column):
+        """Código da coluna da tarefa em cada registro."""
+        return self.task_codes(column)[0][self.task_index]
+
+    def select(self, mask):
+        """Recorte do log pelos registros marcados em 'mask', sem copiar as tarefas."""
+        return DailyLog(self.tasks, self.task_index[mask], self.days[mask], self.hours[mask], self._codes)
+
+    def empty_log(self):
+        """Recorte sem nenhum registro."""
+        return self.select(np.zeros(len(self), dtype=bool))
+
+    def filter(self, start=None, end=None, **equals):
+        """
+        Registros entre 'start' e 'end' (inclusive) cujas colunas da tarefa
+        são iguais aos valores informados (None ignora o filtro).
+
+        Ex.: log.filter(start=inicio, end=fim, lista_origem='Design', responsavel=None)
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.days >= np.datetime64(start, 'D')
+        if end is not None:
+            mask &= self.days <= np.datetime64(end, 'D')
+        for column, value in equals.items():
+            if value is None:
+                continue
+            categories = self.task_codes(column)[1]
+            position = categories.get_indexer([value])[0]
+            if position < 0:
+                return self.empty_log()
+            mask &= self.codes(column) == position
+        return self.select(mask)
+
+    # --- Agregações ---
+    def total_hours(self):
+        return float(self.hours.sum())
+
+    def hours_by(self, *columns):
+        """
+        Soma as horas por combinação de colunas, como
+        groupby([...])['registro_horas'].sum().reset_index() no log completo.
+
+        'registro_data' agrupa pelo dia; as demais são colunas das tarefas.
+        Registros com valor nulo em alguma das colunas ficam de fora.
+        """
+        keys = []
+        dims = []
+        labels = []
+        for column in columns:
+            if column == 'registro_data':
+                categories, codes = np.unique(self.days, return_inverse=True)
+                labels.append(categories.astype(object))
+            else:
+                codes = self.codes(column)
+                categories = self.task_codes(column)[1]
+                labels.append(np.asarray(categories, dtype=object))
+            keys.append(codes)
+            dims.append(max(len(categories), 1))
+
+        valid = np.ones(len(self), dtype=bool)
+        for codes in keys:
+            valid &= codes >= 0
+        if not valid.any():
+            return pd.DataFrame(columns=[*columns, 'registro_horas'])
+
+        # Uma chave inteira por combinação; a ordem segue a ordenação das categorias
+        flat = np.ravel_multi_index([codes[valid] for codes in keys], dims)
+        groups, inverse = np.unique(flat, return_inverse=True)
+        sums = np.bincount(inverse, weights=self.hours[valid])
+        group_codes = np.unravel_index(groups, dims)
+
+        frame = {column: label[codes] for column, label, codes in zip(columns, labels, group_codes)}
+        frame['registro_horas'] = sums
+        return pd.DataFrame(frame)
+
+    def task_positions(self):
+        """Posições (em 'tasks') das tarefas com registros no recorte, em ordem."""
+        return np.unique(self.task_index)
+
+    def tasks_frame(self):
+        """Tarefas com registros no recorte (uma linha por tarefa, sem as colunas do log)."""
+        return self.tasks.iloc[self.task_positions()]
+
+    def hours_by_task(self):
+        """Horas de cada tarefa no recorte, na mesma ordem de tasks_frame()."""
+        _, inverse = np.unique(self.task_index, return_inverse=True)
+        return np.bincount(inverse, weights=self.hours)
+
+    # --- Exibição ---
+    def to_frame(self, columns=None):
+        """
+        Junta as colunas das tarefas aos registros, no formato de create_daily_log
+        (colunas da tarefa + 'registro', 'registro_data' e 'registro_horas').
+
+        Args:
+            columns (list): Colunas da tarefa a incluir (padrão: todas)
+        """
+        tasks = self.tasks if columns is None else self.tasks[list(columns)]
+        frame = tasks.iloc[self.task_index].copy()
+        frame['registro'] = (
+            pd.Series(self.days, index=frame.index).dt.strftime('%d/%m/%Y')
+            + ' (' + np.char.mod('%.3f', self.hours) + 'h)'
+        )
+        frame['registro_data'] = self.days.astype(object)  # Data para facilitar filtros
+        frame['registro_horas'] = self.hours  # Horas para facilitar cálculos
+        return frame
@@ -0,0 +1,76 @@
+from datetime import date
+
+import streamlit as st
+
+from .calculate_dates import calculate_grouped_kpis
+from .capacity_cube import CapacityCube
+from .daily_log import DailyLog
+from .filter_index import FilterIndex
+
+
+# --- Estruturas derivadas, montadas uma vez por versão do conjunto ---
+# fetch_tasks_from_api marca o DataFrame com df.attrs['dataset_version']; as
+# estruturas abaixo são compartilhadas por todas as sessões e reruns do
+# Streamlit enquanto a versão não mudar. Sem versão (servidor sem
+# /api/version/), são montadas a cada chamada.
+
+def dataset_version(df):
+    """Versão do conjunto marcada em fetch_tasks_from_api, ou None."""
+    return df.attrs.get('dataset_version')
+
+
+@st.cache_resource(max_entries=4)
+def _daily_log_for_version(version, fields, _df):
+    return DailyLog.from_tasks(_df)
+
+
+@st.cache_resource(max_entries=4)
+def _capacity_cube_for_version(version, fields, _df):
+    return CapacityCube(get_daily_log(_df).tasks)
+
+
+@st.cache_resource(max_entries=4)
+def _filter_index_for_version(version, fields, _df):
+    return FilterIndex(_df, get_daily_log(_df))
+
+
+@st.cache_resource(max_entries=4)
+def _grouped_kpis_for_version(version, fields, today, _df):
+    return calculate_grouped_kpis(get_filter_index(_df).tasks, today=today)
+
+
+def get_daily_log(df):
+    """Log diário compacto (DailyLog) das tarefas, em cache por versão."""
+    version = dataset_version(df)
+    if version is None:
+        return DailyLog.from_tasks(df)
+    return _daily_log_for_version(version, tuple(df.columns), df)
+
+
+def get_capacity_cube(df):
+    """Cubo de capacidade (dia x responsável x lista) das tarefas, em cache por versão."""
+    version = dataset_version(df)
+    if version is None:
+        return CapacityCube(get_daily_log(df).tasks)
+    return _capacity_cube_for_version(version, tuple(df.columns), df)
+
+
+def get_filter_index(df):
+    """Índice da segmentação (máscaras e opções dos filtros) das tarefas, em cache por versão."""
+    version = dataset_version(df)
+    if version is None:
+        return FilterIndex(df, get_daily_log(df))
+    return _filter_index_for_version(version, tuple(df.columns), df)
+
+
+def get_grouped_kpis(df):
+    """
+    KPIs de todas as combinações de lista e responsável (calculate_grouped_kpis)
+    sobre as tarefas da segmentação, em cache por versão e pelo dia atual (a
+    capacidade depende da semana corrente).
+    """
+    today = date.today()
+    version = dataset_version(df)
+    if version is None:
+        return calculate_grouped_kpis(get_filter_index(df).tasks, today=today)
+    return _grouped_kpis_for_version(version, tuple(df.columns), today, df)
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+from .calculate_dates import prepare_kpi_frame
+
+# Colunas usadas na segmentação dos dashboards
+FILTER_COLUMNS = ('lista_origem', 'responsavel')
+
+
+class FilterIndex:
+    """
+    Índice da segmentação de dados (lista de origem, responsável e data).
+
+    Montado uma vez por versão do conjunto: guarda a tabela base de tarefas
+    principais, uma máscara booleana por valor de cada coluna de filtro, as
+    opções já ordenadas dos seletores e os registros do log diário agrupados
+    por dia. Filtrar passa a ser a interseção de máscaras (guardadas em cache
+    por combinação), sem copiar o DataFrame a cada rerun do Streamlit.
+
+    Args:
+        df (pd.DataFrame): Tarefas retornadas por fetch_tasks_from_api
+        daily_log (DailyLog): Log diário das mesmas tarefas
+    """
+
+    def __init__(self, df, daily_log):
+        # Tabela base para filtros: tarefas principais, uma linha por tarefa,
+        # já tipada para os KPIs (calculate_kpis não precisa converter nada)
+        self.tasks = prepare_kpi_frame(df[df['parent_id'].isnull()].drop_duplicates(subset=['clickup_id'], keep='first'))
+        self.daily_log = daily_log
+
+        self._categories = {}
+        self._value_masks = {}
+        self._log_codes = {}
+        for column in FILTER_COLUMNS:
+            codes, categories = pd.factorize(self.tasks[column], sort=True)
+            self._categories[column] = categories
+            self._value_masks[column] = {value: codes == position for position, value in enumerate(categories)}
+            # Mesmos códigos para as tarefas do log diário (-1 para nulos ou ausentes)
+            self._log_codes[column] = categories.get_indexer(daily_log.tasks[column])
+
+        # Registros do log diário ordenados por dia: cada dia é um intervalo contíguo
+        self._day_order = np.argsort(daily_log.days, kind='stable')
+        self._sorted_days = daily_log.days[self._day_order]
+
+        self._masks = {}
+        self._log_masks = {}
+        self._responsible_options = {}
+
+    # --- Opções dos seletores ---
+    @property
+    def list_options(self):
+        return ["Todas"] + list(self._categories['lista_origem'])
+
+    def responsible_options(self, lista_origem=None):
+        """Responsáveis (sem nulos) das tarefas da lista, já ordenados, com "Todos" no início."""
+        if lista_origem not in self._responsible_options:
+            responsaveis = self.tasks['responsavel'][self.mask(lista_origem=lista_origem)]
+            codes = self._categories['responsavel'].get_indexer(responsaveis.dropna().unique())
+            self._responsible_options[lista_origem] = ["Todos"] + list(self._categories['responsavel'][np.sort(codes)])
+        return self._responsible_options[lista_origem]
+
+    # --- Máscaras ---
+    def _value_mask(self, column, value):
+        mask = self._value_masks[column].get(value)
+        return np.zeros(len(self.tasks), dtype=bool) if mask is None else mask
+
+    def mask(self, lista_origem=None, responsavel=None):
+        """Máscara das tarefas base para a combinação de filtros (None ignora)."""
+        key = (lista_origem, responsavel)
+        if key not in self._masks:
+            mask = np.ones(len(self.tasks), dtype=bool)
+            for column, value in zip(FILTER_COLUMNS, key):
+                if value is not None:
+                    mask = mask & self._value_mask(column, value)
+            self._masks[key] = mask
+        return self._masks[key]
+
+    def log_task_mask(self, lista_origem=None, responsavel=None):
+        """Máscara das tarefas do log diário (DailyLog.tasks) para a combinação de filtros."""
+        key = (lista_origem, responsavel)
+        if key not in self._log_masks:
+            mask = np.ones(len(self.daily_log.tasks), dtype=bool)
+            for column, value in zip(FILTER_COLUMNS, key):
+                if value is not None:
+                    position = self._categories[column].get_indexer([value])[0]
+                    mask = mask & (self._log_codes[column] == position) if position >= 0 else np.zeros_like(mask)
+            self._log_masks[key] = mask
+        return self._log_masks[key]
+
+    # --- Recortes ---
+    def filtered_tasks(self, lista_origem=None, responsavel=None):
+        """Tarefas base que atendem aos filtros (uma linha por tarefa principal)."""
+        return self.tasks[self.mask(lista_origem, responsavel)]
+
+    def filtered_log(self, start=None, end=None, lista_origem=None, responsavel=None):
+        """
+        Recorte do log diário, como DailyLog.filter: os dias vêm do intervalo
+        contíguo de registros de cada data e os filtros da máscara em cache.
+        """
+        lo = 0 if start is None else np.searchsorted(self._sorted_days, np.datetime64(start, 'D'))
+        hi = len(self._sorted_days) if end is None else np.searchsorted(self._sorted_days, np.datetime64(end, 'D'), side='right')
+        # Mantém a ordem original dos registros
+        positions = np.sort(self._day_order[lo:hi])
+
+        task_mask = self.log_task_mask(lista_origem, responsavel)
+        return self.daily_log.select(positions[task_mask[self.daily_log.task_index[positions]]])
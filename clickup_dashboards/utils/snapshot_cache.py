@@ -0,0 +1,194 @@
+import contextlib
+import glob
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import time
+
+try:
+    import pyarrow as pa
+except ImportError:  # Sem pyarrow, o snapshot Arrow publicado pela sincronização é ignorado
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# Tempo máximo (em segundos) que um processo espera outro terminar de baixar
+# a mesma consulta; depois disso, a trava é considerada abandonada
+SNAPSHOT_LOCK_TIMEOUT = 300
+
+
+def snapshot_key(params, arrow):
+    """Identificador de uma consulta (filtros + projeção + formato) nos nomes dos arquivos."""
+    key = json.dumps({'params': params, 'arrow': arrow}, sort_keys=True, default=str)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _snapshot_path(cache_dir, key, version):
+    return os.path.join(cache_dir, f"tasks-{key}-v{version or 0}.pkl")
+
+
+def _snapshot_versions(cache_dir, key):
+    """Versões salvas de uma consulta, da mais recente para a mais antiga."""
+    versions = []
+    for path in glob.glob(os.path.join(cache_dir, f"tasks-{key}-v*.pkl")):
+        try:
+            versions.append(int(path.rsplit('-v', 1)[1][:-len('.pkl')]))
+        except ValueError:
+            continue
+    return sorted(versions, reverse=True)
+
+
+def load_snapshot(cache_dir, key, version=None):
+    """
+    Carrega a cópia salva de uma consulta.
+
+    Args:
+        cache_dir (str): Pasta compartilhada pelos processos dos dashboards
+        key (str): Resultado de snapshot_key
+        version (int): Versão exigida; se omitida, usa a mais recente salva
+
+    Returns:
+        dict: {'etag', 'version', 'df'}, ou None se não houver cópia
+    """
+    if version is None:
+        versions = _snapshot_versions(cache_dir, key)
+        if not versions:
+            return None
+        version = versions[0]
+    try:
+        with open(_snapshot_path(cache_dir, key, version), 'rb') as snapshot_file:
+            return pickle.load(snapshot_file)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def store_snapshot(cache_dir, key, etag, df, version=None):
+    """
+    Salva a cópia de uma consulta para a versão informada.
+
+    O arquivo é escrito em um temporário na mesma pasta e movido com
+    os.replace, então os outros processos nunca leem uma cópia pela metade.
+    As cópias de versões anteriores da mesma consulta são removidas.
+    """
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, prefix=f"tasks-{key}-", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as snapshot_file:
+                pickle.dump({'etag': etag, 'version': version, 'df': df}, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, _snapshot_path(cache_dir, key, version))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+    except OSError as e:
+        logger.warning("Não foi possível salvar o cache das tarefas: %s", e)
+        return
+
+    for old_version in _snapshot_versions(cache_dir, key):
+        if old_version != (version or 0):
+            with contextlib.suppress(OSError):
+                os.remove(_snapshot_path(cache_dir, key, old_version))
+
+
+@contextlib.contextmanager
+def snapshot_lock(cache_dir, key):
+    """
+    Garante que só um processo baixe uma consulta por vez.
+
+    Os demais esperam a trava ser liberada e, em seguida, encontram a cópia
+    já salva. Travas de processos encerrados no meio do download expiram
+    após SNAPSHOT_LOCK_TIMEOUT segundos.
+    """
+    lock_path = os.path.join(cache_dir, f"tasks-{key}.lock")
+    acquired = False
+    deadline = time.monotonic() + SNAPSHOT_LOCK_TIMEOUT
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        while True:
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                acquired = True
+                break
+            except FileExistsError:
+                with contextlib.suppress(OSError):
+                    if time.time() - os.path.getmtime(lock_path) > SNAPSHOT_LOCK_TIMEOUT:
+                        os.remove(lock_path)
+                        continue
+                if time.monotonic() > deadline:
+                    break
+                time.sleep(0.5)
+    except OSError as e:
+        logger.warning("Não foi possível travar o cache das tarefas: %s", e)
+
+    try:
+        yield
+    finally:
+        if acquired:
+            with contextlib.suppress(OSError):
+                os.remove(lock_path)
+
+
+def arrow_snapshot_version(path):
+    """Versão gravada no snapshot Arrow (lê apenas o schema), ou None se não houver snapshot."""
+    if pa is None or not path or not os.path.exists(path):
+        return None
+    try:
+        with pa.memory_map(path, 'r') as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid) as e:
+        logger.warning("Não foi possível abrir o snapshot Arrow: %s", e)
+        return None
+    return int(metadata.get(b'dataset_version', b'0'))
+
+
+def load_arrow_snapshot(path, version=None, fields=None, main_only=False):
+    """
+    Abre via memory-map o snapshot Arrow IPC publicado pela sincronização.
+
+    O arquivo não é lido para a memória do processo: os buffers Arrow apontam
+    para as páginas do cache do sistema operacional, compartilhadas por todos
+    os dashboards que o abrem. O recorte das tarefas principais (as primeiras
+    'main_rows' linhas) e a projeção das colunas não copiam dados. A conversão
+    para pandas só reaproveita as páginas nas colunas numéricas sem nulos;
+    textos e datas viram uma cópia do processo, por isso quem chama deve
+    guardar o DataFrame uma vez por versão (st.cache_resource) em vez de
+    convertê-lo em cada sessão.
+
+    Args:
+        path (str): Arquivo publicado pelo comando de sincronização
+        version (int): Versão esperada; se informada e diferente, o snapshot é ignorado
+        fields (tuple): Colunas desejadas (padrão: todas)
+        main_only (bool): Apenas tarefas principais (sem parent_id)
+
+    Returns:
+        tuple: (DataFrame, versão do snapshot), ou (None, None) se não puder ser usado
+    """
+    if pa is None or not path or not os.path.exists(path):
+        return None, None
+    try:
+        # O mapeamento continua válido mesmo se a sincronização substituir o arquivo
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    except (OSError, pa.ArrowInvalid) as e:
+        logger.warning("Não foi possível abrir o snapshot Arrow: %s", e)
+        return None, None
+    
+    metadata = table.schema.metadata or {}
+    snapshot_version = int(metadata.get(b'dataset_version', b'0'))
+    if version is not None and snapshot_version != version:
+        return None, None
+    
+    if fields and not set(fields) <= set(table.column_names):
+        return None, None
+    if main_only:
+        # Snapshots sem 'main_rows' não têm as principais no início
+        if b'main_rows' not in metadata:
+            return None, None
+        table = table.slice(0, int(metadata[b'main_rows']))
+    if fields:
+        table = table.select(list(fields))
+    
+    df = table.to_pandas(date_as_object=False, split_blocks=True)
+    return df, snapshot_version
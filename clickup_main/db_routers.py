@@ -0,0 +1,140 @@
+"""
+Roteador de banco de dados para a réplica de leitura.
+
+Quando DATABASE_REPLICA_URL está configurada, as leituras dos modelos do
+clickup_consumer (API de tarefas e dashboards) vão para o alias 'replica',
+enquanto todas as escritas (ETL) continuam no 'default'. Se a réplica estiver
+fora do ar ou atrasada além de DATABASE_REPLICA_MAX_LAG segundos, as leituras
+voltam automaticamente para o banco primário.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_ALIAS = 'default'
+REPLICA_ALIAS = 'replica'
+
+# Estado por thread para fixar as leituras no primário (ex.: durante o ETL)
+_local = threading.local()
+
+# Resultado da última verificação de atraso, compartilhado entre as threads
+_lag_lock = threading.Lock()
+_lag_state = {'checked_at': 0.0, 'healthy': False}
+
+
+@contextmanager
+def use_primary():
+    """
+    Fixa todas as leituras da thread atual no banco primário.
+
+    Útil para o ETL, que precisa ler exatamente o que acabou de escrever.
+    Pode ser usado como context manager ou como decorador (@use_primary()).
+    """
+    depth = getattr(_local, 'pin_depth', 0)
+    _local.pin_depth = depth + 1
+    try:
+        yield
+    finally:
+        _local.pin_depth = depth
+
+
+def replica_lag_seconds(alias=REPLICA_ALIAS):
+    """
+    Retorna o atraso de replicação (em segundos) do banco informado.
+
+    No PostgreSQL, considera atraso zero quando todo o WAL recebido já foi
+    aplicado, evitando falsos positivos em períodos sem escrita no primário.
+    Outros bancos (ex.: duas bases SQLite em desenvolvimento) não têm atraso.
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT CASE
+                WHEN NOT pg_is_in_recovery() THEN 0
+                WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+            END
+            """
+        )
+        return float(cursor.fetchone()[0])
+
+
+def replica_is_available():
+    """
+    Indica se a réplica pode receber leituras.
+
+    O atraso é consultado no máximo uma vez a cada
+    DATABASE_REPLICA_LAG_CHECK_INTERVAL segundos; entre as verificações o
+    último resultado é reaproveitado.
+    """
+    if REPLICA_ALIAS not in settings.DATABASES:
+        return False
+
+    now = time.monotonic()
+    interval = getattr(settings, 'DATABASE_REPLICA_LAG_CHECK_INTERVAL', 10)
+    if now - _lag_state['checked_at'] < interval:
+        return _lag_state['healthy']
+
+    with _lag_lock:
+        # Outra thread pode ter feito a verificação enquanto esperávamos
+        if now - _lag_state['checked_at'] < interval:
+            return _lag_state['healthy']
+
+        max_lag = getattr(settings, 'DATABASE_REPLICA_MAX_LAG', 30)
+        try:
+            lag = replica_lag_seconds()
+            healthy = lag <= max_lag
+            if not healthy:
+                logger.warning(
+                    "Réplica atrasada %.1fs (limite %.1fs); leituras redirecionadas ao primário.",
+                    lag, max_lag,
+                )
+        except Exception as exc:
+            healthy = False
+            logger.warning("Réplica indisponível (%s); leituras redirecionadas ao primário.", exc)
+
+        _lag_state['healthy'] = healthy
+        _lag_state['checked_at'] = time.monotonic()
+        return healthy
+
+
+class ReplicaRouter:
+    """
+    Envia as leituras dos apps de dados para a réplica e as escritas para o primário.
+
+    Apps como auth, sessions e knox permanecem no primário para que um token
+    recém-criado seja visível imediatamente no próximo request.
+    """
+    route_app_labels = {'clickup_consumer'}
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in self.route_app_labels:
+            return None
+        if getattr(_local, 'pin_depth', 0) or not replica_is_available():
+            return PRIMARY_ALIAS
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in self.route_app_labels:
+            return None
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primário e réplica contêm os mesmos dados
+        databases = {PRIMARY_ALIAS, REPLICA_ALIAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
@@ -37,21 +37,79 @@ INSTALLED_APPS = [
     'clickup_consumer',
     # Apps de terceiros
     'rest_framework',
+    'adrf',
     'clickup_dashboards.apps.ClickupDashboardsConfig', 
 ]
 
 # Configurações de autenticação
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'knox.auth.TokenAuthentication',
+        # Knox com cache em memória dos tokens já validados
+        'clickup_consumer.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    # JSON gerado com orjson (datas e decimais tratados em código nativo)
+    'DEFAULT_RENDERER_CLASSES': [
+        'clickup_consumer.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# Paginação por cursor da API de tarefas
+CLICKUP_API_PAGE_SIZE = int(os.environ.get('CLICKUP_API_PAGE_SIZE', '5000'))
+CLICKUP_API_MAX_PAGE_SIZE = int(os.environ.get('CLICKUP_API_MAX_PAGE_SIZE', '20000'))
+
+# Linhas lidas do cursor e enviadas por bloco no modo ?stream=true
+CLICKUP_API_STREAM_CHUNK_SIZE = int(os.environ.get('CLICKUP_API_STREAM_CHUNK_SIZE', '2000'))
+
+# Quantas versões de remoções ficam registradas para o endpoint /api/tasks/changes/
+CLICKUP_CHANGES_RETENTION_VERSIONS = int(os.environ.get('CLICKUP_CHANGES_RETENTION_VERSIONS', '50'))
+
+# Maior período (em dias) aceito por /api/capacity/
+CLICKUP_CAPACITY_MAX_DAYS = int(os.environ.get('CLICKUP_CAPACITY_MAX_DAYS', '366'))
+
+# Eventos de nova versão (/api/events/): intervalo (em segundos) entre as
+# consultas à última versão, intervalo dos keep-alives e duração máxima de uma
+# conexão antes de o cliente reconectar
+CLICKUP_EVENTS_POLL_INTERVAL = float(os.environ.get('CLICKUP_EVENTS_POLL_INTERVAL', '2'))
+CLICKUP_EVENTS_HEARTBEAT = int(os.environ.get('CLICKUP_EVENTS_HEARTBEAT', '15'))
+CLICKUP_EVENTS_MAX_DURATION = int(os.environ.get('CLICKUP_EVENTS_MAX_DURATION', '3600'))
+
+# Arquivo Arrow IPC publicado a cada sincronização com o conjunto completo,
+# aberto pelos dashboards via memory-map (requer o extra 'arrow'); vazio desativa
+CLICKUP_SNAPSHOT_PATH = os.environ.get('CLICKUP_SNAPSHOT_PATH', os.path.join(BASE_DIR, '.cache', 'snapshots', 'tasks.arrow'))
+
+# Tamanho máximo (em bytes) de uma resposta guardada no cache da API
+CLICKUP_API_CACHE_MAX_BYTES = int(os.environ.get('CLICKUP_API_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+# Cache das respostas da API de tarefas. Por padrão fica em arquivos, para ser
+# compartilhado entre os workers e invalidado pelo comando de sincronização;
+# use TASKS_API_CACHE_BACKEND=django.core.cache.backends.locmem.LocMemCache
+# para um cache em memória por processo.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'tasks_api': {
+        'BACKEND': os.environ.get('TASKS_API_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('TASKS_API_CACHE_LOCATION', os.path.join(BASE_DIR, '.cache', 'tasks_api')),
+        # As entradas só deixam de valer quando a versão muda; o timeout apenas limpa o disco
+        'TIMEOUT': int(os.environ.get('TASKS_API_CACHE_TIMEOUT', '86400')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('TASKS_API_CACHE_MAX_ENTRIES', '500')),
+        },
+    },
 }
 
 
+# Tempo (em segundos) que um token validado fica no cache do processo;
+# 0 desativa o cache e toda requisição consulta o banco
+CLICKUP_AUTH_CACHE_TTL = int(os.environ.get('CLICKUP_AUTH_CACHE_TTL', '60'))
+CLICKUP_AUTH_CACHE_MAX_ENTRIES = int(os.environ.get('CLICKUP_AUTH_CACHE_MAX_ENTRIES', '1000'))
+
 # Configuração para o django-rest-knox
 REST_KNOX = {
   # Define o tempo de expiração do token para 10 anos (em segundos)
@@ -92,6 +150,9 @@ TEMPLATES = [
 # O WSGI application aponta para a pasta principal do projeto
 WSGI_APPLICATION = 'clickup_main.wsgi.application'
 
+# Deploy assíncrono (uvicorn), recomendado para a API: ver README
+ASGI_APPLICATION = 'clickup_main.asgi.application'
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
@@ -108,6 +169,29 @@ DATABASES = {
     )
 }
 
+# Desative os cursores no servidor (usados no streaming da API) quando o
+# banco estiver atrás de um pooler em modo transação, como o do Supabase
+if os.environ.get('DATABASE_DISABLE_SERVER_SIDE_CURSORS') == 'True':
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Réplica de leitura opcional para a API e os dashboards.
+# Em desenvolvimento pode apontar para outro banco SQLite/Postgres local,
+# ex.: DATABASE_REPLICA_URL=sqlite:///replica.sqlite3
+DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+
+# Atraso máximo aceito (em segundos) antes de voltar a ler do primário
+DATABASE_REPLICA_MAX_LAG = float(os.environ.get('DATABASE_REPLICA_MAX_LAG', '30'))
+
+# Intervalo (em segundos) entre as verificações de atraso da réplica
+DATABASE_REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get('DATABASE_REPLICA_LAG_CHECK_INTERVAL', '10'))
+
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = dj_database_url.parse(DATABASE_REPLICA_URL, conn_max_age=600)
+    # Nos testes a réplica espelha o banco padrão
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    DATABASES['replica']['DISABLE_SERVER_SIDE_CURSORS'] = DATABASES['default'].get('DISABLE_SERVER_SIDE_CURSORS', False)
+    DATABASE_ROUTERS = ['clickup_main.db_routers.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators